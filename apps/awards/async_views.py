@@ -0,0 +1,27 @@
+"""Async twin of ``AwardViewSet.leaderboard``, served under ASGI (config/urls_async.py)."""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework.request import Request
+
+from apps.awards.pagination import LeaderboardPagination
+from apps.awards.views import leaderboard_entries, leaderboard_query
+from apps.core.aio import async_read_view, json_response
+
+
+@async_read_view
+async def leaderboard(request: Request) -> HttpResponse:
+    try:
+        rows, award_type, player_id = leaderboard_query(request.query_params)
+    except ValueError as exc:
+        return json_response({'error': str(exc)}, status=400)
+    if player_id:
+        row = await rows.filter(player_id=player_id).afirst()
+        if row is None:
+            return json_response({'error': 'Jogador sem prêmios neste ranking'}, status=404)
+        entries = await sync_to_async(leaderboard_entries)([row], award_type)
+        return json_response(entries[0])
+
+    paginator = LeaderboardPagination()
+    page = await paginator.apaginate_queryset(rows, request)
+    entries = await sync_to_async(leaderboard_entries)(page, award_type)
+    return json_response(paginator.get_paginated_response(entries).data)
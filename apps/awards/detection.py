@@ -0,0 +1,45 @@
+from typing import Any, Sequence
+
+from apps.awards.kills import Kill, PairState
+from apps.events.models import Event, EventType
+from apps.players.resolver import resolve_players
+
+# Per PLAYER_KILL event id: what the kill-pair index looked like when the
+# kill was ingested. Recorded at ingest so awards can be evaluated later, in
+# any order, with the same result.
+KillFacts = dict[Any, dict[str, Any]]
+
+
+def details(event: Event) -> dict[str, Any]:
+    return event.details if isinstance(event.details, dict) else {}
+
+
+def resolve_kills(events: Sequence[Event]) -> list[Kill]:
+    kill_events = [e for e in events if e.type == EventType.PLAYER_KILL and e.player_id]
+    targets = {str(details(e).get("target_id")) for e in kill_events}
+    targets.discard("None")
+    players = resolve_players(targets) if targets else {}
+
+    kills: list[Kill] = []
+    for event in kill_events:
+        target = players.get(str(details(event).get("target_id")))
+        if target:
+            kills.append((event, event.player_id, target.id))
+    return kills
+
+
+def replay_kills(kills: Sequence[Kill], prior: dict[tuple[Any, Any], PairState]) -> KillFacts:
+    """Replay ``kills`` over the pre-batch pair counts returned by ``record_kills``.
+
+    Each kill sees exactly the kills ingested before it.
+    """
+    counts = {pair: state.kill_count for pair, state in prior.items()}
+    facts: KillFacts = {}
+    for event, killer_id, victim_id in kills:
+        counts[(killer_id, victim_id)] = counts.get((killer_id, victim_id), 0) + 1
+        facts[event.pk] = {
+            "victim": str(victim_id),
+            "kill_number": counts[(killer_id, victim_id)],
+            "reverse_kills": counts.get((victim_id, killer_id), 0),
+        }
+    return facts
@@ -0,0 +1,125 @@
+from collections import Counter
+from typing import Any, Iterable, Mapping, Sequence
+
+from django.db.models import Q, QuerySet, Sum
+from django.dispatch import Signal
+
+from apps.awards.models import Award, AwardCountBucket, PlayerAwardCount
+from apps.core.db import increment_counts
+
+ALL_TYPES = PlayerAwardCount.ALL_TYPES
+KEY_FIELDS = ("award_type", "player")
+BUCKET_FIELDS = ("award_type", "count")
+
+# Sent with ``awards=[...]`` by ``create_awards`` for the rows it inserted;
+# ``bulk_create`` skips ``post_save``.
+awards_created = Signal()
+
+
+def apply_award_counts(keys: Iterable[tuple[Any, str]], sign: int = 1) -> None:
+    """Add ``sign`` per ``(player_id, award_type)`` to its board and the overall board.
+
+    Each touched player also moves between ``AwardCountBucket`` rows.
+    """
+    deltas: Counter[tuple[str, Any]] = Counter()
+    for player_id, award_type in keys:
+        deltas[(award_type, player_id)] += sign
+        deltas[(ALL_TYPES, player_id)] += sign
+    deltas = Counter({key: delta for key, delta in deltas.items() if delta})
+    if not deltas:
+        return
+    increment_counts(PlayerAwardCount, KEY_FIELDS, deltas)
+    # The rows just updated stay locked until commit, so reading them back
+    # gives this transaction's counts after the change; before is after - delta
+    after = {
+        (award_type, player_id): count
+        for award_type, player_id, count in PlayerAwardCount.objects.filter(
+            award_type__in={key[0] for key in deltas}, player_id__in={key[1] for key in deltas}
+        ).values_list("award_type", "player_id", "count")
+    }
+    buckets: Counter[tuple[str, int]] = Counter()
+    for key, delta in deltas.items():
+        if key not in after:
+            continue  # A retraction from a pruned row changes nothing
+        new = after[key]
+        if new - delta > 0:
+            buckets[(key[0], new - delta)] -= 1
+        if new > 0:
+            buckets[(key[0], new)] += 1
+    increment_counts(AwardCountBucket, BUCKET_FIELDS, buckets, count_field="players")
+
+
+def forget_player(player_id: Any) -> None:
+    """Take a player off every board before it is deleted (its rows go by cascade)."""
+    rows = PlayerAwardCount.objects.filter(player_id=player_id, count__gt=0)
+    held = Counter(rows.values_list("award_type", "count"))
+    retracted = {key: -players for key, players in held.items()}
+    increment_counts(AwardCountBucket, BUCKET_FIELDS, retracted, count_field="players")
+    # Awards deleted by the same cascade then retract from zero, off the boards
+    rows.update(count=0)
+
+
+def create_awards(awards: Sequence[Award]) -> list[Award]:
+    """Insert ``awards``, skipping ones already stored, and count the new ones.
+
+    ``bulk_create`` sends no ``post_save``, so this is the one place batched
+    award writes go through.
+    """
+    if not awards:
+        return []
+    existing = set(
+        Award.objects.filter(event_id__in={a.event_id for a in awards if a.event_id})
+        .values_list("player_id", "award_type", "event_id")
+    )
+    fresh: dict[tuple[Any, str, Any], Award] = {}
+    for award in awards:
+        key = (award.player_id, award.award_type, award.event_id)
+        if key not in existing:
+            fresh.setdefault(key, award)
+    Award.objects.bulk_create(list(fresh.values()), ignore_conflicts=True)
+    # bulk_create returns every object, conflicting ones included, and a
+    # concurrent writer can insert the same award after the check above. The
+    # ids are set client-side, so the rows found under them are ours.
+    inserted = set(
+        Award.objects.filter(pk__in=[a.pk for a in fresh.values()]).values_list("pk", flat=True)
+    )
+    created = [award for award in fresh.values() if award.pk in inserted]
+    apply_award_counts((a.player_id, a.award_type) for a in created)
+    awards_created.send(sender=Award, awards=created)
+    return created
+
+
+def board(award_type: str = ALL_TYPES) -> QuerySet[PlayerAwardCount]:
+    return PlayerAwardCount.objects.filter(award_type=award_type, count__gt=0)
+
+
+def ranks(counts: Iterable[int], award_type: str = ALL_TYPES) -> dict[int, int]:
+    """Competition rank (1 + players with more awards) of each count, in one query.
+
+    Sums the ``AwardCountBucket`` rows above each count: the cost grows with
+    the number of distinct counts above it, not with the players ranked
+    above, so the bottom of a large board is as cheap as the top.
+    """
+    wanted = sorted(set(counts))
+    if not wanted:
+        return {}
+    above = AwardCountBucket.objects.filter(award_type=award_type, count__gt=wanted[0])
+    found = above.aggregate(**{
+        f"above_{i}": Sum("players", filter=Q(count__gt=value)) for i, value in enumerate(wanted)
+    })
+    return {value: (found[f"above_{i}"] or 0) + 1 for i, value in enumerate(wanted)}
+
+
+def buckets_from_counts(counts: Mapping[tuple[str, Any], int]) -> Counter[tuple[str, int]]:
+    """``AwardCountBucket`` contents for the board counts ``counts``."""
+    return Counter((award_type, count) for (award_type, _), count in counts.items() if count > 0)
+
+
+def counts_from_awards() -> Counter[tuple[str, Any]]:
+    """Recount every board from the raw ``Award`` table (full scan)."""
+    counts: Counter[tuple[str, Any]] = Counter()
+    rows = Award.objects.order_by().values_list("player_id", "award_type")
+    for player_id, award_type in rows.iterator(chunk_size=5000):
+        counts[(award_type, player_id)] += 1
+        counts[(ALL_TYPES, player_id)] += 1
+    return counts
@@ -0,0 +1,48 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+
+from apps.awards.kills import record_kills
+from apps.awards.models import KillPair
+from apps.awards.detection import resolve_kills
+from apps.events.models import Event, EventType
+
+
+class Command(BaseCommand):
+    help = "Reconstrói a tabela de pares assassino→vítima a partir dos eventos PLAYER_KILL."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Eventos processados por lote (padrão: 2000).",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        chunk_size = options["chunk_size"]
+        events = (
+            Event.objects.filter(type=EventType.PLAYER_KILL, player__isnull=False)
+            .order_by("created_at", "id")
+            .only("id", "type", "details", "player_id", "created_at")
+        )
+        total = 0
+        with transaction.atomic():
+            KillPair.objects.all().delete()
+            chunk: list[Event] = []
+            for event in events.iterator(chunk_size=chunk_size):
+                chunk.append(event)
+                if len(chunk) >= chunk_size:
+                    total += self._apply(chunk)
+                    chunk = []
+            if chunk:
+                total += self._apply(chunk)
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} abates indexados em {KillPair.objects.count()} pares"
+        ))
+
+    def _apply(self, chunk: list[Event]) -> int:
+        kills = resolve_kills(chunk)
+        record_kills(kills)
+        return len(kills)
@@ -0,0 +1,117 @@
+import threading
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import OperationalError, connection
+
+from apps.awards import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Avalia os prêmios dos eventos enfileirados em AwardOutbox "
+        "(modo AWARDS_DEFERRED_EVALUATION)."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Threads de avaliação; cada uma drena partições exclusivas (padrão: 1).",
+        )
+        parser.add_argument(
+            "--partitions",
+            default="",
+            help=(
+                "Partições atendidas por este processo, separadas por vírgula "
+                f"(padrão: todas as {outbox.PARTITIONS}). Use para dividir a fila entre processos."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=outbox.BATCH_SIZE,
+            help=f"Eventos avaliados por transação (padrão: {outbox.BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Segundos de espera quando a fila está vazia (padrão: 1.0).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drena a fila e termina, em vez de continuar aguardando eventos.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        try:
+            partitions = (
+                sorted({int(p) for p in options["partitions"].split(",") if p.strip()})
+                or list(range(outbox.PARTITIONS))
+            )
+        except ValueError as exc:
+            raise CommandError("--partitions deve ser uma lista de inteiros") from exc
+        if any(not 0 <= p < outbox.PARTITIONS for p in partitions):
+            raise CommandError(f"Partições válidas: 0 a {outbox.PARTITIONS - 1}")
+        workers = max(1, min(options["workers"], len(partitions)))
+
+        stop = threading.Event()
+        handled = [0] * workers
+        errors: list[BaseException] = []
+
+        def work(index: int) -> None:
+            # Each thread owns a fixed share of the partitions, so events of
+            # one player are always evaluated by one thread, in order.
+            owned = partitions[index::workers]
+            try:
+                while not stop.is_set():
+                    try:
+                        count = outbox.process_batch(owned, options["batch_size"])
+                    except OperationalError:
+                        # e.g. another worker holds the SQLite write lock; retry
+                        stop.wait(options["poll_interval"])
+                        continue
+                    handled[index] += count
+                    if not count:
+                        if options["once"]:
+                            return
+                        stop.wait(options["poll_interval"])
+            except Exception as exc:
+                errors.append(exc)
+                stop.set()
+
+        def work_in_thread(index: int) -> None:
+            try:
+                work(index)
+            finally:
+                connection.close()
+
+        threads: list[threading.Thread] = []
+        try:
+            if workers == 1:
+                work(0)
+            else:
+                threads = [
+                    threading.Thread(target=work_in_thread, args=(i,), daemon=True)
+                    for i in range(workers)
+                ]
+                for thread in threads:
+                    thread.start()
+                while any(thread.is_alive() for thread in threads):
+                    time.sleep(0.2)
+        except KeyboardInterrupt:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise CommandError(f"Falha ao processar a fila: {errors[0]!r}")
+
+        stats = outbox.queue_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"{sum(handled)} eventos avaliados; na fila: {stats['depth']}, "
+            f"com falha: {stats['failed']}"
+        ))
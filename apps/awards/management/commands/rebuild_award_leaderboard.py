@@ -0,0 +1,81 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+
+from apps.awards.leaderboard import buckets_from_counts, counts_from_awards
+from apps.awards.models import AwardCountBucket, PlayerAwardCount
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula a tabela de contagem de prêmios por player e a de players por contagem, "
+        "usadas pelos rankings."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Apenas compara as contagens com a tabela Award, sem gravar.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        with transaction.atomic():
+            expected = counts_from_awards()
+            stored = {
+                (award_type, player_id): count
+                for award_type, player_id, count in PlayerAwardCount.objects.filter(
+                    count__gt=0
+                ).values_list("award_type", "player_id", "count")
+            }
+            mismatches = 0
+            buckets = buckets_from_counts(expected)
+            stored_buckets = {
+                (award_type, count): players
+                for award_type, count, players in AwardCountBucket.objects.filter(
+                    players__gt=0
+                ).values_list("award_type", "count", "players")
+            }
+            for key in set(stored_buckets) | set(buckets):
+                if stored_buckets.get(key, 0) != buckets.get(key, 0):
+                    mismatches += 1
+                    award_type, count = key
+                    self.stdout.write(
+                        f"{award_type or '*'} com {count} prêmios: "
+                        f"players={stored_buckets.get(key, 0)} real={buckets.get(key, 0)}"
+                    )
+            for key in set(stored) | set(expected):
+                if stored.get(key, 0) != expected.get(key, 0):
+                    mismatches += 1
+                    award_type, player_id = key
+                    self.stdout.write(
+                        f"{player_id} {award_type or '*'}: contador={stored.get(key, 0)} "
+                        f"real={expected.get(key, 0)}"
+                    )
+
+            if options["check"]:
+                if mismatches:
+                    raise CommandError(f"{mismatches} contadores divergentes")
+                self.stdout.write(self.style.SUCCESS("Contadores consistentes"))
+                return
+
+            PlayerAwardCount.objects.all().delete()
+            PlayerAwardCount.objects.bulk_create(
+                [
+                    PlayerAwardCount(award_type=award_type, player_id=player_id, count=count)
+                    for (award_type, player_id), count in expected.items()
+                ],
+                batch_size=1000,
+            )
+            AwardCountBucket.objects.all().delete()
+            AwardCountBucket.objects.bulk_create(
+                [
+                    AwardCountBucket(award_type=award_type, count=count, players=players)
+                    for (award_type, count), players in buckets.items()
+                ],
+                batch_size=1000,
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Contadores recalculados ({mismatches} divergências corrigidas)"
+        ))
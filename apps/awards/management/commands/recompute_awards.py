@@ -0,0 +1,118 @@
+from datetime import datetime, time, timezone as dt_timezone
+from typing import Any, Optional
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.utils.dateparse import parse_date, parse_datetime
+
+from apps.awards.recompute import recompute_awards
+from apps.awards.rules import registry
+
+
+def _moment(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Data inválida: {value}")
+        moment = datetime.combine(day, time.min)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=dt_timezone.utc)
+    return moment
+
+
+class Command(BaseCommand):
+    help = (
+        "Reavalia as regras de prêmios sobre o histórico de eventos e grava os prêmios "
+        "que faltam (ignorando os que já existem)."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--rules",
+            default="",
+            help=(
+                "Regras a reavaliar, separadas por vírgula "
+                f"(padrão: todas: {', '.join(registry.names())})."
+            ),
+        )
+        parser.add_argument(
+            "--since", help="Só eventos criados a partir desta data/hora (ISO 8601)."
+        )
+        parser.add_argument("--until", help="Só eventos criados antes desta data/hora (ISO 8601).")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Eventos lidos por lote (padrão: 2000).",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Processos de avaliação; cada lote é dividido por player entre eles (padrão: 1).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help=(
+                "Apenas mostra quantos prêmios seriam criados e quantos não seriam mais "
+                "concedidos."
+            ),
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Remove prêmios das regras selecionadas que as regras atuais não concedem mais.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default="default",
+            help="Nome do checkpoint salvo após cada lote (padrão: default).",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continua a partir do checkpoint em vez de recomeçar.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        rules = [name.strip() for name in options["rules"].split(",") if name.strip()]
+        if options["chunk_size"] < 1 or options["processes"] < 1:
+            raise CommandError("--chunk-size e --processes devem ser positivos")
+
+        def progress(state: dict[str, Any]) -> None:
+            self.stdout.write(
+                f"{state['events']} eventos processados "
+                f"(até {state['last_created_at']:%Y-%m-%d %H:%M:%S})"
+            )
+
+        try:
+            summary = recompute_awards(
+                rules=rules or None,
+                since=_moment(options["since"]),
+                until=_moment(options["until"]),
+                chunk_size=options["chunk_size"],
+                processes=options["processes"],
+                dry_run=options["dry_run"],
+                prune=options["prune"],
+                checkpoint=options["checkpoint"],
+                resume=options["resume"],
+                progress=progress if options["verbosity"] > 1 else None,
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        verb = "seriam criados" if options["dry_run"] else "criados"
+        self.stdout.write(f"Regras: {', '.join(summary['rules'])}")
+        for award_type, count in sorted(summary["missing"].items()):
+            self.stdout.write(f"  + {award_type}: {count} {verb}")
+        for award_type, count in sorted(summary["stale"].items()):
+            pruned = options["prune"] and not options["dry_run"]
+            removed = "removidos" if pruned else "não concedidos mais"
+            self.stdout.write(f"  - {award_type}: {count} {removed}")
+        created = sum(summary["missing"].values())
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary['events']} eventos reavaliados; {created} prêmios {verb}"
+        ))
@@ -0,0 +1,71 @@
+# Generated by Django 6.0 on 2026-10-18 11:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("awards", "0001_initial"),
+        ("events", "0006_eventrollup"),
+        ("players", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="KillPair",
+            fields=[
+                (
+                    "pk",
+                    models.CompositePrimaryKey(
+                        "killer",
+                        "victim",
+                        blank=True,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("kill_count", models.PositiveIntegerField(default=0)),
+                ("first_kill_at", models.DateTimeField(blank=True, null=True)),
+                ("last_kill_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "first_kill_event",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="events.event",
+                    ),
+                ),
+                (
+                    "killer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="kill_pairs_as_killer",
+                        to="players.player",
+                    ),
+                ),
+                (
+                    "last_kill_event",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="events.event",
+                    ),
+                ),
+                (
+                    "victim",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="kill_pairs_as_victim",
+                        to="players.player",
+                    ),
+                ),
+            ],
+        ),
+    ]
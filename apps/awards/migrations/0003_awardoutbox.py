@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("awards", "0002_killpair"),
+        ("events", "0006_eventrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AwardOutbox",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("partition", models.PositiveSmallIntegerField()),
+                ("context", models.JSONField(blank=True, default=dict)),
+                ("enqueued_at", models.DateTimeField(auto_now_add=True)),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="events.event",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["partition", "id"], name="awards_outbox_partition_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("awards", "0003_awardoutbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecomputeCheckpoint",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=200, primary_key=True, serialize=False),
+                ),
+                ("params", models.JSONField(default=dict)),
+                ("last_created_at", models.DateTimeField(blank=True, null=True)),
+                ("last_event_id", models.UUIDField(blank=True, null=True)),
+                ("events", models.BigIntegerField(default=0)),
+                ("created", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
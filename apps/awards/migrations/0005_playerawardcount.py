@@ -0,0 +1,69 @@
+# Generated by Django 6.0 on 2026-10-18 11:28
+
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_counts(apps, schema_editor):
+    Award = apps.get_model("awards", "Award")
+    PlayerAwardCount = apps.get_model("awards", "PlayerAwardCount")
+
+    counts = Counter()
+    rows = Award.objects.order_by().values_list("player_id", "award_type")
+    for player_id, award_type in rows.iterator(chunk_size=5000):
+        counts[(award_type, player_id)] += 1
+        counts[("", player_id)] += 1
+    PlayerAwardCount.objects.bulk_create(
+        [
+            PlayerAwardCount(award_type=award_type, player_id=player_id, count=count)
+            for (award_type, player_id), count in counts.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("awards", "0004_recomputecheckpoint"),
+        ("players", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlayerAwardCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("award_type", models.CharField(blank=True, max_length=20)),
+                ("count", models.BigIntegerField(default=0)),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="award_counts",
+                        to="players.player",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["award_type", "-count", "-player"],
+                        name="awards_board_idx",
+                    )
+                ],
+                "unique_together": {("award_type", "player")},
+            },
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
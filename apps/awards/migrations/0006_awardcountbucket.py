@@ -0,0 +1,52 @@
+# Generated by Django 6.0 on 2026-10-19 10:05
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def backfill_buckets(apps, schema_editor):
+    PlayerAwardCount = apps.get_model("awards", "PlayerAwardCount")
+    AwardCountBucket = apps.get_model("awards", "AwardCountBucket")
+
+    buckets = Counter(
+        PlayerAwardCount.objects.filter(count__gt=0).values_list("award_type", "count").iterator()
+    )
+    AwardCountBucket.objects.bulk_create(
+        [
+            AwardCountBucket(award_type=award_type, count=count, players=players)
+            for (award_type, count), players in buckets.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("awards", "0005_playerawardcount"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AwardCountBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("award_type", models.CharField(blank=True, max_length=20)),
+                ("count", models.BigIntegerField()),
+                ("players", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "unique_together": {("award_type", "count")},
+            },
+        ),
+        migrations.RunPython(backfill_buckets, migrations.RunPython.noop),
+    ]
@@ -44,3 +44,130 @@ class Award(models.Model):
     def __str__(self) -> str:
         return f"Award {self.award_type} for {self.player}"
 
+
+class PlayerAwardCount(models.Model):
+    """Awards held by a player, per award type (``ALL_TYPES`` for the overall board).
+
+    Kept in step with ``Award`` inserts and deletes; the leaderboards read
+    it through the (award_type, -count, -player) index.
+    """
+
+    ALL_TYPES = ''
+
+    player = models.ForeignKey(
+        Player,
+        on_delete=models.CASCADE,
+        related_name='award_counts'
+    )
+    award_type = models.CharField(max_length=20, blank=True)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('award_type', 'player')
+        indexes = [
+            models.Index(fields=['award_type', '-count', '-player'], name='awards_board_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.player_id} {self.award_type or '*'}: {self.count}"
+
+
+class AwardCountBucket(models.Model):
+    """How many players hold exactly ``count`` awards on a board.
+
+    Kept with ``PlayerAwardCount``; a rank sums the buckets above a count,
+    one row per distinct count rather than one per player.
+    """
+
+    award_type = models.CharField(max_length=20, blank=True)
+    count = models.BigIntegerField()
+    players = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('award_type', 'count')
+
+    def __str__(self) -> str:
+        return f"{self.award_type or '*'} x{self.count}: {self.players} players"
+
+
+class KillPair(models.Model):
+    """How many times ``killer`` has killed ``victim`` (PLAYER_KILL events)."""
+
+    pk = models.CompositePrimaryKey("killer", "victim")
+    killer = models.ForeignKey(
+        Player,
+        on_delete=models.CASCADE,
+        related_name='kill_pairs_as_killer'
+    )
+    victim = models.ForeignKey(
+        Player,
+        on_delete=models.CASCADE,
+        related_name='kill_pairs_as_victim'
+    )
+    kill_count = models.PositiveIntegerField(default=0)
+    first_kill_event = models.ForeignKey(
+        Event,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    first_kill_at = models.DateTimeField(null=True, blank=True)
+    last_kill_event = models.ForeignKey(
+        Event,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    last_kill_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"{self.killer_id} -> {self.victim_id} ({self.kill_count})"
+
+
+class AwardOutbox(models.Model):
+    """Event waiting for deferred award evaluation (``AWARDS_DEFERRED_EVALUATION``).
+
+    Written in the ingest transaction and deleted in the transaction that
+    stores the awards, so every queued event is evaluated exactly once.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    # Events of one player always land in the same partition, and a
+    # partition is drained by one worker in id order.
+    partition = models.PositiveSmallIntegerField()
+    # Kill-pair facts captured at ingest (see apps.awards.detection)
+    context = models.JSONField(default=dict, blank=True)
+    enqueued_at = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['partition', 'id'], name='awards_outbox_partition_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"Outbox {self.id} (event {self.event_id})"
+
+
+class RecomputeCheckpoint(models.Model):
+    """Last fully processed event of a ``recompute_awards`` run."""
+
+    name = models.CharField(max_length=200, primary_key=True)
+    # Rule names and date range the position belongs to
+    params = models.JSONField(default=dict)
+    last_created_at = models.DateTimeField(null=True, blank=True)
+    last_event_id = models.UUIDField(null=True, blank=True)
+    events = models.BigIntegerField(default=0)
+    created = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"Recompute {self.name} @ {self.last_created_at}"
@@ -0,0 +1,111 @@
+import traceback
+import zlib
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Iterable, Optional, Sequence
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.db.models import Count, F, Min
+
+from apps.awards.detection import KillFacts
+from apps.awards.leaderboard import create_awards
+from apps.awards.models import AwardOutbox
+from apps.awards.rules import registry
+from apps.events.models import Event
+
+PARTITIONS: int = getattr(settings, "AWARDS_OUTBOX_PARTITIONS", 16)
+BATCH_SIZE: int = getattr(settings, "AWARDS_OUTBOX_BATCH_SIZE", 200)
+MAX_ATTEMPTS: int = getattr(settings, "AWARDS_OUTBOX_MAX_ATTEMPTS", 5)
+
+
+def partition_for(event: Event) -> int:
+    owner = event.player_id or event.guild_id or ""
+    return zlib.crc32(str(owner).encode()) % PARTITIONS
+
+
+def enqueue(events: Sequence[Event], facts: KillFacts) -> int:
+    rows = [
+        AwardOutbox(
+            event=event,
+            partition=partition_for(event),
+            context=facts.get(event.pk, {}),
+        )
+        for event in events
+        if registry.wants(event, facts)
+    ]
+    AwardOutbox.objects.bulk_create(rows)
+    return len(rows)
+
+
+def _store(rows: Sequence[AwardOutbox]) -> None:
+    events = Event.objects.in_bulk([row.event_id for row in rows])
+    ordered = [events[row.event_id] for row in rows if row.event_id in events]
+    facts = {row.event_id: row.context for row in rows if row.context}
+    # strict: a failing rule leaves the rows queued for a retry
+    create_awards(registry.evaluate(ordered, facts, strict=True))
+    AwardOutbox.objects.filter(id__in=[row.id for row in rows]).delete()
+
+
+def process_batch(partitions: Optional[Iterable[int]] = None, batch_size: int = BATCH_SIZE) -> int:
+    """Evaluate up to ``batch_size`` queued events, oldest first.
+
+    The whole batch is stored in one transaction. If it fails, rows are
+    retried one by one so a bad event only holds back itself; it is given up
+    on after ``MAX_ATTEMPTS``. Database ``OperationalError``s roll the batch
+    back and propagate, leaving it queued. Returns the number of rows handled.
+    """
+    queued = AwardOutbox.objects.filter(attempts__lt=MAX_ATTEMPTS)
+    if partitions is not None:
+        queued = queued.filter(partition__in=list(partitions))
+    if connection.features.has_select_for_update:
+        queued = queued.select_for_update()
+    with transaction.atomic():
+        rows = list(queued.order_by("id")[:batch_size])
+        if not rows:
+            return 0
+        try:
+            with transaction.atomic():
+                _store(rows)
+            return len(rows)
+        except OperationalError:
+            # Lock timeouts and lost connections are not the rows' fault
+            raise
+        except Exception:
+            pass
+        for row in rows:
+            try:
+                with transaction.atomic():
+                    _store([row])
+            except OperationalError:
+                raise
+            except Exception:
+                AwardOutbox.objects.filter(id=row.id).update(
+                    attempts=F("attempts") + 1,
+                    last_error=traceback.format_exc(limit=5),
+                )
+    return len(rows)
+
+
+def drain(partitions: Optional[Iterable[int]] = None, batch_size: int = BATCH_SIZE) -> int:
+    """Evaluate everything currently queued; meant for tests and one-off runs."""
+    partitions = list(partitions) if partitions is not None else None
+    total = 0
+    while True:
+        handled = process_batch(partitions, batch_size)
+        if not handled:
+            return total
+        total += handled
+
+
+def queue_stats(now: Optional[datetime] = None) -> dict[str, Any]:
+    now = now or datetime.now(dt_timezone.utc)
+    pending = AwardOutbox.objects.filter(attempts__lt=MAX_ATTEMPTS).aggregate(
+        depth=Count("id"), oldest=Min("enqueued_at")
+    )
+    oldest = pending["oldest"]
+    return {
+        "depth": pending["depth"],
+        "failed": AwardOutbox.objects.filter(attempts__gte=MAX_ATTEMPTS).count(),
+        "oldest_enqueued_at": oldest,
+        "lag_seconds": round((now - oldest).total_seconds(), 3) if oldest else 0.0,
+    }
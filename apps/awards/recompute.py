@@ -0,0 +1,222 @@
+import multiprocessing
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+import django
+from django.db import connections, transaction
+from django.db.models import Q, QuerySet
+
+from apps.awards.detection import KillFacts, replay_kills, resolve_kills
+from apps.awards.kills import PairState
+from apps.awards.leaderboard import create_awards
+from apps.awards.models import Award, RecomputeCheckpoint
+from apps.awards.outbox import partition_for
+from apps.awards.rules import registry
+from apps.events.models import Event, EventType
+
+EVENT_FIELDS = ("id", "type", "details", "player_id", "guild_id", "timestamp", "created_at")
+
+
+class KillHistory:
+    """Running kill-pair counts, rebuilt from events instead of the live index.
+
+    Lets a recompute judge each historic kill by the kills before it, exactly
+    like ``record_kills`` did at ingest.
+    """
+
+    def __init__(self) -> None:
+        self.counts: Counter[tuple[Any, Any]] = Counter()
+
+    def replay(self, events: Sequence[Event]) -> KillFacts:
+        kills = resolve_kills(events)
+        pairs = {(k, v) for _, k, v in kills} | {(v, k) for _, k, v in kills}
+        prior = {pair: PairState(self.counts[pair], None) for pair in pairs if self.counts[pair]}
+        for _, killer_id, victim_id in kills:
+            self.counts[(killer_id, victim_id)] += 1
+        return replay_kills(kills, prior)
+
+
+def _after(created_at: Optional[datetime], event_id: Any) -> Q:
+    if created_at is None:
+        return Q()
+    return Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=event_id)
+
+
+def _chunks(queryset: QuerySet[Event], size: int) -> Iterator[list[Event]]:
+    """``queryset`` in ``(created_at, id)`` order, one keyset query per chunk.
+
+    No cursor stays open between chunks, so the database (SQLite in
+    particular) is free for the workers' writes meanwhile.
+    """
+    queryset = queryset.order_by("created_at", "id")
+    position: tuple[Optional[datetime], Any] = (None, None)
+    while True:
+        chunk = list(queryset.filter(_after(*position))[:size])
+        if not chunk:
+            return
+        yield chunk
+        position = (chunk[-1].created_at, chunk[-1].pk)
+
+
+def evaluate_partition(
+    event_ids: Sequence[Any],
+    facts: KillFacts,
+    rules: Sequence[str],
+    dry_run: bool,
+    prune: bool,
+) -> dict[str, Any]:
+    """Re-run ``rules`` over one player partition of a chunk.
+
+    Compares the result with the stored awards of those rules (rule names are
+    the award types they grant) and, unless ``dry_run``, inserts what is
+    missing and, with ``prune``, deletes what the rules no longer grant.
+    ``missing`` is the diff; ``created`` counts the rows actually inserted.
+    """
+    by_id = Event.objects.only(*EVENT_FIELDS).in_bulk(event_ids)
+    events = [by_id[pk] for pk in event_ids if pk in by_id]
+    awards = registry.evaluate(events, facts, strict=True, only=rules)
+    produced = {(a.player_id, a.award_type, a.event_id): a for a in awards}
+    existing = dict(
+        ((player_id, award_type, event_id), pk)
+        for pk, player_id, award_type, event_id in Award.objects.filter(
+            event_id__in=event_ids, award_type__in=rules
+        ).values_list("pk", "player_id", "award_type", "event_id")
+    )
+    missing = [award for key, award in produced.items() if key not in existing]
+    stale = [key for key in existing if key not in produced]
+
+    created = 0
+    if not dry_run:
+        with transaction.atomic():
+            created = len(create_awards(missing))
+            if prune and stale:
+                Award.objects.filter(pk__in=[existing[key] for key in stale]).delete()
+    return {
+        "events": len(events),
+        "created": created,
+        "missing": Counter(a.award_type for a in missing),
+        "stale": Counter(key[1] for key in stale),
+    }
+
+
+def recompute_awards(
+    rules: Optional[Sequence[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    chunk_size: int = 2000,
+    processes: int = 1,
+    dry_run: bool = False,
+    prune: bool = False,
+    checkpoint: Optional[str] = None,
+    resume: bool = False,
+    progress: Optional[Callable[[dict[str, Any]], None]] = None,
+) -> dict[str, Any]:
+    """Re-evaluate award ``rules`` over events created in ``[since, until)``.
+
+    Events are streamed in ``(created_at, id)`` order, ``chunk_size`` at a
+    time. Each chunk is split by player partition and the partitions are
+    evaluated in parallel on ``processes`` worker processes; chunks run one
+    after the other, so a player's events are always judged in order. After
+    each chunk the position is saved under ``checkpoint``, and ``resume``
+    continues from it.
+    """
+    rules = list(rules or registry.names())
+    unknown = set(rules) - set(registry.names())
+    if unknown:
+        raise ValueError(f"Unknown award rules: {', '.join(sorted(unknown))}")
+    params = {
+        "rules": sorted(rules),
+        "since": since.isoformat() if since else None,
+        "until": until.isoformat() if until else None,
+    }
+
+    start: tuple[Optional[datetime], Any] = (None, None)
+    processed = created = 0
+    state: Optional[RecomputeCheckpoint] = None
+    if checkpoint and not dry_run:
+        state, _ = RecomputeCheckpoint.objects.get_or_create(name=checkpoint)
+        if resume and state.last_created_at is not None:
+            if state.params != params:
+                raise ValueError(f"Checkpoint {checkpoint} belongs to another run: {state.params}")
+            start = (state.last_created_at, state.last_event_id)
+            processed, created = state.events, state.created
+        else:
+            RecomputeCheckpoint.objects.filter(pk=checkpoint).update(
+                params=params, last_created_at=None, last_event_id=None, events=0, created=0
+            )
+
+    events = Event.objects.filter(type__in=registry.event_types(rules)).only(*EVENT_FIELDS)
+    if until is not None:
+        events = events.filter(created_at__lt=until)
+    if start[0] is None and since is not None:
+        events = events.filter(created_at__gte=since)
+    events = events.filter(_after(*start))
+
+    history: Optional[KillHistory] = None
+    if "kill_facts" in registry.needs(rules):
+        # Every kill before the first event processed counts towards the pairs
+        history = KillHistory()
+        if start[0] is not None:
+            earlier = Q(created_at__lt=start[0]) | Q(created_at=start[0], id__lte=start[1])
+        else:
+            earlier = Q(created_at__lt=since) if since is not None else Q(pk__in=[])
+        seed = Event.objects.filter(earlier, type=EventType.PLAYER_KILL).only(*EVENT_FIELDS)
+        for chunk in _chunks(seed, chunk_size):
+            history.replay(chunk)
+
+    missing: Counter[str] = Counter()
+    stale: Counter[str] = Counter()
+    executor: Optional[Executor] = None
+    if processes > 1:
+        # Children open their own connections; don't hand them ours
+        connections.close_all()
+        executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            # Must not be defined here: unpickling it would import models before setup
+            initializer=django.setup,
+        )
+    try:
+        for chunk in _chunks(events, chunk_size):
+            facts = history.replay(chunk) if history is not None else {}
+            partitions: dict[int, list[Any]] = {}
+            for event in chunk:
+                partitions.setdefault(partition_for(event), []).append(event.pk)
+            jobs = [
+                (ids, {pk: facts[pk] for pk in ids if pk in facts}, rules, dry_run, prune)
+                for ids in partitions.values()
+            ]
+            if executor is not None:
+                results = list(executor.map(evaluate_partition, *zip(*jobs)))
+            else:
+                results = [evaluate_partition(*job) for job in jobs]
+            for result in results:
+                processed += result["events"]
+                missing.update(result["missing"])
+                stale.update(result["stale"])
+                created += result["created"]
+
+            last = chunk[-1]
+            if state is not None:
+                RecomputeCheckpoint.objects.filter(pk=state.pk).update(
+                    last_created_at=last.created_at,
+                    last_event_id=last.pk,
+                    events=processed,
+                    created=created,
+                )
+            if progress is not None:
+                progress({"events": processed, "last_created_at": last.created_at})
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return {
+        "rules": rules,
+        "dry_run": dry_run,
+        "events": processed,
+        "created": created,
+        "missing": dict(missing),
+        "stale": dict(stale),
+    }
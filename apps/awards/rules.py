@@ -0,0 +1,325 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Collection, Iterable, Optional, Sequence
+
+from django.db import transaction
+
+from apps.awards.detection import KillFacts, details
+from apps.awards.models import Award
+from apps.events.models import Event, EventType
+from apps.players.models import Player
+from apps.core.metrics import Counter, Histogram
+from apps.players.resolver import resolve_players
+
+logger = logging.getLogger(__name__)
+
+RULE_EVALUATIONS = Counter(
+    "eventhub_award_rule_evaluations_total",
+    "Award rule calls, by rule (award type)",
+    ["award_type"],
+)
+RULE_EVENTS = Counter(
+    "eventhub_award_rule_events_total",
+    "Events shown to award rules, by rule (award type)",
+    ["award_type"],
+)
+RULE_SECONDS = Histogram(
+    "eventhub_award_rule_seconds",
+    "Duration of one award rule call, by rule (award type)",
+    ["award_type"],
+)
+# Swallowed so the ingest that fired the award signals still commits
+RULE_FAILURES = Counter(
+    "eventhub_award_rule_failures_total",
+    "Award detection failures (rule, data loader, kill index or award insert) swallowed "
+    "during signal handling, by the rule whose awards were skipped",
+    ["award_type"],
+)
+AWARDS_PRODUCED = Counter(
+    "eventhub_awards_produced_total", "Awards produced by the rules, by award type", ["award_type"]
+)
+
+
+@dataclass
+class RuleContext:
+    """Indexed data handed to rules; only what the matching rules asked for is loaded."""
+
+    facts: KillFacts = field(default_factory=dict)
+    players: dict[str, Player] = field(default_factory=dict)
+
+
+# Data a rule can declare in ``needs``: whether an event carries it, and how
+# to load it for a batch.
+def _has_party(event: Event, context: RuleContext) -> bool:
+    return bool(details(event).get("party_members"))
+
+
+def _load_party(events: Sequence[Event], context: RuleContext) -> None:
+    identifiers = {str(p) for e in events for p in (details(e).get("party_members") or [])}
+    context.players.update(resolve_players(identifiers))
+
+
+def _has_kill_facts(event: Event, context: RuleContext) -> bool:
+    return event.pk in context.facts
+
+
+NEEDS: dict[str, tuple[Callable[[Event, RuleContext], bool], Optional[Callable[..., None]]]] = {
+    # party_members resolved to players (context.players)
+    "party": (_has_party, _load_party),
+    # kill-pair facts captured at ingest (context.facts)
+    "kill_facts": (_has_kill_facts, None),
+}
+
+RuleFunc = Callable[[Sequence[Event], RuleContext], Iterable[Award]]
+
+
+@dataclass
+class AwardRule:
+    name: str
+    event_types: frozenset[str]
+    needs: frozenset[str]
+    func: RuleFunc
+    calls: int = 0
+    events: int = 0
+    awards: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    last_error: str = ""
+
+    def accepts(self, event: Event, context: RuleContext) -> bool:
+        return all(NEEDS[need][0](event, context) for need in self.needs)
+
+
+class RuleError(Exception):
+    """Raised by ``RuleRegistry.evaluate(strict=True)`` after a rule failed."""
+
+
+class RuleRegistry:
+    """Award rules indexed by the ``EventType``s they handle.
+
+    Events are only shown to rules registered for their type, so adding a
+    rule for one type costs nothing for the others. Every rule call is timed
+    and failures are counted per rule (see ``stats``).
+    """
+
+    def __init__(self) -> None:
+        self._rules: dict[str, AwardRule] = {}
+        self._by_type: dict[str, list[AwardRule]] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self, name: str, event_types: Iterable[str], needs: Iterable[str] = ()
+    ) -> Callable[[RuleFunc], RuleFunc]:
+        """Decorator registering ``func(events, context) -> awards`` as rule ``name``."""
+        unknown = set(needs) - set(NEEDS)
+        if unknown:
+            raise ValueError(f"Unknown rule needs: {sorted(unknown)}")
+
+        def decorator(func: RuleFunc) -> RuleFunc:
+            self.add(AwardRule(name, frozenset(event_types), frozenset(needs), func))
+            return func
+        return decorator
+
+    def add(self, rule: AwardRule) -> None:
+        self.remove(rule.name)
+        self._rules[rule.name] = rule
+        for event_type in rule.event_types:
+            self._by_type.setdefault(event_type, []).append(rule)
+
+    def remove(self, name: str) -> None:
+        rule = self._rules.pop(name, None)
+        if rule is None:
+            return
+        for event_type in rule.event_types:
+            self._by_type[event_type].remove(rule)
+            if not self._by_type[event_type]:
+                del self._by_type[event_type]
+
+    def rules_for(self, event_type: str) -> list[AwardRule]:
+        return list(self._by_type.get(event_type, ()))
+
+    def names(self, need: Optional[str] = None) -> list[str]:
+        """Every rule's name, or those of the rules declaring ``need``."""
+        return [name for name, rule in self._rules.items() if need is None or need in rule.needs]
+
+    def event_types(self, names: Optional[Collection[str]] = None) -> set[str]:
+        return {
+            event_type for rule in self._rules.values()
+            if names is None or rule.name in names
+            for event_type in rule.event_types
+        }
+
+    def needs(self, names: Optional[Collection[str]] = None) -> set[str]:
+        return {
+            need for rule in self._rules.values()
+            if names is None or rule.name in names
+            for need in rule.needs
+        }
+
+    def wants(self, event: Event, facts: KillFacts) -> bool:
+        """Whether any rule would look at ``event``."""
+        context = RuleContext(facts=facts)
+        return any(rule.accepts(event, context) for rule in self._by_type.get(event.type, ()))
+
+    def evaluate(
+        self,
+        events: Sequence[Event],
+        facts: KillFacts,
+        strict: bool = False,
+        only: Optional[Collection[str]] = None,
+    ) -> list[Award]:
+        """Run every matching rule (or just those named in ``only``) over ``events``.
+
+        ``events`` may be a single event or a batch. A failing rule is counted
+        and logged and the other rules' awards are still returned; with
+        ``strict`` a ``RuleError`` is raised instead once all rules have run.
+        """
+        context = RuleContext(facts=facts)
+        batches: dict[str, list[Event]] = {}
+        for event in events:
+            for rule in self._by_type.get(event.type, ()):
+                if (only is None or rule.name in only) and rule.accepts(event, context):
+                    batches.setdefault(rule.name, []).append(event)
+        if not batches:
+            return []
+
+        failed: list[str] = []
+        needs = {need for name in batches for need in self._rules[name].needs}
+        for need in sorted(needs):
+            loader = NEEDS[need][1]
+            if loader is None:
+                continue
+            users = [name for name in batches if need in self._rules[name].needs]
+            try:
+                # Savepoint: a failed query must not abort the caller's transaction
+                with transaction.atomic():
+                    loader([e for name in users for e in batches[name]], context)
+            except Exception as exc:
+                logger.exception("Loading %r for award rules %s failed", need, ", ".join(users))
+                self.record_failure(users, exc)
+                failed.extend(f"{name}: {exc!r}" for name in users)
+                for name in users:
+                    del batches[name]
+
+        awards: list[Award] = []
+        for name, matched in batches.items():
+            rule = self._rules[name]
+            started = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    produced = list(rule.func(matched, context))
+            except Exception as exc:
+                produced = []
+                failed.append(f"{name}: {exc!r}")
+                logger.exception("Award rule %s failed on %d events", name, len(matched))
+                self.record_failure([name], exc)
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                rule.calls += 1
+                rule.events += len(matched)
+                rule.awards += len(produced)
+                rule.seconds += elapsed
+            RULE_EVALUATIONS.inc(award_type=name)
+            RULE_EVENTS.inc(len(matched), award_type=name)
+            RULE_SECONDS.observe(elapsed, award_type=name)
+            for award in produced:
+                AWARDS_PRODUCED.inc(award_type=award.award_type)
+            awards.extend(produced)
+        if failed and strict:
+            raise RuleError("Award rules failed: " + "; ".join(failed))
+        return awards
+
+    def record_failure(self, names: Iterable[str], exc: BaseException) -> None:
+        """Count a failure that skipped the awards of rules ``names``."""
+        for name in names:
+            rule = self._rules.get(name)
+            if rule is not None:
+                with self._lock:
+                    rule.errors += 1
+                    rule.last_error = repr(exc)
+            RULE_FAILURES.inc(award_type=name)
+
+    def stats(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "name": rule.name,
+                    "event_types": sorted(rule.event_types),
+                    "needs": sorted(rule.needs),
+                    "calls": rule.calls,
+                    "events": rule.events,
+                    "awards": rule.awards,
+                    "errors": rule.errors,
+                    "last_error": rule.last_error,
+                    "total_ms": round(rule.seconds * 1000, 3),
+                    "avg_ms": round(rule.seconds * 1000 / rule.calls, 3) if rule.calls else None,
+                }
+                for rule in self._rules.values()
+            ]
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for rule in self._rules.values():
+                rule.calls = rule.events = rule.awards = rule.errors = 0
+                rule.seconds = 0.0
+                rule.last_error = ""
+
+
+registry = RuleRegistry()
+
+
+@registry.register("SOLO_CLEAR", [EventType.DUNGEON_CLEAR], needs=["party"])
+def solo_clear(events: Sequence[Event], context: RuleContext) -> Iterable[Award]:
+    for event in events:
+        members = [context.players[str(p)] for p in details(event)["party_members"]
+                   if str(p) in context.players]
+        if len(members) == 1:
+            yield Award(
+                player=members[0],
+                award_type="SOLO_CLEAR",
+                event=event,
+                description="Solo dungeon clear",
+            )
+
+
+@registry.register("GUILD_HARMONY", [EventType.DUNGEON_CLEAR], needs=["party"])
+def guild_harmony(events: Sequence[Event], context: RuleContext) -> Iterable[Award]:
+    for event in events:
+        members = [context.players[str(p)] for p in details(event)["party_members"]
+                   if str(p) in context.players]
+        if event.guild_id and members and all(p.guild_id == event.guild_id for p in members):
+            for p in members:
+                yield Award(
+                    player=p,
+                    award_type="GUILD_HARMONY",
+                    event=event,
+                    description=f"GuildHarmony for guild {event.guild_id}",
+                )
+
+
+@registry.register("REVENGE_AWARD", [EventType.PLAYER_KILL], needs=["kill_facts"])
+def revenge(events: Sequence[Event], context: RuleContext) -> Iterable[Award]:
+    for event in events:
+        kill = context.facts[event.pk]
+        if kill["reverse_kills"] > 0:
+            yield Award(
+                player_id=event.player_id,
+                award_type="REVENGE_AWARD",
+                event=event,
+                description=f"Revenge against {kill['victim']}",
+            )
+
+
+@registry.register("RIVAL_SLAYER", [EventType.PLAYER_KILL], needs=["kill_facts"])
+def rival_slayer(events: Sequence[Event], context: RuleContext) -> Iterable[Award]:
+    for event in events:
+        kill = context.facts[event.pk]
+        if kill["kill_number"] == 2:
+            yield Award(
+                player_id=event.player_id,
+                award_type="RIVAL_SLAYER",
+                event=event,
+                description=f"Rival slayer of {kill['victim']} (kills: {kill['kill_number']})",
+            )
@@ -1,88 +1,117 @@
-import uuid
-from typing import Any, List, Optional, TYPE_CHECKING
-from django.db.models.signals import post_save
+import logging
+from typing import Any, Optional, Sequence
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
-from apps.events.models import Event, EventType
-from apps.awards.models import Award
+from apps.events.models import Event
+from apps.events.signals import events_created
 from apps.players.models import Player
+from apps.awards import outbox
+from apps.awards.detection import replay_kills, resolve_kills
+from apps.awards.kills import Kill, record_kills, retract_kills
+from apps.awards.leaderboard import apply_award_counts, create_awards, forget_player
+from apps.awards.models import Award
+from apps.awards.rules import registry
+
+logger = logging.getLogger(__name__)
 
+# When True, ingest only queues events in AwardOutbox and the
+# process_award_outbox command evaluates them.
+DEFERRED_EVALUATION: bool = getattr(settings, "AWARDS_DEFERRED_EVALUATION", False)
 
-def _get_player_by_identifier(pid: Any) -> Optional[Player]:
-    if pid is None:
-        return None
-    if isinstance(pid, Player):
-        return pid
+
+def _process_events(events: Sequence[Event]) -> None:
+    # Award detection never fails the ingest: each step runs in a savepoint
+    # and its failures are logged and counted per rule (registry.stats()).
+    # Rule calls and their loaders get their own savepoints in evaluate().
+    try:
+        # The kill-pair index is maintained with the insert, like the counters
+        with transaction.atomic():
+            kills = resolve_kills(events)
+            facts = replay_kills(kills, record_kills(kills))
+    except Exception as exc:
+        # backfill_kill_pairs rebuilds the index
+        logger.exception("Kill-pair index update failed on %d events", len(events))
+        registry.record_failure(registry.names(need="kill_facts"), exc)
+        facts = {}
+    if DEFERRED_EVALUATION:
+        outbox.enqueue(events, facts)
+        return
+    awards = registry.evaluate(events, facts)
     try:
-        uid = uuid.UUID(str(pid))
-        return Player.objects.filter(id=uid).first()
-    except Exception:
-        return Player.objects.filter(user__username=str(pid)).first()
+        with transaction.atomic():
+            create_awards(awards)
+    except Exception as exc:
+        logger.exception("Storing %d awards failed", len(awards))
+        registry.record_failure(sorted({award.award_type for award in awards}), exc)
+
+
+def _update_kill_index(retracted: Sequence[Kill], recorded: Sequence[Kill]) -> None:
+    if not retracted and not recorded:
+        return
+    try:
+        with transaction.atomic():
+            retract_kills(retracted)
+            record_kills(recorded)
+    except Exception as exc:
+        logger.exception("Kill-pair index update failed")
+        registry.record_failure(registry.names(need="kill_facts"), exc)
 
 
 @receiver(post_save, sender=Event)
 def detect_awards_on_event(sender: Any, instance: Event, created: bool, **kwargs: Any) -> None:
-    if not created:
+    if created:
+        _process_events([instance])
         return
-    event = instance
-    try:
-        if event.type == EventType.DUNGEON_CLEAR:
-            party = event.details.get("party_members") if isinstance(event.details, dict) else None
-            if party:
-                players: List[Optional[Player]] = [_get_player_by_identifier(p) for p in party]
-                players = [p for p in players if p]
-                if len(players) == 1:
-                    player = players[0]
-                    Award.objects.get_or_create(
-                        player=player,
-                        award_type="SOLO_CLEAR",
-                        event=event,
-                        defaults={"description": "Solo dungeon clear"},
-                    )
-                if getattr(event, "guild", None) and players:
-                    # Use getattr to avoid Pylance errors about dynamic Django attrs
-                    same_guild = all(
-                        (getattr(p, "guild_id", None) == getattr(event, "guild_id", None)) for p in players
-                    )
-                    if same_guild:
-                        for p in players:
-                            Award.objects.get_or_create(
-                                player=p,
-                                award_type="GUILD_HARMONY",
-                                event=event,
-                                defaults={"description": f"GuildHarmony for guild {getattr(event, 'guild_id', None)}"},
-                            )
-        elif event.type == EventType.PLAYER_KILL:
-            killer = event.player
-            target_identifier = event.details.get("target_id") if isinstance(event.details, dict) else None
-            target = _get_player_by_identifier(target_identifier)
-            if killer and target:
-                revenge_exists = Event.objects.filter(
-                    type=EventType.PLAYER_KILL,
-                    player=target,
-                    details__target_id=str(getattr(killer, "id", "")),
-                ).exists()
-                if revenge_exists:
-                    Award.objects.get_or_create(
-                        player=killer,
-                        award_type="REVENGE_AWARD",
-                        event=event,
-                        defaults={"description": f"Revenge against {getattr(target, 'id', None)}"},
-                    )
-
-                kill_count = Event.objects.filter(
-                    type=EventType.PLAYER_KILL, player=killer, details__target_id=str(getattr(target, "id", ""))
-                ).count()
-                if kill_count >= 2:
-                    exists = Award.objects.filter(
-                        player=killer, award_type="RIVAL_SLAYER", description__contains=str(getattr(target, "id", ""))
-                    ).exists()
-                    if not exists:
-                        Award.objects.create(
-                            player=killer,
-                            award_type="RIVAL_SLAYER",
-                            event=event,
-                            description=f"Rival slayer of {getattr(target, 'id', None)} (kills: {kill_count})",
-                        )
-    except Exception:
-        # Ensure signal processing never raises
+    # Set by apps.events.signals; an update can add, move or remove a kill
+    previous: Optional[Event] = getattr(instance, "_previous_state", None)
+    if previous is None:
+        return
+    before, after = resolve_kills([previous]), resolve_kills([instance])
+    if [kill[1:] for kill in before] != [kill[1:] for kill in after]:
+        _update_kill_index(before, after)
+
+
+@receiver(post_delete, sender=Event)
+def retract_deleted_kill(sender: Any, instance: Event, **kwargs: Any) -> None:
+    _update_kill_index(resolve_kills([instance]), [])
+
+
+@receiver(events_created, sender=Event)
+def detect_awards_on_events(sender: Any, events: Sequence[Event], **kwargs: Any) -> None:
+    _process_events(events)
+
+
+@receiver(pre_save, sender=Award)
+def remember_previous_award(sender: Any, instance: Award, **kwargs: Any) -> None:
+    if instance._state.adding or kwargs.get("raw"):
         return
+    # Keep what the award was counted as so a type/player change moves it
+    previous = Award.objects.filter(pk=instance.pk).values_list("player_id", "award_type").first()
+    setattr(instance, "_previous_key", previous)
+
+
+@receiver(post_save, sender=Award)
+def count_saved_award(sender: Any, instance: Award, created: bool, **kwargs: Any) -> None:
+    if kwargs.get("raw"):
+        return
+    key = (instance.player_id, instance.award_type)
+    previous = getattr(instance, "_previous_key", None)
+    if created or previous is None:
+        apply_award_counts([key])
+    elif previous != key:
+        apply_award_counts([previous], sign=-1)
+        apply_award_counts([key])
+
+
+@receiver(post_delete, sender=Award)
+def uncount_deleted_award(sender: Any, instance: Award, **kwargs: Any) -> None:
+    apply_award_counts([(instance.player_id, instance.award_type)], sign=-1)
+
+
+@receiver(pre_delete, sender=Player)
+def uncount_deleted_player(sender: Any, instance: Player, **kwargs: Any) -> None:
+    # Its PlayerAwardCount rows are removed by cascade, without signals
+    forget_player(instance.pk)
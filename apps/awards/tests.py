@@ -1,5 +1,26 @@
+import io
+from typing import Any
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError, connection
+from django.db.models import QuerySet
 from django.test import TestCase
-from apps.awards.models import Award
+from django.test.utils import CaptureQueriesContext
+from apps.awards import outbox, recompute, rules as rules_module
+from apps.awards.leaderboard import create_awards, ranks
+from apps.awards.models import (
+    Award,
+    AwardCountBucket,
+    AwardOutbox,
+    KillPair,
+    PlayerAwardCount,
+    RecomputeCheckpoint,
+)
+from apps.awards.rules import RULE_FAILURES, RULE_SECONDS, AwardRule, registry
+from apps.events.ingest import create_events
 from apps.events.models import Event, EventType
 from apps.players.models import Player
 from apps.guilds.models import Guild
@@ -88,3 +109,547 @@ class AwardsSignalsTests(TestCase):
         self.assertIsNotNone(rival)
         assert rival is not None  # type narrowing
         self.assertIn(str(self.player_b.id), (rival.description or ""))
+
+
+class AwardsBatchDetectionTests(TestCase):
+    def setUp(self) -> None:
+        self.guild = Guild.objects.create(name="BatchGuild", score="0")
+        self.players = [
+            Player.objects.create(user=User.objects.create(username=f"raider{i}"), guild=self.guild)
+            for i in range(4)
+        ]
+
+    def test_batch_awards_match_single_event_path(self) -> None:
+        a, b = self.players[0], self.players[1]
+        events = create_events([
+            Event(type=EventType.PLAYER_KILL, details={"target_id": str(b.id)}, player=a),
+            Event(type=EventType.PLAYER_KILL, details={"target_id": str(a.id)}, player=b),
+            Event(type=EventType.PLAYER_KILL, details={"target_id": str(b.id)}, player=a),
+        ])
+
+        # b avenges the first kill, a's second kill makes b a rival and is revenge too
+        self.assertTrue(
+            Award.objects.filter(player=b, award_type='REVENGE_AWARD', event=events[1]).exists()
+        )
+        self.assertTrue(
+            Award.objects.filter(player=a, award_type='REVENGE_AWARD', event=events[2]).exists()
+        )
+        self.assertFalse(Award.objects.filter(event=events[0]).exists())
+        self.assertEqual(Award.objects.filter(player=a, award_type='RIVAL_SLAYER').count(), 1)
+
+    def test_batch_resolves_party_by_username(self) -> None:
+        party = [p.user.username for p in self.players]
+        event, = create_events([
+            Event(
+                type=EventType.DUNGEON_CLEAR,
+                details={"party_members": party},
+                player=self.players[0],
+                guild=self.guild,
+            ),
+        ])
+        self.assertEqual(Award.objects.filter(award_type='GUILD_HARMONY', event=event).count(), 4)
+
+    def test_batch_detection_query_count(self) -> None:
+        party = [str(p.id) for p in self.players]
+        events = [
+            Event(type=EventType.DUNGEON_CLEAR, details={"party_members": party}, guild=self.guild)
+            for _ in range(10)
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            create_events(events)
+        player_lookups = [q for q in ctx.captured_queries if 'FROM "players_player"' in q["sql"]]
+        self.assertEqual(len(player_lookups), 1)
+        self.assertEqual(Award.objects.filter(award_type='GUILD_HARMONY').count(), 40)
+
+
+class KillPairIndexTests(TestCase):
+    def setUp(self) -> None:
+        self.a = Player.objects.create(user=User.objects.create(username="killer_a"))
+        self.b = Player.objects.create(user=User.objects.create(username="killer_b"))
+
+    def _kill(self, killer: Player, victim: Any) -> Event:
+        return Event.objects.create(
+            type=EventType.PLAYER_KILL, details={"target_id": victim}, player=killer
+        )
+
+    def test_pairs_maintained_at_ingest(self) -> None:
+        first = self._kill(self.a, str(self.b.id))
+        create_events([
+            Event(type=EventType.PLAYER_KILL, details={"target_id": "killer_b"}, player=self.a),
+            Event(type=EventType.PLAYER_KILL, details={"target_id": str(self.a.id)}, player=self.b),
+        ])
+        pair = KillPair.objects.get(pk=(self.a.id, self.b.id))
+        self.assertEqual(pair.kill_count, 2)
+        self.assertEqual(pair.first_kill_event_id, first.id)
+        self.assertNotEqual(pair.last_kill_event_id, first.id)
+        self.assertEqual(KillPair.objects.get(pk=(self.b.id, self.a.id)).kill_count, 1)
+
+    def test_kill_checks_do_not_scan_event_details(self) -> None:
+        self._kill(self.a, str(self.b.id))
+        with CaptureQueriesContext(connection) as ctx:
+            self._kill(self.b, str(self.a.id))
+        event_reads = [
+            q["sql"] for q in ctx.captured_queries
+            if q["sql"].startswith("SELECT") and 'FROM "events_event"' in q["sql"]
+        ]
+        self.assertEqual(event_reads, [])
+        self.assertTrue(Award.objects.filter(player=self.b, award_type='REVENGE_AWARD').exists())
+
+    def test_deleted_and_retyped_kills_are_retracted(self) -> None:
+        kills = [self._kill(self.a, str(self.b.id)) for _ in range(3)]
+        kills[0].delete()
+        self.assertEqual(KillPair.objects.get(pk=(self.a.id, self.b.id)).kill_count, 2)
+
+        kills[1].type = EventType.OTHER
+        kills[1].save()
+        self.assertEqual(KillPair.objects.get(pk=(self.a.id, self.b.id)).kill_count, 1)
+        # Re-targeted: moves to the other pair
+        kills[2].player = self.b
+        kills[2].details = {"target_id": str(self.a.id)}
+        kills[2].save()
+        self.assertFalse(KillPair.objects.filter(pk=(self.a.id, self.b.id)).exists())
+        self.assertEqual(KillPair.objects.get(pk=(self.b.id, self.a.id)).kill_count, 1)
+
+        # Back to a PLAYER_KILL: counted again
+        kills[1].type = EventType.PLAYER_KILL
+        kills[1].save()
+        self.assertEqual(KillPair.objects.get(pk=(self.a.id, self.b.id)).kill_count, 1)
+        # A revenge award no longer sees the deleted kills
+        Event.objects.filter(pk__in=[kills[1].pk, kills[2].pk]).delete()
+        self.assertFalse(KillPair.objects.exists())
+        self._kill(self.b, str(self.a.id))
+        self.assertFalse(Award.objects.filter(player=self.b, award_type='REVENGE_AWARD').exists())
+
+    def test_backfill_rebuilds_from_events(self) -> None:
+        for _ in range(3):
+            self._kill(self.a, str(self.b.id))
+        self._kill(self.b, "killer_a")
+        KillPair.objects.all().delete()
+
+        call_command("backfill_kill_pairs", "--chunk-size", "2", stdout=io.StringIO())
+
+        self.assertEqual(KillPair.objects.get(pk=(self.a.id, self.b.id)).kill_count, 3)
+        self.assertEqual(KillPair.objects.get(pk=(self.b.id, self.a.id)).kill_count, 1)
+
+
+@mock.patch("apps.awards.signals.DEFERRED_EVALUATION", True)
+class DeferredAwardEvaluationTests(TestCase):
+    def setUp(self) -> None:
+        self.guild = Guild.objects.create(name="QueueGuild", score="0")
+        self.a = Player.objects.create(
+            user=User.objects.create(username="queued_a"), guild=self.guild
+        )
+        self.b = Player.objects.create(
+            user=User.objects.create(username="queued_b"), guild=self.guild
+        )
+
+    def _kill(self, killer: Player, victim: Player) -> Event:
+        return Event(
+            type=EventType.PLAYER_KILL, details={"target_id": str(victim.id)}, player=killer
+        )
+
+    def test_ingest_only_queues(self) -> None:
+        events = create_events([
+            self._kill(self.a, self.b),
+            Event(type=EventType.DUNGEON_CLEAR, details={"party_members": [str(self.a.id)]}),
+            Event(type=EventType.OTHER, details={}, player=self.a),
+        ])
+        self.assertFalse(Award.objects.exists())
+        self.assertEqual(AwardOutbox.objects.count(), 2)
+        self.assertEqual(KillPair.objects.get(pk=(self.a.id, self.b.id)).kill_count, 1)
+
+        self.assertEqual(outbox.drain(), 2)
+        self.assertFalse(AwardOutbox.objects.exists())
+        self.assertTrue(Award.objects.filter(award_type='SOLO_CLEAR', event=events[1]).exists())
+
+    def test_kill_awards_independent_of_drain_order(self) -> None:
+        first = create_events([self._kill(self.a, self.b)])[0]
+        revenge = create_events([self._kill(self.b, self.a)])[0]
+        rival = create_events([self._kill(self.a, self.b)])[0]
+
+        # Drain the later events first; facts recorded at ingest keep the outcome
+        outbox.drain(partitions=[outbox.partition_for(revenge)])
+        outbox.drain()
+
+        self.assertFalse(Award.objects.filter(event=first).exists())
+        self.assertTrue(
+            Award.objects.filter(player=self.b, award_type='REVENGE_AWARD', event=revenge).exists()
+        )
+        self.assertTrue(
+            Award.objects.filter(player=self.a, award_type='RIVAL_SLAYER', event=rival).exists()
+        )
+        self.assertTrue(
+            Award.objects.filter(player=self.a, award_type='REVENGE_AWARD', event=rival).exists()
+        )
+
+    def test_failing_rows_are_retried_then_parked(self) -> None:
+        create_events([self._kill(self.a, self.b), self._kill(self.b, self.a)])
+
+        @registry.register("FLAKY", [EventType.PLAYER_KILL], needs=["kill_facts"])
+        def flaky(events: Any, context: Any) -> Any:
+            if any(e.player_id == self.a.id for e in events):
+                raise RuntimeError("boom")
+            return []
+        self.addCleanup(registry.remove, "FLAKY")
+
+        with self.assertLogs("apps.awards.rules", "ERROR"):
+            outbox.drain()
+
+        parked = AwardOutbox.objects.get()
+        self.assertEqual(parked.attempts, outbox.MAX_ATTEMPTS)
+        self.assertIn("boom", parked.last_error)
+        self.assertTrue(Award.objects.filter(player=self.b, award_type='REVENGE_AWARD').exists())
+        self.assertEqual(outbox.queue_stats()["failed"], 1)
+
+    def test_queue_stats_and_worker_command(self) -> None:
+        create_events([self._kill(self.a, self.b), self._kill(self.a, self.b)])
+        response = self.client.get("/api/awards/queue/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["depth"], 2)
+        self.assertGreaterEqual(response.data["lag_seconds"], 0)
+
+        out = io.StringIO()
+        call_command("process_award_outbox", "--once", "--batch-size", "1", stdout=out)
+        self.assertIn("2 eventos avaliados", out.getvalue())
+        self.assertEqual(outbox.queue_stats()["depth"], 0)
+        self.assertEqual(Award.objects.filter(award_type='RIVAL_SLAYER').count(), 1)
+
+
+class AwardRuleRegistryTests(TestCase):
+    def setUp(self) -> None:
+        self.a = Player.objects.create(user=User.objects.create(username="rules_a"))
+        self.b = Player.objects.create(user=User.objects.create(username="rules_b"))
+        registry.reset_stats()
+
+    def _register(self, name: str, event_types: list[str], func: Any) -> None:
+        registry.add(AwardRule(name, frozenset(event_types), frozenset(), func))
+        self.addCleanup(registry.remove, name)
+
+    def test_dispatch_only_reaches_matching_rules(self) -> None:
+        seen: list[str] = []
+
+        def level_up(events: Any, context: Any) -> list[Award]:
+            seen.extend(str(e.type) for e in events)
+            return [
+                Award(
+                    player_id=e.player_id, award_type="SOLO_CLEAR", event=e, description="seasonal"
+                )
+                for e in events
+            ]
+
+        self._register("SEASONAL_LEVEL", [EventType.PLAYER_LEVEL_UP], level_up)
+        create_events([
+            Event(type=EventType.PLAYER_LEVEL_UP, details={}, player=self.a),
+            Event(type=EventType.PLAYER_KILL, details={"target_id": str(self.b.id)}, player=self.a),
+            Event(type=EventType.ITEM_PURCHASE, details={}, player=self.a),
+        ])
+        self.assertEqual(seen, ["PLAYER_LEVEL_UP"])
+        self.assertEqual(Award.objects.filter(description="seasonal").count(), 1)
+        stats = {s["name"]: s for s in registry.stats()}
+        self.assertEqual(stats["SEASONAL_LEVEL"]["events"], 1)
+        self.assertEqual(stats["RIVAL_SLAYER"]["calls"], 1)
+        self.assertEqual(stats["SOLO_CLEAR"]["calls"], 0)
+
+    def test_failing_rule_is_counted_and_isolated(self) -> None:
+        def broken(events: Any, context: Any) -> list[Award]:
+            raise ValueError("bad rule")
+
+        self._register("BROKEN", [EventType.PLAYER_KILL], broken)
+        failures = RULE_FAILURES.value(award_type="BROKEN")
+        timed = RULE_SECONDS.count(award_type="BROKEN")
+        with self.assertLogs("apps.awards.rules", "ERROR") as logs:
+            create_events([Event(
+                type=EventType.PLAYER_KILL, details={"target_id": str(self.b.id)}, player=self.a
+            )])
+            revenge, = create_events([Event(
+                type=EventType.PLAYER_KILL, details={"target_id": str(self.a.id)}, player=self.b
+            )])
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(RULE_FAILURES.value(award_type="BROKEN") - failures, 2)
+        self.assertEqual(RULE_SECONDS.count(award_type="BROKEN") - timed, 2)
+
+        self.assertTrue(Award.objects.filter(award_type='REVENGE_AWARD', event=revenge).exists())
+        response = self.client.get("/api/awards/rules/")
+        self.assertEqual(response.status_code, 200)
+        broken_stats = next(s for s in response.data if s["name"] == "BROKEN")
+        self.assertEqual(broken_stats["errors"], 2)
+        self.assertIn("bad rule", broken_stats["last_error"])
+        self.assertIsNotNone(broken_stats["avg_ms"])
+
+    def test_detection_failures_are_counted_and_never_fail_ingest(self) -> None:
+        def load_party(events: Any, context: Any) -> None:
+            raise DatabaseError("party lookup failed")
+
+        party_rules = registry.names(need="party")
+        kill_rules = registry.names(need="kill_facts")
+        before = {name: RULE_FAILURES.value(award_type=name) for name in party_rules + kill_rules}
+        needs = {"party": (rules_module._has_party, load_party)}
+        kill_index = DatabaseError("kill index")
+        with mock.patch.dict("apps.awards.rules.NEEDS", needs), \
+                mock.patch("apps.awards.signals.record_kills", side_effect=kill_index), \
+                self.assertLogs("apps.awards", "ERROR"):
+            events = create_events([
+                Event(type=EventType.DUNGEON_CLEAR, details={"party_members": [str(self.a.id)]}),
+                Event(
+                    type=EventType.PLAYER_KILL, details={"target_id": str(self.b.id)}, player=self.a
+                ),
+            ])
+            # The savepoints kept the ingest transaction usable
+            self.assertEqual(Event.objects.filter(pk__in=[e.pk for e in events]).count(), 2)
+        for name in party_rules + kill_rules:
+            self.assertEqual(RULE_FAILURES.value(award_type=name) - before[name], 1, name)
+        self.assertFalse(Award.objects.exists())
+
+    def test_failed_award_insert_is_counted(self) -> None:
+        before = RULE_FAILURES.value(award_type="SOLO_CLEAR")
+        failure = DatabaseError("insert failed")
+        with mock.patch("apps.awards.signals.create_awards", side_effect=failure), \
+                self.assertLogs("apps.awards.signals", "ERROR"):
+            event = Event.objects.create(
+                type=EventType.DUNGEON_CLEAR, details={"party_members": [str(self.a.id)]}
+            )
+        self.assertTrue(Event.objects.filter(pk=event.pk).exists())
+        self.assertEqual(RULE_FAILURES.value(award_type="SOLO_CLEAR") - before, 1)
+        stats = {s["name"]: s for s in registry.stats()}
+        self.assertIn("insert failed", stats["SOLO_CLEAR"]["last_error"])
+
+
+class RecomputeAwardsTests(TestCase):
+    def setUp(self) -> None:
+        self.guild = Guild.objects.create(name="HistoryGuild", score="0")
+        self.a = Player.objects.create(
+            user=User.objects.create(username="hist_a"), guild=self.guild
+        )
+        self.b = Player.objects.create(
+            user=User.objects.create(username="hist_b"), guild=self.guild
+        )
+        self.events = create_events([
+            Event(type=EventType.PLAYER_KILL, details={"target_id": str(self.b.id)}, player=self.a),
+            Event(type=EventType.PLAYER_KILL, details={"target_id": "hist_a"}, player=self.b),
+            Event(type=EventType.PLAYER_KILL, details={"target_id": str(self.b.id)}, player=self.a),
+            Event(
+                type=EventType.DUNGEON_CLEAR,
+                details={"party_members": [str(self.a.id), str(self.b.id)]},
+                guild=self.guild,
+            ),
+        ])
+        self.expected = set(Award.objects.values_list("player_id", "award_type", "event_id"))
+
+    def _run(self, *args: str) -> str:
+        out = io.StringIO()
+        call_command("recompute_awards", *args, stdout=out)
+        return out.getvalue()
+
+    def test_recompute_restores_deleted_awards(self) -> None:
+        Award.objects.all().delete()
+        output = self._run("--chunk-size", "1")
+        self.assertIn("4 eventos reavaliados", output)
+        awarded = Award.objects.values_list("player_id", "award_type", "event_id")
+        self.assertEqual(set(awarded), self.expected)
+
+        # Running again is a no-op thanks to the unique constraint
+        self.assertIn("0 prêmios criados", self._run())
+        self.assertEqual(Award.objects.count(), len(self.expected))
+
+    def test_created_counts_inserted_rows_only(self) -> None:
+        Award.objects.all().delete()
+        real = recompute.create_awards
+        raced: list[Award] = []
+
+        def racing(awards: list[Award]) -> list[Award]:
+            # A concurrent writer stores one of them first
+            if awards and not raced:
+                first = awards[0]
+                raced.append(first)
+                Award.objects.create(
+                    player_id=first.player_id, award_type=first.award_type, event_id=first.event_id
+                )
+            return real(awards)
+
+        with mock.patch("apps.awards.recompute.create_awards", racing):
+            result = recompute.recompute_awards()
+        self.assertEqual(sum(result["missing"].values()), len(self.expected))
+        self.assertEqual(result["created"], len(self.expected) - 1)
+        self.assertEqual(Award.objects.count(), len(self.expected))
+
+    def test_dry_run_diffs_without_writing(self) -> None:
+        Award.objects.filter(award_type='REVENGE_AWARD').delete()
+        Award.objects.create(player=self.a, award_type='SOLO_CLEAR', event=self.events[3])
+
+        output = self._run("--dry-run", "--rules", "REVENGE_AWARD,SOLO_CLEAR")
+        self.assertIn("+ REVENGE_AWARD: 2 seriam criados", output)
+        self.assertIn("- SOLO_CLEAR: 1 não concedidos mais", output)
+        self.assertFalse(Award.objects.filter(award_type='REVENGE_AWARD').exists())
+
+        self._run("--rules", "SOLO_CLEAR", "--prune")
+        self.assertFalse(Award.objects.filter(award_type='SOLO_CLEAR').exists())
+        self.assertFalse(Award.objects.filter(award_type='REVENGE_AWARD').exists())
+
+    def test_date_range_uses_earlier_kills(self) -> None:
+        Award.objects.filter(award_type='RIVAL_SLAYER').delete()
+        since = self.events[2].created_at.isoformat()
+        self._run("--rules", "RIVAL_SLAYER", "--since", since)
+        rival = Award.objects.get(award_type='RIVAL_SLAYER')
+        self.assertEqual(rival.event_id, self.events[2].id)
+
+    def test_resume_from_checkpoint(self) -> None:
+        Award.objects.all().delete()
+        real = recompute.evaluate_partition
+        calls = {"n": 0}
+
+        def crash_on_third(*args: Any) -> Any:
+            calls["n"] += 1
+            if calls["n"] == 3:
+                raise RuntimeError("crash")
+            return real(*args)
+
+        with mock.patch("apps.awards.recompute.evaluate_partition", crash_on_third):
+            with self.assertRaises(RuntimeError):
+                self._run("--chunk-size", "1", "--checkpoint", "nightly")
+
+        checkpoint = RecomputeCheckpoint.objects.get(name="nightly")
+        self.assertEqual(checkpoint.events, 2)
+        self.assertEqual(checkpoint.last_event_id, self.events[1].id)
+
+        output = self._run("--chunk-size", "1", "--checkpoint", "nightly", "--resume")
+        self.assertIn("4 eventos reavaliados", output)
+        awarded = Award.objects.values_list("player_id", "award_type", "event_id")
+        self.assertEqual(set(awarded), self.expected)
+
+        with self.assertRaises(CommandError):
+            self._run("--checkpoint", "nightly", "--resume", "--rules", "SOLO_CLEAR")
+
+
+class AwardLeaderboardTests(TestCase):
+    def setUp(self) -> None:
+        self.players = [
+            Player.objects.create(user=User.objects.create(username=f"ranked{i}")) for i in range(5)
+        ]
+        # ranked0: 3 awards, ranked1 and ranked2: 2 each, ranked3: 1, ranked4: none
+        events = create_events([Event(type=EventType.OTHER, details={}) for _ in range(3)])
+        for player, n in zip(self.players, [3, 2, 2, 1]):
+            for event in events[:n]:
+                Award.objects.create(player=player, award_type='SOLO_CLEAR', event=event)
+        Award.objects.create(player=self.players[3], award_type='RIVAL_SLAYER', event=events[0])
+        self.events = events
+
+    def test_top_with_ranks_and_cursor(self) -> None:
+        response = self.client.get("/api/awards/leaderboard/", {"page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        first = response.data["results"]
+        self.assertEqual([r["player__user__username"] for r in first][0], "ranked0")
+        self.assertEqual([r["rank"] for r in first], [1, 2])
+
+        response = self.client.get(response.data["next"])
+        second = response.data["results"]
+        self.assertEqual([r["rank"] for r in second], [2, 2])
+        self.assertEqual({r["awards_count"] for r in second}, {2})
+        self.assertEqual(len({r["player__id"] for r in first + second}), 4)
+
+    def test_rank_lookup_and_type_board(self) -> None:
+        response = self.client.get(
+            "/api/awards/leaderboard/", {"player_id": str(self.players[2].id)}
+        )
+        self.assertEqual(response.data["rank"], 2)
+        self.assertEqual(response.data["awards_count"], 2)
+
+        response = self.client.get(
+            "/api/awards/leaderboard/",
+            {"player_id": str(self.players[3].id), "award_type": "SOLO_CLEAR"},
+        )
+        self.assertEqual(response.data["rank"], 4)
+
+        response = self.client.get("/api/awards/leaderboard/", {"award_type": "RIVAL_SLAYER"})
+        usernames = [r["player__user__username"] for r in response.data["results"]]
+        self.assertEqual(usernames, ["ranked3"])
+
+        response = self.client.get(
+            "/api/awards/leaderboard/", {"player_id": str(self.players[4].id)}
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get("/api/awards/leaderboard/", {"award_type": "NOPE"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIsInstance(response.data["error"], str)
+
+    def test_counts_follow_deletes_updates_and_batches(self) -> None:
+        Award.objects.filter(player=self.players[0]).delete()
+        award = Award.objects.get(player=self.players[3], award_type='RIVAL_SLAYER')
+        award.award_type = 'REVENGE_AWARD'
+        award.save()
+        create_awards([
+            Award(player=self.players[4], award_type='SOLO_CLEAR', event=event)
+            for event in self.events
+        ] + [Award(player=self.players[1], award_type='SOLO_CLEAR', event=self.events[0])])
+
+        board = dict(
+            PlayerAwardCount.objects.filter(award_type='SOLO_CLEAR')
+            .values_list("player_id", "count")
+        )
+        self.assertEqual(board[self.players[0].id], 0)
+        self.assertEqual(board[self.players[4].id], 3)
+        self.assertEqual(board[self.players[1].id], 2)
+        self.assertFalse(
+            PlayerAwardCount.objects.filter(award_type='RIVAL_SLAYER', count__gt=0).exists()
+        )
+        call_command("rebuild_award_leaderboard", "--check", stdout=io.StringIO())
+
+    def test_ranks_read_count_buckets(self) -> None:
+        buckets = dict(
+            AwardCountBucket.objects.filter(award_type='SOLO_CLEAR', players__gt=0)
+            .values_list("count", "players")
+        )
+        self.assertEqual(buckets, {3: 1, 2: 2, 1: 1})
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(ranks([1, 2, 3], 'SOLO_CLEAR'), {3: 1, 2: 2, 1: 4})
+        self.assertEqual(len(queries), 1)
+        self.assertIn("awards_awardcountbucket", queries[0]["sql"])
+
+        # A deleted player's rows go by cascade; the buckets follow
+        self.players[1].user.delete()
+        self.assertEqual(ranks([1], 'SOLO_CLEAR'), {1: 3})
+        call_command("rebuild_award_leaderboard", "--check", stdout=io.StringIO())
+
+    def test_award_inserted_concurrently_is_not_counted_twice(self) -> None:
+        player = self.players[4]
+        bulk_create = QuerySet.bulk_create
+
+        def racing(queryset: Any, objs: Any, **kwargs: Any) -> Any:
+            # Another writer stores the same award between the check and the insert
+            if objs and isinstance(objs[0], Award):
+                bulk_create(Award.objects.all(), [
+                    Award(player=player, award_type='REVENGE_AWARD', event=self.events[0])
+                ])
+            return bulk_create(queryset, objs, **kwargs)
+
+        with mock.patch.object(QuerySet, "bulk_create", racing):
+            created = create_awards([
+                Award(player=player, award_type='REVENGE_AWARD', event=self.events[0]),
+                Award(player=player, award_type='SOLO_CLEAR', event=self.events[0]),
+            ])
+        self.assertEqual([award.award_type for award in created], ['SOLO_CLEAR'])
+        board = dict(
+            PlayerAwardCount.objects.filter(player=player).values_list("award_type", "count")
+        )
+        # The other writer's award is counted by that writer, not here
+        self.assertEqual(board, {'SOLO_CLEAR': 1, PlayerAwardCount.ALL_TYPES: 1})
+
+    async def test_async_view_matches_sync(self) -> None:
+        cases = [
+            {"page_size": 2},
+            {"player_id": str(self.players[2].id)},
+            {"player_id": str(self.players[4].id)},
+            {"player_id": "nope"},
+            {"award_type": "NOPE"},
+        ]
+        for params in cases:
+            with mock.patch("apps.core.aio.sync_view") as fallback:
+                served = await self.async_client.get("/api/awards/leaderboard/", params)
+            self.assertFalse(fallback.called)
+            expected = await sync_to_async(self.client.get)("/api/awards/leaderboard/", params)
+            self.assertEqual(
+                (served.status_code, served.json()), (expected.status_code, expected.json())
+            )
+
+    def test_leaderboard_query_count(self) -> None:
+        with self.assertNumQueries(2):
+            self.client.get("/api/awards/leaderboard/")
@@ -1,11 +1,50 @@
-from typing import Any
-from rest_framework import viewsets
+import uuid
+from typing import Any, Mapping, Optional
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count, QuerySet
+from django.db.models import QuerySet
 
+from apps.awards import outbox
+from apps.awards.leaderboard import ALL_TYPES, board, ranks
 from apps.awards.models import Award
+from apps.awards.pagination import LeaderboardPagination
+from apps.awards.rules import registry
 from apps.awards.serializers import AwardSerializer
+from apps.core.instrumentation import span
+
+
+def leaderboard_query(params: Mapping[str, str]) -> tuple[QuerySet[Any], str, Optional[str]]:
+    """Board rows for ``?award_type=`` and the ``?player_id=`` asked for, if any.
+
+    Raises ``ValueError``, with the message for the client, for an unknown
+    award type or a malformed player id.
+    """
+    award_type = params.get('award_type', ALL_TYPES)
+    if award_type and award_type not in dict(Award.AWARD_TYPES):
+        raise ValueError(f'award_type deve ser um de: {", ".join(dict(Award.AWARD_TYPES))}')
+    player_id = params.get('player_id') or None
+    if player_id:
+        try:
+            uuid.UUID(player_id)
+        except ValueError as exc:
+            raise ValueError('player_id inválido') from exc
+    rows = board(award_type).values('player_id', 'player__user__username', 'count')
+    return rows, award_type, player_id
+
+
+def leaderboard_entries(rows: list[dict[str, Any]], award_type: str) -> list[dict[str, Any]]:
+    rank_of = ranks((row['count'] for row in rows), award_type)
+    with span('serialize'):
+        return [
+            {
+                'rank': rank_of[row['count']],
+                'player__id': str(row['player_id']),
+                'player__user__username': row['player__user__username'],
+                'awards_count': row['count'],
+            }
+            for row in rows
+        ]
 
 
 class AwardViewSet(viewsets.ModelViewSet[Any]):
@@ -29,23 +68,32 @@ class AwardViewSet(viewsets.ModelViewSet[Any]):
 
     @action(detail=False, methods=['get'])
     def leaderboard(self, request: Any) -> Response:
-        player_awards: dict[str, dict[str, Any]] = {}
-        for award in Award.objects.all():
-            if award.player:
-                key = award.player.user.username
-                if key not in player_awards:
-                    player_awards[key] = {
-                        'player__user__username': key,
-                        'player__id': str(award.player.id),
-                        'awards_count': 0
-                    }
-                player_awards[key]['awards_count'] += 1
-        
-        # Sort and return top 20
-        sorted_players = sorted(
-            player_awards.values(),
-            key=lambda x: x['awards_count'],
-            reverse=True
-        )[:20]
-        
-        return Response(sorted_players)
+        # Lido da tabela PlayerAwardCount, mantida a cada prêmio criado ou removido
+        try:
+            rows, award_type, player_id = leaderboard_query(request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Posição de um jogador específico
+        if player_id:
+            row = rows.filter(player_id=player_id).first()
+            if row is None:
+                return Response(
+                    {'error': 'Jogador sem prêmios neste ranking'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            return Response(leaderboard_entries([row], award_type)[0])
+
+        paginator = LeaderboardPagination()
+        page = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response(leaderboard_entries(page, award_type))
+
+    @action(detail=False, methods=['get'])
+    def queue(self, request: Any) -> Response:
+        # Profundidade e atraso da fila de avaliação adiada
+        return Response(outbox.queue_stats())
+
+    @action(detail=False, methods=['get'])
+    def rules(self, request: Any) -> Response:
+        # Regras registradas, com tempo de execução e contagem de erros
+        return Response(registry.stats())
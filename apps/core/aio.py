@@ -0,0 +1,104 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from typing import Any, Awaitable, Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+from django.urls import resolve
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, NotAcceptable
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+# Run independent read queries of one async request at the same time, each
+# on its own worker thread and connection. Off: they run one after another
+# on the request's thread, as Django's async ORM does.
+CONCURRENT_QUERIES: bool = getattr(settings, "ASYNC_CONCURRENT_QUERIES", True)
+# Threads (and so database connections) those queries share, per process
+QUERY_THREADS: int = getattr(settings, "ASYNC_QUERY_THREADS", 4)
+
+AsyncView = Callable[..., Awaitable[HttpResponse]]
+
+_query_pool = ThreadPoolExecutor(max_workers=QUERY_THREADS, thread_name_prefix="async-query")
+
+
+def _on_pool_connection(query: Callable[[], Any]) -> Callable[[], Any]:
+    def run() -> Any:
+        # Each pool thread keeps its connection from one query to the next,
+        # even with CONN_MAX_AGE = 0: opening one per query would cost more
+        # than running the queries in turn. A connection that raised is
+        # checked and replaced, like Django does between requests.
+        for connection in connections.all(initialized_only=True):
+            if connection.settings_dict["CONN_MAX_AGE"] != 0:
+                connection.close_if_unusable_or_obsolete()
+            elif connection.errors_occurred and not connection.is_usable():
+                connection.close()
+        return query()
+    return run
+
+
+async def concurrently(*queries: Callable[[], Any]) -> list[Any]:
+    """Results of the sync callables ``queries``, evaluated concurrently.
+
+    Django's async ORM runs every query of a request on one thread, so
+    awaiting several at once still runs them in turn. Here each one runs on
+    a thread of a pool of ``QUERY_THREADS`` (each with its own persistent
+    connection), and the request waits for the slowest instead of the sum.
+    Each callable must fully evaluate its queryset (``list(...)``,
+    ``.aggregate(...)``) and only read.
+    """
+    if not CONCURRENT_QUERIES:
+        return [await sync_to_async(query)() for query in queries]
+    return list(await asyncio.gather(*(
+        sync_to_async(_on_pool_connection(query), thread_sensitive=False, executor=_query_pool)()
+        for query in queries
+    )))
+
+
+def json_response(data: Any, status: int = 200) -> HttpResponse:
+    return HttpResponse(JSONRenderer().render(data), content_type="application/json", status=status)
+
+
+def renders_json(request: Request) -> bool:
+    """Whether DRF's content negotiation would answer ``request`` with the plain JSON renderer."""
+    renderers = [renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES]
+    negotiation = api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS()
+    try:
+        renderer, _ = negotiation.select_renderer(request, renderers)
+    except NotAcceptable:
+        return False
+    return type(renderer) is JSONRenderer
+
+
+async def sync_view(request: HttpRequest) -> HttpResponse:
+    """The response of the view ``ROOT_URLCONF`` routes ``request`` to."""
+    match = resolve(request.path_info, urlconf=settings.ROOT_URLCONF)
+    return await sync_to_async(match.func)(request, *match.args, **match.kwargs)
+
+
+def async_read_view(view: AsyncView) -> AsyncView:
+    """An async twin of a DRF read endpoint, mounted over it in the ASGI urlconf.
+
+    ``view`` gets the DRF ``Request`` and only serves anonymous-or-session
+    GETs negotiated to JSON; writes, other formats (browsable API,
+    MessagePack) and token-authenticated requests, whose token DRF must
+    check, go to the sync view at the same path (``sync_view``).
+    ``APIException`` is rendered as DRF's exception handler would.
+    """
+    @wraps(view)
+    async def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        drf_request = Request(request)
+        token = "HTTP_AUTHORIZATION" in request.META
+        if request.method != "GET" or token or not renders_json(drf_request):
+            return await sync_view(request)
+        try:
+            return await view(drf_request, *args, **kwargs)
+        except APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, (dict, list)) else {"detail": exc.detail}
+            return json_response(detail, status=exc.status_code)
+    # As DRF views: CSRF is enforced by SessionAuthentication on writes, in the sync view
+    return csrf_exempt(wrapper)
@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+MISSING: Any = object()
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU mapping with optional per-entry TTL.
+
+    Counts hits, misses and evictions so callers can size it from real
+    traffic. ``on_evict(key, value)`` is called, outside the lock, for
+    entries dropped to make room or because they expired.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: Optional[float] = None,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        expired: Any = MISSING
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self.ttl is not None and entry[1] < time.monotonic():
+                expired = self._data.pop(key)[0]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+        if expired is not MISSING and self.on_evict:
+            self.on_evict(key, expired)
+        return default if entry is None else entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl is not None else 0.0
+        evicted: list[tuple[Hashable, Any]] = []
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                old_key, (old_value, _) = self._data.popitem(last=False)
+                evicted.append((old_key, old_value))
+                self.evictions += 1
+        if self.on_evict:
+            for old_key, old_value in evicted:
+                self.on_evict(old_key, old_value)
+
+    def pop(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return MISSING if entry is None else entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
@@ -0,0 +1,68 @@
+from typing import Any, Mapping, Sequence
+
+from django.db import connections, models, router
+from django.db.models import F
+
+UPSERT_BATCH_SIZE = 500
+
+
+def increment_counts(
+    model: type[models.Model],
+    key_fields: Sequence[str],
+    deltas: Mapping[tuple[Any, ...], int],
+    count_field: str = "count",
+) -> None:
+    """Add ``deltas[key]`` to ``count_field`` of the row identified by ``key``.
+
+    ``key_fields`` must be covered by a unique constraint on ``model``. Positive
+    deltas are applied with ``INSERT ... ON CONFLICT DO UPDATE`` (one statement
+    per ``UPSERT_BATCH_SIZE`` keys), creating missing rows. Negative deltas only
+    touch rows that still exist, so retracting from a pruned row never
+    recreates it.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    using = router.db_for_write(model)
+    connection = connections[using]
+    increments = [(key, delta) for key, delta in deltas.items() if delta > 0]
+    decrements = [(key, delta) for key, delta in deltas.items() if delta < 0]
+
+    if increments and connection.vendor in ("sqlite", "postgresql"):
+        qn = connection.ops.quote_name
+        fields = [model._meta.get_field(name) for name in key_fields]
+        count = model._meta.get_field(count_field)
+        table = qn(model._meta.db_table)
+        columns = [qn(f.column) for f in fields]  # type: ignore[union-attr]
+        count_column = qn(count.column)  # type: ignore[union-attr]
+        row_sql = "(" + ", ".join(["%s"] * (len(fields) + 1)) + ")"
+        with connection.cursor() as cursor:
+            for start in range(0, len(increments), UPSERT_BATCH_SIZE):
+                batch = increments[start:start + UPSERT_BATCH_SIZE]
+                params: list[Any] = []
+                for key, delta in batch:
+                    params.extend(
+                        f.get_db_prep_value(value, connection)  # type: ignore[union-attr]
+                        for f, value in zip(fields, key)
+                    )
+                    params.append(delta)
+                cursor.execute(
+                    f"INSERT INTO {table} ({', '.join(columns)}, {count_column}) "
+                    f"VALUES {', '.join([row_sql] * len(batch))} "
+                    f"ON CONFLICT ({', '.join(columns)}) DO UPDATE SET "
+                    f"{count_column} = {table}.{count_column} + excluded.{count_column}",
+                    params,
+                )
+    elif increments:
+        for key, delta in increments:
+            lookup = dict(zip(key_fields, key))
+            updated = model._default_manager.using(using).filter(**lookup).update(
+                **{count_field: F(count_field) + delta}
+            )
+            if not updated:
+                model._default_manager.using(using).create(**lookup, **{count_field: delta})
+
+    for key, delta in decrements:
+        model._default_manager.using(using).filter(**dict(zip(key_fields, key))).update(
+            **{count_field: F(count_field) + delta}
+        )
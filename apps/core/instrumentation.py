@@ -0,0 +1,239 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from apps.core.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Share of requests measured; 0 turns the middleware into a pass-through
+SAMPLE_RATE: float = getattr(settings, "REQUEST_METRICS_SAMPLE_RATE", 0.0)
+# A sampled request over either budget is logged and counted on its route
+QUERY_BUDGET: Optional[int] = getattr(settings, "REQUEST_QUERY_BUDGET", 30)
+LATENCY_BUDGET_MS: Optional[float] = getattr(settings, "REQUEST_LATENCY_BUDGET_MS", 500.0)
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# The same sampled requests, for /metrics
+REQUEST_SECONDS = Histogram(
+    "eventhub_request_seconds", "Duration of sampled requests, by route", ["method", "view"]
+)
+REQUEST_QUERIES = Histogram(
+    "eventhub_request_queries",
+    "SQL queries of sampled requests, by route",
+    ["method", "view"],
+    buckets=QUERY_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "eventhub_request_db_seconds", "Time in SQL of sampled requests, by route", ["method", "view"]
+)
+REQUEST_OVER_BUDGET = Counter(
+    "eventhub_request_over_budget_total",
+    "Sampled requests over REQUEST_QUERY_BUDGET or REQUEST_LATENCY_BUDGET_MS, by route and budget",
+    ["method", "view", "budget"],
+)
+
+
+class RequestMetrics:
+    """What one sampled request spent, in seconds; filled from any thread serving it."""
+
+    __slots__ = ("started", "queries", "db", "spans", "view_started", "view", "render", "_lock")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.spans: dict[str, float] = {}
+        self.view_started: Optional[float] = None
+        self.view: Optional[float] = None
+        self.render: Optional[float] = None
+        # Async views run their queries on several threads at once
+        self._lock = threading.Lock()
+
+    def add_query(self, seconds: float) -> None:
+        with self._lock:
+            self.queries += 1
+            self.db += seconds
+
+    def add_span(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def current() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+def activate(metrics: Optional[RequestMetrics]) -> Any:
+    """Make ``metrics`` the current request's; returns the token for ``deactivate``."""
+    return _current.set(metrics)
+
+
+def deactivate(token: Any) -> None:
+    _current.reset(token)
+
+
+def record_query(
+    execute: Callable[..., Any], sql: str, params: Any, many: bool, context: Any
+) -> Any:
+    """``execute_wrapper`` installed on every connection; a context-var lookup when not sampled."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(time.perf_counter() - started)
+
+
+def install(connection: Any, **kwargs: Any) -> None:
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install_current(**kwargs: Any) -> None:
+    """Wrap this thread's connections opened before this module was imported."""
+    for connection in connections.all(initialized_only=True):
+        install(connection)
+
+
+# Connections are per thread (and per worker thread of async views). New ones
+# are wrapped as they open; request_started runs on the thread that serves
+# the request's ORM calls, under WSGI and ASGI alike.
+connection_created.connect(install, dispatch_uid="apps.core.instrumentation.install")
+request_started.connect(install_current, dispatch_uid="apps.core.instrumentation.install_current")
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Add the block's duration to ``name`` in the current request's metrics, if sampled."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_span(name, time.perf_counter() - started)
+
+
+class BucketCounts:
+    """Counts per upper bound, cumulative on read (``le`` buckets), plus sum and count."""
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        cumulative, buckets = 0, []
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            cumulative += count
+            buckets.append(("+Inf" if bound == float("inf") else bound, cumulative))
+        return {"buckets": buckets, "sum": round(self.sum, 3), "count": self.count}
+
+
+class RouteStats:
+    def __init__(self) -> None:
+        self.latency_ms = BucketCounts(LATENCY_BUCKETS_MS)
+        self.db_ms = BucketCounts(LATENCY_BUCKETS_MS)
+        self.queries = BucketCounts(QUERY_BUCKETS)
+        self.max_queries = 0
+        self.over_query_budget = 0
+        self.over_latency_budget = 0
+
+
+class RequestStatsRegistry:
+    """Per-route histograms of sampled requests, kept in this process."""
+
+    def __init__(self) -> None:
+        self._routes: dict[str, RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, view: str, metrics: RequestMetrics, total: float) -> list[str]:
+        """Add one request; returns the budgets it exceeded (``"queries"``, ``"latency"``)."""
+        route = f"{method} {view}"
+        exceeded = []
+        if QUERY_BUDGET is not None and metrics.queries > QUERY_BUDGET:
+            exceeded.append("queries")
+        if LATENCY_BUDGET_MS is not None and total * 1000 > LATENCY_BUDGET_MS:
+            exceeded.append("latency")
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = RouteStats()
+            stats.latency_ms.observe(total * 1000)
+            stats.db_ms.observe(metrics.db * 1000)
+            stats.queries.observe(metrics.queries)
+            stats.max_queries = max(stats.max_queries, metrics.queries)
+            stats.over_query_budget += "queries" in exceeded
+            stats.over_latency_budget += "latency" in exceeded
+        REQUEST_SECONDS.observe(total, method=method, view=view)
+        REQUEST_QUERIES.observe(metrics.queries, method=method, view=view)
+        REQUEST_DB_SECONDS.observe(metrics.db, method=method, view=view)
+        for budget in exceeded:
+            REQUEST_OVER_BUDGET.inc(method=method, view=view, budget=budget)
+        if exceeded:
+            logger.warning(
+                "%s over budget (%s): %d queries, %.1f ms in the database, %.1f ms total",
+                route, ", ".join(exceeded), metrics.queries, metrics.db * 1000, total * 1000,
+            )
+        return exceeded
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                route: {
+                    "requests": stats.latency_ms.count,
+                    "latency_ms": stats.latency_ms.snapshot(),
+                    "db_ms": stats.db_ms.snapshot(),
+                    "queries": stats.queries.snapshot(),
+                    "max_queries": stats.max_queries,
+                    "over_query_budget": stats.over_query_budget,
+                    "over_latency_budget": stats.over_latency_budget,
+                }
+                for route, stats in sorted(self._routes.items())
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+registry = RequestStatsRegistry()
+
+
+def server_timing(metrics: RequestMetrics, total: float, exceeded: Sequence[str] = ()) -> str:
+    """The ``Server-Timing`` header value of a sampled request (durations in ms)."""
+    entries = [f'db;dur={metrics.db * 1000:.2f};desc="{metrics.queries} queries"']
+    entries += [
+        f"{name};dur={seconds * 1000:.2f}" for name, seconds in sorted(metrics.spans.items())
+    ]
+    if metrics.view is not None:
+        entries.append(f"view;dur={metrics.view * 1000:.2f}")
+    if metrics.render is not None:
+        entries.append(f"render;dur={metrics.render * 1000:.2f}")
+    entries.append(f"total;dur={total * 1000:.2f}")
+    if exceeded:
+        entries.append(f'budget;desc="{",".join(exceeded)}"')
+    return ", ".join(entries)
@@ -0,0 +1,336 @@
+import atexit
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, NamedTuple, Optional, Sequence
+
+from django.conf import settings
+
+# Directory shared by every worker process of this host. Each process writes
+# its own snapshot there and /metrics sums them, so a scrape reaching any
+# worker sees them all. Empty it when the server (re)starts. None: metrics
+# of the serving process only.
+METRICS_DIR: Optional[str] = getattr(settings, "METRICS_DIR", None)
+# How often a process rewrites its snapshot
+FLUSH_INTERVAL: float = getattr(settings, "METRICS_FLUSH_INTERVAL", 5.0)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = dict[str, str]
+
+
+class Sample(NamedTuple):
+    name: str
+    labels: Labels
+    value: float
+
+
+class Family(NamedTuple):
+    name: str
+    kind: str  # "counter", "gauge" or "histogram"
+    documentation: str
+    samples: list[Sample]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional["Registry"] = None,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...]) -> Labels:
+        return dict(zip(self.labelnames, key))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def family(self) -> Family:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A monotonic count per label set; name it ``..._total``."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+        REGISTRY.started()
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def family(self) -> Family:
+        with self._lock:
+            samples = [
+                Sample(self.name, self._labels(key), value) for key, value in self._values.items()
+            ]
+        return Family(self.name, self.kind, self.documentation, samples)
+
+
+class Histogram(_Metric):
+    """Observations per label set in ``le`` buckets, with their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: Optional["Registry"] = None,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (the last one is +Inf), sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][bisect_left(self.buckets, value)] += 1
+            state[1] += value
+        REGISTRY.started()
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: Any) -> int:
+        state = self._values.get(self._key(labels))
+        return sum(state[0]) if state else 0
+
+    def family(self) -> Family:
+        samples = []
+        with self._lock:
+            for key, (counts, total) in self._values.items():
+                labels = self._labels(key)
+                cumulative = 0
+                for bound, count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += count
+                    bucket = {**labels, "le": _number(bound)}
+                    samples.append(Sample(f"{self.name}_bucket", bucket, cumulative))
+                samples.append(Sample(f"{self.name}_sum", labels, total))
+                samples.append(Sample(f"{self.name}_count", labels, cumulative))
+        return Family(self.name, self.kind, self.documentation, samples)
+
+
+Collector = Callable[[], list[Family]]
+
+
+class Registry:
+    """This process's metrics, plus collectors read when a snapshot is taken.
+
+    Collectors report values other objects already keep (cache hit counts)
+    so the hot path is not instrumented twice.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Collector] = []
+        self._flusher_pid: Optional[int] = None
+        self._file: Optional[str] = None
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def add_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def collect(self) -> list[Family]:
+        families = [metric.family() for metric in self._metrics.values()]
+        for collector in self._collectors:
+            families.extend(collector())
+        return families
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def started(self) -> None:
+        """Called on every update: starts this process's flusher the first time."""
+        if METRICS_DIR and self._flusher_pid != os.getpid():
+            self._start_flusher(METRICS_DIR)
+
+    def _start_flusher(self, directory: str) -> None:
+        self._flusher_pid = os.getpid()
+        # Unique per process, so a reused pid never takes over a dead worker's counts
+        self._file = os.path.join(directory, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.json")
+        threading.Thread(target=self._flush_forever, name="metrics-flusher", daemon=True).start()
+
+    def _flush_forever(self) -> None:
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            self.flush()
+
+    def flush(self) -> None:
+        """Write this process's snapshot to ``METRICS_DIR`` (atomically replaced)."""
+        if not METRICS_DIR:
+            return
+        if self._flusher_pid != os.getpid() or os.path.dirname(self._file or "") != METRICS_DIR:
+            self._start_flusher(METRICS_DIR)
+        assert self._file is not None
+        snapshot = {
+            "pid": os.getpid(),
+            "families": [[f.name, f.kind, f.documentation, f.samples] for f in self.collect()],
+        }
+        temporary = f"{self._file}.tmp"
+        with open(temporary, "w") as output:
+            json.dump(snapshot, output)
+        os.replace(temporary, self._file)
+
+    def after_fork(self) -> None:
+        # The parent's counts stay in the parent's file
+        self.reset()
+        self._flusher_pid = self._file = None
+
+
+REGISTRY = Registry()
+os.register_at_fork(after_in_child=REGISTRY.after_fork)
+atexit.register(REGISTRY.flush)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def read_snapshots(directory: str) -> list[tuple[int, list[Family]]]:
+    snapshots = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as source:
+                data = json.load(source)
+        except (OSError, ValueError):
+            continue  # Removed or replaced while listing
+        families = [
+            Family(name, kind, documentation, [Sample(*sample) for sample in samples])
+            for name, kind, documentation, samples in data["families"]
+        ]
+        snapshots.append((data["pid"], families))
+    return snapshots
+
+
+def merge(snapshots: Sequence[tuple[int, list[Family]]]) -> list[Family]:
+    """Sum each sample across processes (and families reported twice).
+
+    Counters and histograms keep the counts of workers that have exited, so
+    totals never go backwards; gauges only count live processes.
+    """
+    merged: dict[str, tuple[str, str, dict[tuple[str, tuple[tuple[str, str], ...]], float]]] = {}
+    for pid, families in snapshots:
+        alive: Optional[bool] = None
+        for family in families:
+            if family.kind == "gauge":
+                alive = _alive(pid) if alive is None else alive
+                if not alive:
+                    continue
+            _, _, values = merged.setdefault(family.name, (family.kind, family.documentation, {}))
+            for sample in family.samples:
+                key = (sample.name, tuple(sorted(sample.labels.items())))
+                values[key] = values.get(key, 0.0) + sample.value
+    return [
+        Family(name, kind, documentation, [
+            Sample(sample, dict(labels), value) for (sample, labels), value in values.items()
+        ])
+        for name, (kind, documentation, values) in sorted(merged.items())
+    ]
+
+
+def gather() -> list[Family]:
+    """Every family to expose: this process's, or all workers' with ``METRICS_DIR``."""
+    if not METRICS_DIR:
+        return merge([(os.getpid(), REGISTRY.collect())])
+    REGISTRY.flush()
+    return merge(read_snapshots(METRICS_DIR))
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str, quote: bool = True) -> str:
+    value = value.replace("\\", r"\\").replace("\n", r"\n")
+    return value.replace('"', r'\"') if quote else value
+
+
+def exposition(families: Sequence[Family]) -> str:
+    """``families`` in the Prometheus text format (version 0.0.4)."""
+    lines = []
+    for family in families:
+        lines.append(f"# HELP {family.name} {_escape(family.documentation, quote=False)}")
+        lines.append(f"# TYPE {family.name} {family.kind}")
+        for sample in family.samples:
+            labels = ",".join(
+                f'{name}="{_escape(str(value))}"' for name, value in sample.labels.items()
+            )
+            lines.append(f"{sample.name}{{{labels}}} {_number(sample.value)}" if labels
+                         else f"{sample.name} {_number(sample.value)}")
+    return "\n".join(lines) + "\n"
+
+
+_CACHE_COUNTERS = {
+    "hits": "Lookups answered by the cache",
+    "misses": "Lookups the cache could not answer",
+    "evictions": "Entries dropped to make room or because they expired",
+}
+
+
+def cache_collector(name: str, stats: Callable[[], dict[str, Any]]) -> Collector:
+    """Collector for a cache whose ``stats()`` reports hits, misses, evictions and size."""
+    def collect() -> list[Family]:
+        values = stats()
+        labels = {"cache": name}
+        families = [
+            Family(f"eventhub_cache_{kind}_total", "counter", documentation, [
+                Sample(f"eventhub_cache_{kind}_total", labels, values[kind])
+            ])
+            for kind, documentation in _CACHE_COUNTERS.items()
+        ]
+        families.append(Family("eventhub_cache_entries", "gauge", "Entries held by the cache", [
+            Sample("eventhub_cache_entries", labels, values["size"])
+        ]))
+        return families
+    return collect
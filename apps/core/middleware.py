@@ -0,0 +1,131 @@
+import random
+import time
+from typing import Any, Callable, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpRequest
+
+from apps.core import instrumentation
+from apps.core.instrumentation import RequestMetrics
+
+# Urlconf of requests served under ASGI: the async read views in front of
+# ROOT_URLCONF. None keeps ASGI on the sync views.
+ASYNC_URLCONF: Optional[str] = getattr(settings, "ASYNC_READ_URLCONF", "config.urls_async")
+
+
+class AsyncReadPathMiddleware:
+    """Routes ASGI requests through ``ASYNC_URLCONF``; WSGI requests are untouched.
+
+    Both sync and async capable, so neither handler adds a thread hop for it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if self.is_async:
+            return self.__acall__(request)
+        self.route(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest) -> Any:
+        self.route(request)
+        return await self.get_response(request)
+
+    def route(self, request: HttpRequest) -> None:
+        if ASYNC_URLCONF and isinstance(request, ASGIRequest):
+            request.urlconf = ASYNC_URLCONF
+
+
+class RequestMetricsMiddleware:
+    """Measures a sample of requests and reports it in a ``Server-Timing`` header.
+
+    A sampled request gets its SQL query count and time (``record_query``
+    on every connection), the ``span`` blocks it ran (e.g. ``serialize``),
+    the view and template-response render times and its total, and is
+    added to its route's histograms in ``instrumentation.registry``. Going
+    over ``REQUEST_QUERY_BUDGET`` or ``REQUEST_LATENCY_BUDGET_MS`` logs a
+    warning. Unsampled requests cost one random draw.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+            # Hooks in the handler's mode, so neither adds a thread hop
+            self.process_view = self._aprocess_view
+            self.process_template_response = self._aprocess_template_response
+        else:
+            self.process_view = self._process_view
+            self.process_template_response = self._process_template_response
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if self.is_async:
+            return self.__acall__(request)
+        if not instrumentation.SAMPLE_RATE or random.random() >= instrumentation.SAMPLE_RATE:
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = instrumentation.activate(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            instrumentation.deactivate(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request: HttpRequest) -> Any:
+        if not instrumentation.SAMPLE_RATE or random.random() >= instrumentation.SAMPLE_RATE:
+            return await self.get_response(request)
+        metrics = RequestMetrics()
+        token = instrumentation.activate(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            instrumentation.deactivate(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request: HttpRequest, response: Any, metrics: RequestMetrics) -> Any:
+        now = time.perf_counter()
+        if metrics.view is None and metrics.view_started is not None:
+            metrics.view = now - metrics.view_started
+        total = now - metrics.started
+        match = request.resolver_match
+        view = match.view_name if match else "unmatched"
+        exceeded = instrumentation.registry.record(request.method or "", view, metrics, total)
+        response["Server-Timing"] = instrumentation.server_timing(metrics, total, exceeded)
+        return response
+
+    def _process_view(self, request: HttpRequest, *args: Any) -> None:
+        metrics = instrumentation.current()
+        if metrics is not None:
+            metrics.view_started = time.perf_counter()
+
+    async def _aprocess_view(self, request: HttpRequest, *args: Any) -> None:
+        self._process_view(request)
+
+    def _process_template_response(self, request: HttpRequest, response: Any) -> Any:
+        metrics = instrumentation.current()
+        if metrics is not None and metrics.view_started is not None:
+            # Called between the view returning and the response being rendered
+            view_returned = time.perf_counter()
+            metrics.view = view_returned - metrics.view_started
+
+            def rendered(response: Any) -> None:
+                metrics.render = time.perf_counter() - view_returned
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    async def _aprocess_template_response(self, request: HttpRequest, response: Any) -> Any:
+        return self._process_template_response(request, response)
@@ -0,0 +1,186 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Any, Optional, Sequence
+
+from django.db.models import Model, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination over a composite key, without OFFSET or COUNT(*).
+
+    ``ordering`` lists the key fields, all descending (``"-field"``) or all
+    ascending, ending with a unique field. The cursor encodes the key of the
+    boundary row, and each page is fetched with a range predicate on that key
+    plus ``LIMIT page_size + 1``, so an index on the same fields serves every
+    page with a single range scan.
+    """
+
+    ordering: Sequence[str] = ("-created_at", "-id")
+    page_size = 100
+    max_page_size = 1000
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Cursor inválido"
+
+    def __init__(self) -> None:
+        self.request: Optional[Request] = None
+        self.next_values: Optional[list[Any]] = None
+        self.previous_values: Optional[list[Any]] = None
+
+    @property
+    def fields(self) -> list[str]:
+        return [name.lstrip("-") for name in self.ordering]
+
+    @property
+    def descending(self) -> bool:
+        return self.ordering[0].startswith("-")
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, values: Sequence[Any], reverse: bool) -> str:
+        payload = json.dumps({"v": [str(v) for v in values], "r": reverse})
+        return urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(
+        self, model: type[Model], request: Request
+    ) -> Optional[tuple[list[Any], bool]]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        return self.decode(model, encoded)
+
+    def decode(self, model: type[Model], encoded: str) -> tuple[list[Any], bool]:
+        """The key values and direction of ``encoded``.
+
+        Raises ``NotFound`` when it is not a valid cursor.
+        """
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+            raw_values = payload["v"]
+            if len(raw_values) != len(self.fields):
+                raise ValueError
+            values = [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.fields, raw_values)
+            ]
+            return values, bool(payload.get("r"))
+        except Exception as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+
+    def key_filter(self, values: Sequence[Any], forward: bool) -> Q:
+        """Rows strictly after ``values`` in scan order.
+
+        Built as ``a <= x AND (a < x OR (b <= y AND (b < y OR ...)))`` so the
+        leading column carries a plain range bound the planner can seek on.
+        """
+        lookup_lt = "lt" if forward == self.descending else "gt"
+        lookup_le = "lte" if forward == self.descending else "gte"
+        condition: Optional[Q] = None
+        for name, value in reversed(list(zip(self.fields, values))):
+            strict = Q(**{f"{name}__{lookup_lt}": value})
+            if condition is None:
+                condition = strict
+            else:
+                condition = Q(**{f"{name}__{lookup_le}": value}) & (strict | condition)
+        assert condition is not None
+        return condition
+
+    def key_of(self, row: Any) -> list[Any]:
+        if isinstance(row, tuple):
+            # values_list rows: the key columns come first
+            return list(row[:len(self.fields)])
+        if isinstance(row, dict):
+            return [row[name] for name in self.fields]
+        return [getattr(row, name) for name in self.fields]
+
+    def _page_query(
+        self, queryset: QuerySet[Any], request: Request
+    ) -> tuple[QuerySet[Any], bool, bool, int]:
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(queryset.model, request)
+        reverse = bool(cursor and cursor[1])
+
+        if reverse:
+            ordering = [name[1:] if name.startswith("-") else f"-{name}" for name in self.ordering]
+        else:
+            ordering = list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if cursor:
+            queryset = queryset.filter(self.key_filter(cursor[0], forward=not reverse))
+        return queryset[:page_size + 1], cursor is not None, reverse, page_size
+
+    def _page(self, rows: list[Any], has_cursor: bool, reverse: bool, page_size: int) -> list[Any]:
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        has_next = has_more if not reverse else True
+        has_previous = has_cursor if not reverse else has_more
+        self.next_values = self.key_of(rows[-1]) if rows and has_next else None
+        self.previous_values = self.key_of(rows[0]) if rows and has_previous else None
+        return rows
+
+    def paginate_queryset(
+        self, queryset: QuerySet[Any], request: Request, view: Any = None
+    ) -> list[Any]:
+        query, has_cursor, reverse, page_size = self._page_query(queryset, request)
+        return self._page(list(query), has_cursor, reverse, page_size)
+
+    async def apaginate_queryset(self, queryset: QuerySet[Any], request: Request) -> list[Any]:
+        """``paginate_queryset`` through the async ORM, for async views."""
+        query, has_cursor, reverse, page_size = self._page_query(queryset, request)
+        return self._page([row async for row in query], has_cursor, reverse, page_size)
+
+    def get_next_link(self) -> Optional[str]:
+        if self.request is None or self.next_values is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.next_values, reverse=False)
+        )
+
+    def get_previous_link(self) -> Optional[str]:
+        if self.request is None or self.previous_values is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.previous_values, reverse=True)
+        )
+
+    def get_paginated_response(self, data: Any) -> Response:
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class ActivityPagination(KeysetPagination):
+    """Players or guilds by ``last_seen``, over their ``(-last_seen, -id)`` index."""
+
+    ordering = ("-last_seen", "-id")
+    page_size = 50
+    max_page_size = 500
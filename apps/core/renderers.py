@@ -0,0 +1,51 @@
+from typing import IO, Any, Optional
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import msgpack
+except ImportError:  # optional dependency: the API falls back to JSON only
+    msgpack = None
+
+MEDIA_TYPE = "application/msgpack"
+
+# Same coercions as the JSON renderer (UUID, datetime, Decimal, ...) for the
+# few values serializers leave as Python objects
+_encoder = JSONEncoder()
+
+
+def packb(data: Any) -> bytes:
+    return msgpack.packb(data, default=_encoder.default, use_bin_type=True)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Responses as MessagePack, for clients sending ``Accept: application/msgpack``."""
+
+    media_type = MEDIA_TYPE
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(
+        self, data: Any, accepted_media_type: Optional[str] = None, renderer_context: Any = None
+    ) -> bytes:
+        if data is None:
+            return b""
+        return packb(data)
+
+
+class MessagePackParser(BaseParser):
+    """Request bodies sent with ``Content-Type: application/msgpack``."""
+
+    media_type = MEDIA_TYPE
+
+    def parse(
+        self, stream: IO[bytes], media_type: Optional[str] = None, parser_context: Any = None
+    ) -> Any:
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f"MessagePack inválido: {exc}") from exc
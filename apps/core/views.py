@@ -0,0 +1,74 @@
+from datetime import timezone as dt_timezone
+from typing import Any
+
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from apps.core import instrumentation, metrics as prometheus
+from apps.core.pagination import ActivityPagination
+
+ACTIVITY_ORDERINGS = ("-last_seen", "last_seen")
+
+
+class ActivityListMixin:
+    """``?active_since=...&ordering=-last_seen`` on a list of models with an activity summary.
+
+    Either parameter switches the list to cursor pages over the
+    ``(-last_seen, -id)`` index; entities never seen are left out. Without
+    them the plain list is returned unchanged.
+    """
+
+    def list(self, request: Any, *args: Any, **kwargs: Any) -> Response:
+        params = request.query_params
+        if 'active_since' not in params and 'ordering' not in params:
+            return super().list(request, *args, **kwargs)  # type: ignore[misc]
+
+        ordering = params.get('ordering', '-last_seen')
+        if ordering not in ACTIVITY_ORDERINGS:
+            return Response(
+                {'error': f'ordering deve ser um de: {", ".join(ACTIVITY_ORDERINGS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        queryset = self.get_queryset().filter(last_seen__isnull=False)  # type: ignore[attr-defined]
+        if params.get('active_since'):
+            since = parse_datetime(params['active_since'])
+            if since is None:
+                return Response(
+                    {'error': 'active_since inválido'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(since):
+                since = since.replace(tzinfo=dt_timezone.utc)
+            queryset = queryset.filter(last_seen__gte=since)
+
+        paginator = ActivityPagination()
+        if ordering == 'last_seen':
+            paginator.ordering = ('last_seen', 'id')
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)  # type: ignore[attr-defined]
+        return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(['GET'])
+def request_metrics(request: Request) -> Response:
+    # Histogramas por rota das requisições amostradas por este processo
+    return Response({
+        'sample_rate': instrumentation.SAMPLE_RATE,
+        'query_budget': instrumentation.QUERY_BUDGET,
+        'latency_budget_ms': instrumentation.LATENCY_BUDGET_MS,
+        'routes': instrumentation.registry.stats(),
+    })
+
+
+@require_GET
+def metrics(request: HttpRequest) -> HttpResponse:
+    """Métricas no formato de texto do Prometheus, somadas entre os workers se há METRICS_DIR."""
+    return HttpResponse(
+        prometheus.exposition(prometheus.gather()), content_type=prometheus.CONTENT_TYPE
+    )
@@ -1,6 +1,9 @@
 from typing import TYPE_CHECKING
 from django.contrib import admin
+from django.db.models import QuerySet
+from django.http import HttpRequest
 from .models import Event
+from .search import matching
 
 if TYPE_CHECKING:
     AdminBase = admin.ModelAdmin[Event]
@@ -12,5 +15,15 @@ class EventAdmin(AdminBase):
     list_display = ("id", "type", "player", "guild", "created_at")
     list_filter = ("type", "guild")
     search_fields = ("type", "player__user__username")
+    search_help_text = "Busca por tipo, username ou qualquer valor em details (índice full-text)."
     ordering = ("-created_at",)
     readonly_fields = ("created_at",)
+
+    def get_search_results(
+        self, request: HttpRequest, queryset: QuerySet[Event], search_term: str
+    ) -> tuple[QuerySet[Event], bool]:
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            # details goes through the full-text index, never a JSON scan
+            results |= queryset.filter(pk__in=matching(search_term).values("event_id"))
+        return results, may_have_duplicates
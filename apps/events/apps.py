@@ -4,3 +4,7 @@ class EventsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.events'
     verbose_name = "Events"
+
+    def ready(self) -> None:
+        # import signal handlers (counter maintenance)
+        import apps.events.signals  # noqa: F401
@@ -0,0 +1,67 @@
+"""Async twins of the hot ``EventViewSet`` reads, served under ASGI (config/urls_async.py)."""
+from django.http import HttpResponse
+from rest_framework.request import Request
+
+from apps.core.aio import async_read_view, concurrently, json_response, sync_view
+from apps.core.instrumentation import span
+from apps.events.pagination import EventCursorPagination
+from apps.events.serializers import EventRowSerializer, parse_fields
+from apps.events.stats import aguild_stats, aplayer_stats, stats_cache
+from apps.events.views import (
+    filtered_events,
+    required_uuid,
+    statistics_payload,
+    top_guilds,
+    top_players,
+    type_counts,
+)
+
+
+@async_read_view
+async def event_list(request: Request) -> HttpResponse:
+    # A busca textual (?q=) segue pela view síncrona
+    if 'q' in request.query_params:
+        return await sync_view(request._request)
+    try:
+        fields = parse_fields(request.query_params.get('fields'))
+        queryset = filtered_events(request.query_params)
+    except ValueError as exc:
+        return json_response({'error': str(exc)}, status=400)
+    paginator = EventCursorPagination()
+    rows = EventRowSerializer(fields, leading=paginator.fields)
+    page = await paginator.apaginate_queryset(rows.rows(queryset), request)
+    with span('serialize'):
+        data = rows.to_representation(page)
+    return json_response(paginator.get_paginated_response(data).data)
+
+
+@async_read_view
+async def statistics(request: Request) -> HttpResponse:
+    # As três leituras de contadores são independentes: rodam ao mesmo tempo
+    counts = await concurrently(type_counts, top_players, top_guilds)
+    with span('serialize'):
+        return json_response(statistics_payload(*counts))
+
+
+@async_read_view
+async def player_stats(request: Request) -> HttpResponse:
+    try:
+        player_id = required_uuid(request.query_params, 'player_id')
+    except ValueError as exc:
+        return json_response({'error': str(exc)}, status=400)
+    stats = await stats_cache.aget_or_compute('player', player_id, lambda: aplayer_stats(player_id))
+    if stats is None:
+        return json_response({'error': 'Player não encontrado'}, status=404)
+    return json_response(stats)
+
+
+@async_read_view
+async def guild_stats(request: Request) -> HttpResponse:
+    try:
+        guild_id = required_uuid(request.query_params, 'guild_id')
+    except ValueError as exc:
+        return json_response({'error': str(exc)}, status=400)
+    stats = await stats_cache.aget_or_compute('guild', guild_id, lambda: aguild_stats(guild_id))
+    if stats is None:
+        return json_response({'error': 'Guild não encontrada'}, status=404)
+    return json_response(stats)
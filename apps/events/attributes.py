@@ -0,0 +1,137 @@
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping, Sequence
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+from apps.events.models import Event, EventAttribute, EventType
+
+TEXT = "text"
+NUMBER = "number"
+PREFIX = "details."
+# Lookups accepted after ``details.<key>__``; ranges only on numeric attributes
+RANGE_LOOKUPS = ("gt", "gte", "lt", "lte")
+MAX_TEXT = 255
+
+
+@dataclass(frozen=True)
+class AttributeSpec:
+    key: str
+    kind: str = TEXT
+    # The detail holds a list; each element becomes its own row
+    many: bool = False
+
+
+def _specs(*specs: AttributeSpec) -> tuple[AttributeSpec, ...]:
+    return specs
+
+
+# Event type -> detail keys extracted into EventAttribute. Changing it only
+# affects new events until backfill_event_attributes runs.
+ATTRIBUTES: Mapping[str, Sequence[AttributeSpec]] = getattr(settings, "EVENTS_DETAIL_ATTRIBUTES", {
+    EventType.PLAYER_KILL: _specs(AttributeSpec("target_id")),
+    EventType.DUNGEON_CLEAR: _specs(
+        AttributeSpec("dungeon_id"), AttributeSpec("party_members", many=True)
+    ),
+    EventType.ITEM_PURCHASE: _specs(
+        AttributeSpec("item_id"), AttributeSpec("price", NUMBER), AttributeSpec("quantity", NUMBER)
+    ),
+    EventType.QUEST_COMPLETE: _specs(AttributeSpec("quest_id")),
+    EventType.PLAYER_LEVEL_UP: _specs(AttributeSpec("level", NUMBER)),
+    EventType.MARKET_TRANSACTION: _specs(
+        AttributeSpec("item_id"),
+        AttributeSpec("price", NUMBER),
+        AttributeSpec("buyer_id"),
+        AttributeSpec("seller_id"),
+    ),
+})
+
+
+def spec_for(key: str) -> AttributeSpec:
+    """The declaration of ``key``.
+
+    A key must have the same kind under every type that extracts it.
+    """
+    for specs in ATTRIBUTES.values():
+        for spec in specs:
+            if spec.key == key:
+                return spec
+    raise KeyError(key)
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)[:MAX_TEXT]
+
+
+def _number(value: Any) -> Any:
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def extract(event: Event) -> list[EventAttribute]:
+    """The attribute rows of ``event``; missing, null or non-scalar values are skipped."""
+    details = event.details if isinstance(event.details, dict) else {}
+    rows: list[EventAttribute] = []
+    for spec in ATTRIBUTES.get(event.type, ()):
+        raw = details.get(spec.key)
+        values = raw if spec.many and isinstance(raw, list) else [raw]
+        for value in values:
+            if value is None or isinstance(value, (dict, list)):
+                continue
+            number = _number(value) if spec.kind == NUMBER else None
+            if spec.kind == NUMBER and number is None:
+                continue
+            rows.append(
+                EventAttribute(event=event, key=spec.key, value=_text(value), number=number)
+            )
+    return rows
+
+
+def store_attributes(events: Iterable[Event]) -> int:
+    """Insert the attribute rows of newly written ``events`` in one batch."""
+    rows = [row for event in events for row in extract(event)]
+    EventAttribute.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def refresh_attributes(events: Sequence[Event]) -> int:
+    """Replace the attribute rows of ``events`` (after an update, or to backfill)."""
+    EventAttribute.objects.filter(event__in=[event.pk for event in events]).delete()
+    return store_attributes(events)
+
+
+def filter_by_attributes(queryset: QuerySet[Event], params: Mapping[str, str]) -> QuerySet[Event]:
+    """Apply every ``details.<key>[__lookup]=value`` parameter through the attribute indexes.
+
+    Raises ``ValueError``, with the message for the client, for keys that are
+    not extracted and for values or lookups that do not fit the attribute's kind.
+    """
+    for name, value in params.items():
+        if not name.startswith(PREFIX):
+            continue
+        key, _, lookup = name[len(PREFIX):].partition("__")
+        try:
+            spec = spec_for(key)
+        except KeyError as exc:
+            raise ValueError(f'Atributo não indexado: {key}') from exc
+        if lookup and (lookup not in RANGE_LOOKUPS or spec.kind != NUMBER):
+            raise ValueError(f'Filtro não suportado: {name}')
+
+        if spec.kind == NUMBER:
+            number = _number(value)
+            if number is None:
+                raise ValueError(f'{name} deve ser numérico')
+            condition = {f"number__{lookup or 'exact'}": number}
+        else:
+            condition = {"value": value}
+        matches = EventAttribute.objects.filter(key=key, **condition).values("event_id")
+        queryset = queryset.filter(pk__in=matches)
+    return queryset
@@ -0,0 +1,129 @@
+from collections import Counter
+from datetime import datetime
+from typing import Any, Iterable, Mapping
+
+from django.db import models
+from django.db.models import Case, F, Q, Value, When
+
+from apps.events.models import Event, EventTypeCount, GuildEventCount, PlayerEventCount
+from apps.events.rollups import event_time
+from apps.guilds.models import Guild
+from apps.players.models import Player
+
+EventKey = tuple[str, Any, Any]
+Activity = tuple[datetime, str]
+
+
+def event_key(event: Event) -> EventKey:
+    return (event.type, event.player_id, event.guild_id)
+
+
+def _bump(model: type[models.Model], deltas: Mapping[Any, int]) -> None:
+    deltas = {key: delta for key, delta in deltas.items() if key is not None and delta}
+    if not deltas:
+        return
+    pk_name = model._meta.pk.attname
+    # Make sure every row exists (no-op for existing ones), then apply all
+    # deltas with a single UPDATE ... CASE.
+    if any(delta > 0 for delta in deltas.values()):
+        model.objects.bulk_create(
+            [model(**{pk_name: key}) for key, delta in deltas.items() if delta > 0],
+            ignore_conflicts=True,
+        )
+    model.objects.filter(pk__in=list(deltas)).update(
+        count=F("count") + Case(
+            *[When(pk=key, then=Value(delta)) for key, delta in deltas.items()],
+            default=Value(0),
+            output_field=models.BigIntegerField(),
+        )
+    )
+
+
+def apply_counts(keys: Iterable[EventKey], sign: int = 1) -> None:
+    """Add (``sign=1``) or remove (``sign=-1``) events from the counter tables.
+
+    Costs at most two statements per table regardless of how many events are
+    applied.
+    """
+    types: Counter[Any] = Counter()
+    players: Counter[Any] = Counter()
+    guilds: Counter[Any] = Counter()
+    for event_type, player_id, guild_id in keys:
+        types[event_type] += sign
+        if player_id:
+            players[player_id] += sign
+        if guild_id:
+            guilds[guild_id] += sign
+    _bump(EventTypeCount, types)
+    _bump(PlayerEventCount, players)
+    _bump(GuildEventCount, guilds)
+
+
+def _touch(model: type[models.Model], latest: Mapping[Any, Activity]) -> None:
+    if not latest:
+        return
+    # Only move last_seen forward: concurrent or out-of-order batches can
+    # arrive in any order and the newest event still wins.
+    newer = {
+        key: Q(pk=key) & (Q(last_seen__isnull=True) | Q(last_seen__lte=moment))
+        for key, (moment, _) in latest.items()
+    }
+    model.objects.filter(pk__in=list(latest)).update(
+        last_seen=Case(
+            *[When(newer[key], then=Value(moment)) for key, (moment, _) in latest.items()],
+            default=F("last_seen"),
+            output_field=models.DateTimeField(),
+        ),
+        last_event_type=Case(
+            *[When(newer[key], then=Value(event_type)) for key, (_, event_type) in latest.items()],
+            default=F("last_event_type"),
+            output_field=models.CharField(),
+        ),
+    )
+
+
+def apply_activity(events: Iterable[Event]) -> None:
+    """Record ``events`` in the ``last_seen`` / ``last_event_type`` of their players and guilds.
+
+    One UPDATE per table for the whole batch. Deleting an event does not move
+    ``last_seen`` back; ``rebuild_event_counters`` recomputes it.
+    """
+    players: dict[Any, Activity] = {}
+    guilds: dict[Any, Activity] = {}
+    for event in events:
+        latest = (event_time(event), event.type)
+        for owners, key in ((players, event.player_id), (guilds, event.guild_id)):
+            if key and (key not in owners or owners[key][0] <= latest[0]):
+                owners[key] = latest
+    _touch(Player, players)
+    _touch(Guild, guilds)
+
+
+def count_from_events() -> tuple[Counter[Any], Counter[Any], Counter[Any]]:
+    """Recount everything from the raw ``Event`` table (full scan)."""
+    types: Counter[Any] = Counter()
+    players: Counter[Any] = Counter()
+    guilds: Counter[Any] = Counter()
+    rows = Event.objects.order_by().values_list("type", "player_id", "guild_id")
+    for event_type, player_id, guild_id in rows.iterator(chunk_size=5000):
+        types[event_type] += 1
+        if player_id:
+            players[player_id] += 1
+        if guild_id:
+            guilds[guild_id] += 1
+    return types, players, guilds
+
+
+def activity_from_events() -> tuple[dict[Any, Activity], dict[Any, Activity]]:
+    """Latest ``(time, type)`` per player and per guild from the raw ``Event`` table (full scan)."""
+    players: dict[Any, Activity] = {}
+    guilds: dict[Any, Activity] = {}
+    rows = Event.objects.order_by().values_list(
+        "player_id", "guild_id", "type", "timestamp", "created_at"
+    )
+    for player_id, guild_id, event_type, timestamp, created_at in rows.iterator(chunk_size=5000):
+        latest = (timestamp or created_at, event_type)
+        for owners, key in ((players, player_id), (guilds, guild_id)):
+            if key and (key not in owners or owners[key][0] <= latest[0]):
+                owners[key] = latest
+    return players, guilds
@@ -0,0 +1,124 @@
+import csv
+import io
+import json
+import zlib
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from rest_framework.renderers import BaseRenderer
+
+from apps.events.models import Event
+from apps.events.pagination import EventCursorPagination
+
+EXPORT_FIELDS = ("id", "type", "timestamp", "created_at", "player_id", "guild_id", "details")
+CHUNK_SIZE = 2000
+
+
+class _ExportRenderer(BaseRenderer):
+    """Lets ``?format=`` / ``Accept`` pick the export format.
+
+    The rows themselves are streamed by the view; ``render`` only serves
+    error payloads, as JSON.
+    """
+
+    charset = "utf-8"
+
+    def render(
+        self, data: Any, accepted_media_type: Optional[str] = None, renderer_context: Any = None
+    ) -> bytes:
+        return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+class NDJSONRenderer(_ExportRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+
+class CSVRenderer(_ExportRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+def export_rows(
+    queryset: QuerySet[Event], chunk_size: Optional[int] = None
+) -> Iterator[dict[str, Any]]:
+    """Rows of ``queryset`` newest first, fetched ``chunk_size`` at a time.
+
+    Each chunk is its own keyset query on ``(-created_at, -id)``, so no
+    cursor or transaction stays open while the client reads slowly, and at
+    most one chunk is in memory.
+    """
+    chunk_size = chunk_size or CHUNK_SIZE
+    keyset = EventCursorPagination()
+    rows = queryset.order_by(*keyset.ordering).values(*EXPORT_FIELDS)
+    position: Optional[list[Any]] = None
+    while True:
+        page = rows.filter(keyset.key_filter(position, forward=True)) if position else rows
+        chunk = list(page[:chunk_size])
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        position = keyset.key_of(chunk[-1])
+
+
+def _batches(rows: Iterable[dict[str, Any]], size: int = 500) -> Iterator[list[dict[str, Any]]]:
+    batch: list[dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def ndjson_stream(rows: Iterable[dict[str, Any]]) -> Iterator[bytes]:
+    encoder = DjangoJSONEncoder(separators=(",", ":"), ensure_ascii=False)
+    for batch in _batches(rows):
+        yield "".join(encoder.encode(row) + "\n" for row in batch).encode()
+
+
+def csv_stream(rows: Iterable[dict[str, Any]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for batch in _batches(rows):
+        for row in batch:
+            writer.writerow([
+                json.dumps(row["details"], ensure_ascii=False) if name == "details"
+                else "" if row[name] is None else row[name]
+                for name in EXPORT_FIELDS
+            ])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress ``chunks`` into one gzip member as they are produced."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip header and trailer
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def async_stream(chunks: Iterable[bytes]) -> AsyncIterator[bytes]:
+    """``chunks`` for an ASGI response, each one produced in a sync thread.
+
+    Given a sync iterator, Django's ASGI handler reads the whole response
+    into a list before sending it; this keeps an export to one chunk in
+    memory under ASGI too.
+    """
+    iterator = iter(chunks)
+    produce = sync_to_async(next)
+    while True:
+        chunk = await produce(iterator, None)
+        if chunk is None:
+            return
+        yield chunk
@@ -0,0 +1,261 @@
+import asyncio
+import json
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, NamedTuple, Optional, Sequence
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import QuerySet
+
+from apps.events.models import Event
+from apps.events.pagination import EventCursorPagination
+from apps.events.serializers import EventRowSerializer, EventSerializer
+
+# Events held per subscriber before the overflow policy applies
+FEED_BUFFER: int = getattr(settings, "EVENTS_FEED_BUFFER", 1000)
+# "drop": discard the oldest buffered events and tell the client how many;
+# "disconnect": end the stream, the client resumes from its last id
+FEED_OVERFLOW: str = getattr(settings, "EVENTS_FEED_OVERFLOW", "drop")
+FEED_HEARTBEAT: float = getattr(settings, "EVENTS_FEED_HEARTBEAT", 15.0)
+# Events replayed from the database on resume; past it the client gets "lagged"
+FEED_REPLAY_LIMIT: int = getattr(settings, "EVENTS_FEED_REPLAY_LIMIT", 1000)
+FEED_RETRY_MS = 3000
+
+
+def frame(event: str, data: Any, event_id: Optional[str] = None) -> bytes:
+    """One Server-Sent Events message."""
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n".encode()
+
+
+class FeedItem(NamedTuple):
+    id: Any
+    type: str
+    player_id: Optional[str]
+    guild_id: Optional[str]
+    frame: bytes
+
+
+def feed_items(rows: Sequence[dict[str, Any]]) -> list[FeedItem]:
+    """Ready-to-send items for serialized event ``rows``, each encoded once for every subscriber."""
+    keyset = EventCursorPagination()
+    items = []
+    for row in rows:
+        cursor = keyset.encode_cursor([row["created_at"], row["id"]], reverse=False)
+        items.append(FeedItem(
+            str(row["id"]),
+            row["type"],
+            str(row["player"]) if row["player"] else None,
+            str(row["guild"]) if row["guild"] else None,
+            frame("event", row, cursor),
+        ))
+    return items
+
+
+@dataclass(frozen=True)
+class FeedFilter:
+    type: Optional[str] = None
+    player_id: Optional[str] = None
+    guild_id: Optional[str] = None
+
+    def matches(self, item: FeedItem) -> bool:
+        return (
+            (self.type is None or item.type == self.type)
+            and (self.player_id is None or item.player_id == self.player_id)
+            and (self.guild_id is None or item.guild_id == self.guild_id)
+        )
+
+    def apply(self, queryset: QuerySet[Event]) -> QuerySet[Event]:
+        if self.type:
+            queryset = queryset.filter(type=self.type)
+        if self.player_id:
+            queryset = queryset.filter(player_id=self.player_id)
+        if self.guild_id:
+            queryset = queryset.filter(guild_id=self.guild_id)
+        return queryset
+
+    def index_key(self) -> tuple[str, Optional[str]]:
+        # The most selective field, so a published event is only offered to
+        # subscribers that can match it
+        if self.player_id:
+            return ("player", self.player_id)
+        if self.guild_id:
+            return ("guild", self.guild_id)
+        if self.type:
+            return ("type", self.type)
+        return ("all", None)
+
+
+class Subscription:
+    """A subscriber's bounded buffer, filled from any thread and drained on its event loop."""
+
+    def __init__(
+        self, broker: "EventBroker", feed_filter: FeedFilter, maxsize: int, overflow: str
+    ) -> None:
+        self.broker = broker
+        self.filter = feed_filter
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.loop = asyncio.get_running_loop()
+        self.buffer: deque[FeedItem] = deque()
+        self.dropped = 0
+        self.overflowed = False
+        self._ready = asyncio.Event()
+
+    def push(self, items: Sequence[FeedItem]) -> None:
+        """Runs on ``self.loop``."""
+        if self.overflowed:
+            return
+        self.buffer.extend(items)
+        excess = len(self.buffer) - self.maxsize
+        if excess > 0:
+            if self.overflow == "disconnect":
+                self.overflowed = True
+                self.buffer.clear()
+            else:
+                for _ in range(excess):
+                    self.buffer.popleft()
+                self.dropped += excess
+        self._ready.set()
+
+    async def get(self, timeout: float) -> list[FeedItem]:
+        """Buffered items, waiting up to ``timeout`` seconds for some; ``[]`` on timeout."""
+        if not self.buffer and not self.overflowed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._ready.clear()
+        items = list(self.buffer)
+        self.buffer.clear()
+        return items
+
+
+class EventBroker:
+    """In-process fan-out of committed events to feed subscribers.
+
+    Each published batch is serialized once and offered only to the
+    subscribers indexed under its type, player, guild or "all"; every
+    subscriber gets one hand-off per batch on its own event loop.
+    """
+
+    def __init__(self, buffer: int, overflow: str) -> None:
+        self.buffer = buffer
+        self.overflow = overflow
+        self._index: dict[tuple[str, Optional[str]], set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, feed_filter: FeedFilter) -> Subscription:
+        """Must be called on the subscriber's event loop."""
+        subscription = Subscription(self, feed_filter, self.buffer, self.overflow)
+        with self._lock:
+            self._index.setdefault(feed_filter.index_key(), set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        key = subscription.filter.index_key()
+        with self._lock:
+            subscribers = self._index.get(key)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._index[key]
+
+    def publish(self, events: Sequence[Event]) -> None:
+        with self._lock:
+            if not self._index:
+                return
+            index = {key: list(subscribers) for key, subscribers in self._index.items()}
+        items = feed_items(EventSerializer(events, many=True).data)
+        self.published += len(items)
+
+        batches: dict[Subscription, list[FeedItem]] = {}
+        for item in items:
+            keys = [
+                ("all", None),
+                ("type", item.type),
+                ("player", item.player_id),
+                ("guild", item.guild_id),
+            ]
+            for key in keys:
+                for subscription in index.get(key, ()):
+                    if subscription.filter.matches(item):
+                        batches.setdefault(subscription, []).append(item)
+        for subscription, batch in batches.items():
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.push, batch)
+            except RuntimeError:
+                # Its loop is gone; the stream will never be read again
+                self.unsubscribe(subscription)
+                continue
+            self.delivered += len(batch)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            subscribers = sum(len(subscribers) for subscribers in self._index.values())
+        return {
+            "subscribers": subscribers,
+            "published": self.published,
+            "delivered": self.delivered,
+        }
+
+
+broker = EventBroker(buffer=FEED_BUFFER, overflow=FEED_OVERFLOW)
+
+
+def publish_on_commit(events: Sequence[Event]) -> None:
+    """Hand ``events`` to the broker once the write commits, so subscribers never see a rollback."""
+    events = list(events)
+    transaction.on_commit(lambda: broker.publish(events))
+
+
+def replay(feed_filter: FeedFilter, after: Sequence[Any]) -> tuple[list[FeedItem], bool]:
+    """Matching events committed after the cursor key ``after``, oldest first.
+
+    Also returns whether more remain past ``FEED_REPLAY_LIMIT``.
+    """
+    keyset = EventCursorPagination()
+    rows = EventRowSerializer(leading=keyset.fields)
+    queryset = feed_filter.apply(Event.objects.all())
+    queryset = queryset.filter(keyset.key_filter(after, forward=False))
+    page = list(rows.rows(queryset).order_by("created_at", "id")[:FEED_REPLAY_LIMIT + 1])
+    items = feed_items(rows.to_representation(page[:FEED_REPLAY_LIMIT]))
+    return items, len(page) > FEED_REPLAY_LIMIT
+
+
+async def stream(
+    subscription: Subscription,
+    replayed: Sequence[FeedItem] = (),
+    replay_truncated: bool = False,
+) -> AsyncIterator[bytes]:
+    """The SSE body of ``subscription``: replayed events, then live ones until the client leaves."""
+    try:
+        yield f"retry: {FEED_RETRY_MS}\n\n".encode()
+        # Events can reach the buffer while the replay query runs; skip repeats
+        seen = set()
+        for item in replayed:
+            seen.add(item.id)
+            yield item.frame
+        if replay_truncated:
+            yield frame("lagged", {"reason": "replay_limit", "limit": FEED_REPLAY_LIMIT})
+        while True:
+            items = await subscription.get(FEED_HEARTBEAT)
+            if subscription.overflowed:
+                yield frame("overflow", {"reason": "slow_consumer"})
+                return
+            if subscription.dropped:
+                yield frame("lagged", {"reason": "slow_consumer", "dropped": subscription.dropped})
+                subscription.dropped = 0
+            if not items:
+                yield b": keepalive\n\n"
+                continue
+            for item in items:
+                if item.id not in seen:
+                    yield item.frame
+    finally:
+        subscription.broker.unsubscribe(subscription)
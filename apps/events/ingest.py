@@ -0,0 +1,332 @@
+import json
+from typing import IO, Any, Iterable, Iterator, NamedTuple, Optional, Sequence
+
+from django.conf import settings
+from django.db import models, transaction
+
+from apps.core.renderers import msgpack
+from apps.events.models import Event, IngestCheckpoint
+from apps.events.serializers import EventBulkItemSerializer
+from apps.events.signals import events_created
+from apps.guilds.models import Guild
+from apps.players.models import Player
+
+BULK_MAX_EVENTS: int = getattr(settings, "EVENTS_BULK_MAX_EVENTS", 1000)
+BULK_INSERT_BATCH_SIZE: int = getattr(settings, "EVENTS_BULK_INSERT_BATCH_SIZE", 500)
+STREAM_CHUNK_LINES: int = getattr(settings, "EVENTS_STREAM_CHUNK_LINES", 500)
+STREAM_MAX_LINE_BYTES: int = getattr(settings, "EVENTS_STREAM_MAX_LINE_BYTES", 1024 * 1024)
+STREAM_REPORT_LIMIT: int = getattr(settings, "EVENTS_STREAM_REPORT_LIMIT", 1000)
+STREAM_READ_SIZE = 64 * 1024
+
+
+def validate_event_batch(
+    items: Iterable[Any], first_index: int = 0
+) -> tuple[list[Event], list[dict[str, Any]]]:
+    """Validate raw event payloads and build unsaved ``Event`` instances.
+
+    Referenced players and guilds are checked with one query each for the
+    whole batch. Returns the valid events and a list of
+    ``{"index": i, "errors": {...}}`` entries for the rejected ones.
+    """
+    errors: list[dict[str, Any]] = []
+    valid: list[tuple[int, dict[str, Any]]] = []
+    for index, item in enumerate(items, start=first_index):
+        serializer = EventBulkItemSerializer(data=item)
+        if serializer.is_valid():
+            valid.append((index, dict(serializer.validated_data)))
+        else:
+            errors.append({"index": index, "errors": serializer.errors})
+
+    player_ids = {data["player"] for _, data in valid if data.get("player")}
+    guild_ids = {data["guild"] for _, data in valid if data.get("guild")}
+    known_players = (
+        set(Player.objects.filter(id__in=player_ids).values_list("id", flat=True))
+        if player_ids else set()
+    )
+    known_guilds = (
+        set(Guild.objects.filter(id__in=guild_ids).values_list("id", flat=True))
+        if guild_ids else set()
+    )
+
+    events: list[Event] = []
+    for index, data in valid:
+        item_errors: dict[str, list[str]] = {}
+        player_id = data.get("player")
+        guild_id = data.get("guild")
+        if player_id and player_id not in known_players:
+            item_errors["player"] = [f'Player "{player_id}" não existe.']
+        if guild_id and guild_id not in known_guilds:
+            item_errors["guild"] = [f'Guild "{guild_id}" não existe.']
+        if item_errors:
+            errors.append({"index": index, "errors": item_errors})
+            continue
+        events.append(Event(
+            type=data["type"],
+            details=data["details"],
+            timestamp=data.get("timestamp"),
+            player_id=player_id,
+            guild_id=guild_id,
+        ))
+
+    errors.sort(key=lambda e: e["index"])
+    return events, errors
+
+
+def create_events(events: Sequence[Event]) -> list[Event]:
+    """Insert ``events`` in one transaction and notify ``events_created``."""
+    if not events:
+        return []
+    with transaction.atomic():
+        created = Event.objects.bulk_create(events, batch_size=BULK_INSERT_BATCH_SIZE)
+        events_created.send(sender=Event, events=created)
+    return created
+
+
+class NDJSONLine(NamedTuple):
+    number: int
+    end_offset: int
+    payload: Any
+    error: Optional[str]
+
+
+class NDJSONReader:
+    """Iterate an NDJSON byte stream one line at a time.
+
+    Only one read block plus one line (bounded by ``STREAM_MAX_LINE_BYTES``)
+    is held in memory. Offsets are absolute positions in the original upload,
+    so a resumed request keeps the same numbering. When ``expected_length`` is
+    known and the body ends early, the trailing partial line is dropped and
+    ``truncated`` is set.
+    """
+
+    def __init__(
+        self,
+        stream: IO[bytes],
+        first_line: int = 1,
+        offset: int = 0,
+        expected_length: Optional[int] = None,
+    ) -> None:
+        self.stream = stream
+        self.first_line = first_line
+        self.offset = offset
+        self.expected_length = expected_length
+        self.bytes_read = 0
+        self.truncated = False
+
+    def skip(self, count: int) -> None:
+        while count > 0:
+            block = self.stream.read(min(count, STREAM_READ_SIZE))
+            if not block:
+                break
+            self.bytes_read += len(block)
+            count -= len(block)
+
+    def _parse(self, number: int, end_offset: int, raw: bytes) -> Optional[NDJSONLine]:
+        if not raw.strip():
+            return None
+        try:
+            return NDJSONLine(number, end_offset, json.loads(raw), None)
+        except ValueError as exc:
+            return NDJSONLine(number, end_offset, None, f"JSON inválido: {exc}")
+
+    def __iter__(self) -> Iterator[NDJSONLine]:
+        buffer = bytearray()
+        number = self.first_line
+        position = self.offset
+        oversized = False
+        while True:
+            block = self.stream.read(STREAM_READ_SIZE)
+            if not block:
+                break
+            self.bytes_read += len(block)
+            buffer += block
+            while True:
+                newline = buffer.find(b"\n")
+                if newline < 0:
+                    if len(buffer) > STREAM_MAX_LINE_BYTES:
+                        # Drop the oversized prefix; the line is rejected once it ends
+                        oversized = True
+                        position += len(buffer)
+                        del buffer[:]
+                    break
+                raw = bytes(buffer[:newline])
+                del buffer[:newline + 1]
+                position += newline + 1
+                if oversized or len(raw) > STREAM_MAX_LINE_BYTES:
+                    oversized = False
+                    yield NDJSONLine(number, position, None, "Linha excede o tamanho máximo")
+                else:
+                    line = self._parse(number, position, raw)
+                    if line:
+                        yield line
+                number += 1
+
+        if self.expected_length is not None and self.bytes_read < self.expected_length:
+            self.truncated = True
+            return
+        if oversized:
+            yield NDJSONLine(number, position + len(buffer), None, "Linha excede o tamanho máximo")
+        elif buffer:
+            line = self._parse(number, position + len(buffer), bytes(buffer))
+            if line:
+                yield line
+
+
+class MessagePackReader(NDJSONReader):
+    """Iterate a stream of concatenated MessagePack objects, one event each.
+
+    Same contract as ``NDJSONReader``, with objects numbered in place of
+    lines and offsets at object boundaries. Objects have no delimiter to
+    resynchronize on, so a malformed or oversized one is reported and ends
+    the stream, leaving the checkpoint at the last good object.
+    """
+
+    def __iter__(self) -> Iterator[NDJSONLine]:
+        unpacker = msgpack.Unpacker(
+            raw=False, max_buffer_size=STREAM_MAX_LINE_BYTES + STREAM_READ_SIZE
+        )
+        number = self.first_line
+        fed = 0
+        while True:
+            block = self.stream.read(STREAM_READ_SIZE)
+            if not block:
+                break
+            self.bytes_read += len(block)
+            try:
+                unpacker.feed(block)
+                fed += len(block)
+                for payload in unpacker:
+                    yield NDJSONLine(number, self.offset + unpacker.tell(), payload, None)
+                    number += 1
+            except msgpack.BufferFull:
+                yield NDJSONLine(
+                    number, self.offset + unpacker.tell(), None, "Objeto excede o tamanho máximo"
+                )
+                return
+            except (ValueError, msgpack.UnpackException) as exc:
+                yield NDJSONLine(
+                    number, self.offset + unpacker.tell(), None, f"MessagePack inválido: {exc}"
+                )
+                return
+
+        if self.expected_length is not None and self.bytes_read < self.expected_length:
+            self.truncated = True
+        elif unpacker.tell() < fed:
+            yield NDJSONLine(number, self.offset + unpacker.tell(), None, "MessagePack incompleto")
+
+
+class CheckpointMismatch(Exception):
+    def __init__(self, checkpoint: IngestCheckpoint) -> None:
+        super().__init__(f"offset must be 0 or {checkpoint.committed_offset}")
+        self.checkpoint = checkpoint
+
+
+class _StreamReport:
+    """Accepted lines as ``[first, last]`` ranges, rejected lines capped."""
+
+    def __init__(self) -> None:
+        self.accepted = 0
+        self.rejected = 0
+        self.accepted_lines: list[list[int]] = []
+        self.rejected_lines: list[dict[str, Any]] = []
+        self.truncated_report = False
+
+    def accept(self, number: int) -> None:
+        self.accepted += 1
+        if self.accepted_lines and self.accepted_lines[-1][1] == number - 1:
+            self.accepted_lines[-1][1] = number
+        elif len(self.accepted_lines) < STREAM_REPORT_LIMIT:
+            self.accepted_lines.append([number, number])
+        else:
+            self.truncated_report = True
+
+    def reject(self, number: int, errors: Any) -> None:
+        self.rejected += 1
+        if len(self.rejected_lines) < STREAM_REPORT_LIMIT:
+            self.rejected_lines.append({"line": number, "errors": errors})
+        else:
+            self.truncated_report = True
+
+
+def ingest_ndjson(
+    stream: IO[bytes],
+    stream_id: Optional[str] = None,
+    offset: int = 0,
+    expected_length: Optional[int] = None,
+    reader_class: type[NDJSONReader] = NDJSONReader,
+) -> dict[str, Any]:
+    """Ingest an NDJSON body in chunks of ``STREAM_CHUNK_LINES`` lines.
+
+    Each chunk is validated, inserted and (when ``stream_id`` is given)
+    checkpointed in one transaction. ``offset`` is where this body starts in
+    the original upload: either 0, in which case the already committed prefix
+    is skipped, or exactly the checkpoint's ``committed_offset``.
+    ``reader_class=MessagePackReader`` reads concatenated MessagePack objects
+    instead of lines.
+    """
+    checkpoint: Optional[IngestCheckpoint] = None
+    first_line = 1
+    start = offset
+    skip = 0
+    if stream_id:
+        checkpoint, _ = IngestCheckpoint.objects.get_or_create(stream_id=stream_id)
+        if offset == checkpoint.committed_offset:
+            first_line = checkpoint.committed_line + 1
+        elif offset == 0:
+            skip = checkpoint.committed_offset
+            first_line = checkpoint.committed_line + 1
+            start = checkpoint.committed_offset
+        else:
+            raise CheckpointMismatch(checkpoint)
+
+    reader = reader_class(
+        stream, first_line=first_line, offset=start, expected_length=expected_length
+    )
+    reader.skip(skip)
+    report = _StreamReport()
+    committed_offset = start
+    committed_line = first_line - 1
+
+    def commit(chunk: list[NDJSONLine]) -> None:
+        nonlocal committed_offset, committed_line
+        parsed = [line for line in chunk if line.error is None]
+        events, errors = validate_event_batch(line.payload for line in parsed)
+        rejected = {parsed[e["index"]].number: e["errors"] for e in errors}
+        rejected.update({line.number: {"line": [line.error]} for line in chunk if line.error})
+        with transaction.atomic():
+            create_events(events)
+            committed_offset = chunk[-1].end_offset
+            committed_line = chunk[-1].number
+            if checkpoint is not None:
+                IngestCheckpoint.objects.filter(pk=checkpoint.pk).update(
+                    committed_offset=committed_offset,
+                    committed_line=committed_line,
+                    accepted=models.F("accepted") + len(events),
+                    rejected=models.F("rejected") + len(rejected),
+                )
+        for line in chunk:
+            if line.number in rejected:
+                report.reject(line.number, rejected[line.number])
+            else:
+                report.accept(line.number)
+
+    chunk: list[NDJSONLine] = []
+    for line in reader:
+        chunk.append(line)
+        if len(chunk) >= STREAM_CHUNK_LINES:
+            commit(chunk)
+            chunk = []
+    if chunk:
+        commit(chunk)
+
+    return {
+        "stream_id": stream_id,
+        "accepted": report.accepted,
+        "rejected": report.rejected,
+        "accepted_lines": report.accepted_lines,
+        "rejected_lines": report.rejected_lines,
+        "report_truncated": report.truncated_report,
+        "committed_offset": committed_offset,
+        "committed_line": committed_line,
+        "complete": not reader.truncated,
+    }
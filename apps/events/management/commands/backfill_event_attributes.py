@@ -0,0 +1,62 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+
+from apps.events.attributes import ATTRIBUTES, refresh_attributes
+from apps.events.models import Event, EventAttribute
+
+
+class Command(BaseCommand):
+    help = (
+        "Extrai de Event.details os atributos indexados declarados em "
+        "apps/events/attributes.py para os eventos já gravados."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--types",
+            default="",
+            help=(
+                "Tipos de evento, separados por vírgula "
+                f"(padrão: todos: {', '.join(ATTRIBUTES)})."
+            ),
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Eventos processados por lote, cada um em sua transação (padrão: 2000).",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        types = [name.strip() for name in options["types"].split(",") if name.strip()]
+        types = types or list(ATTRIBUTES)
+        unknown = set(types) - set(ATTRIBUTES)
+        if unknown:
+            raise CommandError(f"Tipos sem atributos declarados: {', '.join(sorted(unknown))}")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size deve ser positivo")
+
+        # Keyset chunks by id: no cursor stays open between the write transactions
+        events = Event.objects.filter(type__in=types).order_by("id").only("id", "type", "details")
+        last_id = None
+        processed = rows = 0
+        while True:
+            pending = events.filter(id__gt=last_id) if last_id else events
+            chunk = list(pending[:options["chunk_size"]])
+            if not chunk:
+                break
+            with transaction.atomic():
+                rows += refresh_attributes(chunk)
+            processed += len(chunk)
+            last_id = chunk[-1].pk
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{processed} eventos processados")
+
+        # Types no longer declared keep no stale rows
+        stale, _ = EventAttribute.objects.exclude(event__type__in=list(ATTRIBUTES)).delete()
+        self.stdout.write(self.style.SUCCESS(
+            f"{processed} eventos processados; {rows} atributos gravados, "
+            f"{stale} obsoletos removidos"
+        ))
@@ -0,0 +1,104 @@
+import io
+import time
+from typing import Any, Callable
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from apps.core.renderers import MessagePackParser, MessagePackRenderer, msgpack
+from apps.events.ingest import create_events
+from apps.events.models import Event, EventType
+from apps.events.serializers import EventRowSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara tamanho e tempo de codificação/decodificação de JSON e MessagePack para uma "
+        "página da listagem de eventos e para um lote de /api/events/bulk/."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=1000,
+            help="Eventos na página e no lote (padrão: 1000).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Rodadas por formato; vale a melhor (padrão: 5).",
+        )
+        parser.add_argument(
+            "--synthetic",
+            action="store_true",
+            help="Cria os eventos numa transação desfeita ao final, em vez de ler os existentes.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if msgpack is None:
+            raise CommandError("O pacote msgpack não está instalado")
+        if options["rows"] < 1 or options["repeat"] < 1:
+            raise CommandError("--rows e --repeat devem ser positivos")
+        with transaction.atomic():
+            if options["synthetic"]:
+                create_events([
+                    Event(
+                        type=EventType.ITEM_PURCHASE,
+                        details={"item_id": f"item-{i}", "price": i % 100},
+                    )
+                    for i in range(options["rows"])
+                ])
+            rows = EventRowSerializer()
+            page = rows.to_representation(
+                list(rows.rows(Event.objects.order_by("-created_at", "-id")[:options["rows"]]))
+            )
+            transaction.set_rollback(True)
+        if not page:
+            raise CommandError("Nenhum evento para ler; use --synthetic")
+
+        payloads = {
+            "listagem": {"next": None, "previous": None, "results": page},
+            "bulk": [
+                {"type": row["type"], "details": row["details"], "timestamp": row["timestamp"],
+                 "player": row["player"], "guild": row["guild"]}
+                for row in page
+            ],
+        }
+        formats = {
+            "JSON": (JSONRenderer(), JSONParser()),
+            "MessagePack": (MessagePackRenderer(), MessagePackParser()),
+        }
+        for name, data in payloads.items():
+            self.stdout.write(f"{name} ({len(page)} eventos):")
+            bodies = {label: renderer.render(data) for label, (renderer, _) in formats.items()}
+            decoded = [
+                parser.parse(io.BytesIO(bodies[label])) for label, (_, parser) in formats.items()
+            ]
+            if decoded[0] != decoded[1]:
+                raise CommandError("Conteúdo diferente entre os formatos")
+            sizes = {}
+            for label, (renderer, parser) in formats.items():
+                body = bodies[label]
+                encode = self._best(lambda: renderer.render(data), options["repeat"])
+                decode = self._best(lambda: parser.parse(io.BytesIO(body)), options["repeat"])
+                sizes[label] = len(body)
+                self.stdout.write(
+                    f"  {label}: {len(body):,} bytes, codifica {encode * 1000:.2f} ms, "
+                    f"decodifica {decode * 1000:.2f} ms"
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f"  MessagePack: {sizes['MessagePack'] / sizes['JSON']:.0%} do tamanho do JSON"
+            ))
+
+    @staticmethod
+    def _best(run: Callable[[], Any], repeat: int) -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - started)
+        return best
@@ -0,0 +1,88 @@
+import time
+from typing import Any, Callable
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+
+from apps.events.ingest import create_events
+from apps.events.models import Event, EventType
+from apps.events.serializers import EventRowSerializer, EventSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara linhas por segundo do EventSerializer (ModelSerializer) e do caminho rápido "
+        "EventRowSerializer (values_list) na leitura de eventos, incluindo a consulta."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=5000,
+            help="Eventos lidos por rodada (padrão: 5000).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Rodadas por serializer; vale a melhor (padrão: 5).",
+        )
+        parser.add_argument(
+            "--synthetic",
+            action="store_true",
+            help="Cria os eventos numa transação desfeita ao final, em vez de ler os existentes.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["rows"] < 1 or options["repeat"] < 1:
+            raise CommandError("--rows e --repeat devem ser positivos")
+        with transaction.atomic():
+            if options["synthetic"]:
+                create_events([
+                    Event(
+                        type=EventType.ITEM_PURCHASE,
+                        details={"item_id": f"item-{i}", "price": i % 100},
+                    )
+                    for i in range(options["rows"])
+                ])
+            self._run(options["rows"], options["repeat"])
+            transaction.set_rollback(True)
+
+    def _run(self, rows: int, repeat: int) -> None:
+        queryset = Event.objects.order_by("-created_at", "-id")[:rows]
+        fast = EventRowSerializer()
+
+        def model_serializer() -> list[Any]:
+            return list(EventSerializer(list(queryset), many=True).data)
+
+        def row_serializer() -> list[Any]:
+            return fast.to_representation(list(fast.rows(queryset)))
+
+        slow_output, fast_output = model_serializer(), row_serializer()
+        if not fast_output:
+            raise CommandError("Nenhum evento para ler; use --synthetic")
+        if [dict(row) for row in slow_output] != fast_output:
+            raise CommandError("Saídas diferentes entre os serializers")
+
+        results = {
+            "EventSerializer": self._best(model_serializer, repeat),
+            "EventRowSerializer": self._best(row_serializer, repeat),
+        }
+        for name, seconds in results.items():
+            self.stdout.write(
+                f"{name}: {len(fast_output) / seconds:,.0f} linhas/s ({seconds * 1000:.1f} ms)"
+            )
+        speedup = results["EventSerializer"] / results["EventRowSerializer"]
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(fast_output)} linhas; caminho rápido {speedup:.1f}x mais rápido"
+        ))
+
+    @staticmethod
+    def _best(run: Callable[[], Any], repeat: int) -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - started)
+        return best
@@ -0,0 +1,260 @@
+import asyncio
+import io
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+from urllib.parse import urlencode
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from apps.awards.models import PlayerAwardCount
+from apps.events.ingest import create_events
+from apps.events.models import Event, EventType
+from apps.events.stats import stats_cache
+from apps.guilds.models import Guild
+from apps.players.models import Player
+from apps.users.models import User
+
+HOST = "127.0.0.1"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara latência (p50/p95) e vazão dos endpoints de leitura servidos pelo WSGIHandler "
+        "(um thread por requisição em andamento) e pelo ASGIHandler (views assíncronas num único "
+        "event loop), com a mesma concorrência, no próprio processo, e quantas conexões ao banco "
+        "cada um abriu."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Requisições por endpoint e por servidor (padrão: 200).",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=16,
+            help="Requisições em andamento ao mesmo tempo (padrão: 16).",
+        )
+        parser.add_argument(
+            "--synthetic",
+            type=int,
+            default=0,
+            metavar="N",
+            help="Grava N eventos de um player e guild de teste, apagados ao final.",
+        )
+        parser.add_argument(
+            "--cold",
+            action="store_true",
+            help="Invalida o cache de player_stats/guild_stats antes de cada requisição.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["requests"] < 1 or options["concurrency"] < 1 or options["synthetic"] < 0:
+            raise CommandError("--requests e --concurrency devem ser positivos")
+        # Committed, not rolled back: the handlers read from their own threads and connections
+        player = self._synthetic(options["synthetic"]) if options["synthetic"] else None
+        try:
+            self._run(player, options["requests"], options["concurrency"], options["cold"])
+        finally:
+            if player is not None:
+                Event.objects.filter(player=player).delete()
+                guild = player.guild
+                player.user.delete()
+                if guild is not None:
+                    guild.delete()
+
+    def _synthetic(self, count: int) -> Player:
+        guild = Guild.objects.create(name="benchmark-read-path", score="0")
+        player = Player.objects.create(
+            user=User.objects.create(username="benchmark-read-path"), guild=guild
+        )
+        kinds = [EventType.QUEST_COMPLETE, EventType.ITEM_PURCHASE, EventType.PLAYER_LEVEL_UP]
+        create_events([
+            Event(type=kinds[i % len(kinds)], details={"n": i}, player=player, guild=guild)
+            for i in range(count)
+        ])
+        return player
+
+    def _run(self, player: Optional[Player], requests: int, concurrency: int, cold: bool) -> None:
+        event = (
+            Event.objects.filter(player=player) if player else
+            Event.objects.filter(player__isnull=False, guild__isnull=False)
+        ).order_by("-created_at").first()
+        if event is None:
+            raise CommandError("Nenhum evento com player e guild; use --synthetic N")
+        paths = [
+            ("/api/events/", {"page_size": 50}),
+            ("/api/events/statistics/", {}),
+            ("/api/events/player_stats/", {"player_id": event.player_id}),
+            ("/api/events/guild_stats/", {"guild_id": event.guild_id}),
+            ("/api/awards/leaderboard/", {}),
+        ]
+        entities = [("player", event.player_id), ("guild", event.guild_id)]
+        before = (lambda: stats_cache.bump(entities)) if cold else (lambda: None)
+        if not PlayerAwardCount.objects.exists():
+            self.stdout.write(self.style.WARNING(
+                "Ranking de prêmios vazio: leaderboard mede uma página vazia"
+            ))
+
+        connect_ms = self._connect_ms()
+        opened: list[str] = []
+
+        def count_connection(sender: Any, connection: Any, **kwargs: Any) -> None:
+            opened.append(connection.alias)
+
+        connection_created.connect(count_connection)
+        wsgi, asgi = WSGIHandler(), ASGIHandler()
+        try:
+            for path, params in paths:
+                query = urlencode(params)
+                self.stdout.write(f"{path}{'?' + query if query else ''}")
+                for name in ("WSGI", "ASGI"):
+                    opened.clear()
+                    args = (path, query, requests, concurrency, before)
+                    if name == "WSGI":
+                        latencies, elapsed = self._wsgi(wsgi, *args)
+                    else:
+                        latencies, elapsed = asyncio.run(self._asgi(asgi, *args))
+                    self.stdout.write(
+                        f"  {name}: p50 {self._percentile(latencies, 50):.1f} ms, "
+                        f"p95 {self._percentile(latencies, 95):.1f} ms, "
+                        f"{requests / elapsed:,.0f} req/s, "
+                        f"{len(opened)} conexões abertas (~{len(opened) * connect_ms:.0f} ms)"
+                    )
+        finally:
+            connection_created.disconnect(count_connection)
+        self.stdout.write(f"Abrir uma conexão ao banco: {connect_ms:.2f} ms")
+        self.stdout.write(self.style.SUCCESS(
+            f"{requests} requisições por endpoint, {concurrency} simultâneas"
+            + (", cache de stats invalidado" if cold else "")
+        ))
+
+    def _wsgi(
+        self,
+        handler: WSGIHandler,
+        path: str,
+        query: str,
+        requests: int,
+        concurrency: int,
+        before: Any,
+    ) -> tuple[list[float], float]:
+        def one(_: int) -> float:
+            before()
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": path,
+                "QUERY_STRING": query,
+                "SERVER_NAME": HOST,
+                "SERVER_PORT": "80",
+                "HTTP_HOST": HOST,
+                "SERVER_PROTOCOL": "HTTP/1.1",
+                "wsgi.input": io.BytesIO(),
+                "wsgi.errors": io.StringIO(),
+                "wsgi.url_scheme": "http",
+            }
+            status: list[str] = []
+            started = time.perf_counter()
+            response = handler(environ, lambda code, headers: status.append(code))
+            b"".join(response)
+            response.close()
+            latency = time.perf_counter() - started
+            self._check(path, int(status[0].split()[0]))
+            return latency
+
+        with ThreadPoolExecutor(concurrency) as pool:
+            started = time.perf_counter()
+            latencies = list(pool.map(one, range(requests)))
+        return latencies, time.perf_counter() - started
+
+    async def _asgi(
+        self,
+        handler: ASGIHandler,
+        path: str,
+        query: str,
+        requests: int,
+        concurrency: int,
+        before: Any,
+    ) -> tuple[list[float], float]:
+        slots = asyncio.Semaphore(concurrency)
+
+        async def one() -> float:
+            async with slots:
+                before()
+                scope = {
+                    "type": "http",
+                    "asgi": {"version": "3.0"},
+                    "http_version": "1.1",
+                    "method": "GET",
+                    "scheme": "http",
+                    "path": path,
+                    "raw_path": path.encode(),
+                    "query_string": query.encode(),
+                    "root_path": "",
+                    "headers": [(b"host", HOST.encode())],
+                    "client": (HOST, 0),
+                    "server": (HOST, 80),
+                }
+                body_sent = False
+
+                async def receive() -> dict[str, Any]:
+                    nonlocal body_sent
+                    if not body_sent:
+                        body_sent = True
+                        return {"type": "http.request", "body": b"", "more_body": False}
+                    # The client stays connected; the handler cancels this wait when done
+                    await asyncio.Future()
+                    return {"type": "http.disconnect"}
+
+                status: list[int] = []
+
+                async def send(message: dict[str, Any]) -> None:
+                    if message["type"] == "http.response.start":
+                        status.append(message["status"])
+
+                started = time.perf_counter()
+                await handler(scope, receive, send)
+                latency = time.perf_counter() - started
+                self._check(path, status[0])
+                return latency
+
+        started = time.perf_counter()
+        latencies = list(await asyncio.gather(*(one() for _ in range(requests))))
+        return latencies, time.perf_counter() - started
+
+    @staticmethod
+    def _connect_ms(samples: int = 5) -> float:
+        """Median time to open a connection to the default database, in ms."""
+        def measure() -> float:
+            wrapper = connections["default"]
+            timings = []
+            for _ in range(samples):
+                wrapper.close()
+                started = time.perf_counter()
+                wrapper.ensure_connection()
+                timings.append(time.perf_counter() - started)
+            wrapper.close()
+            return statistics.median(timings) * 1000
+
+        # On its own thread, so this thread's connection is left alone
+        with ThreadPoolExecutor(1) as pool:
+            return pool.submit(measure).result()
+
+    @staticmethod
+    def _check(path: str, status: int) -> None:
+        if status != 200:
+            raise CommandError(f"{path} respondeu {status}")
+
+    @staticmethod
+    def _percentile(latencies: list[float], percent: int) -> float:
+        if len(latencies) < 2:
+            return latencies[0] * 1000
+        return statistics.quantiles(latencies, n=100)[percent - 1] * 1000
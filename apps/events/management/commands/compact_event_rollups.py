@@ -0,0 +1,14 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from apps.events.rollups import compact_rollups
+
+
+class Command(BaseCommand):
+    help = "Remove buckets de rollup mais antigos que a retenção de cada resolução."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        deleted = compact_rollups()
+        for resolution, count in deleted.items():
+            self.stdout.write(f"{resolution}: {count} buckets removidos")
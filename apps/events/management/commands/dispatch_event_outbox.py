@@ -0,0 +1,97 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import OperationalError
+
+from apps.events import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Entrega os eventos do EventOutbox aos destinos de EVENTS_OUTBOX_SINKS, em lotes "
+        "ordenados, com nova tentativa e backoff exponencial em caso de falha."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--sinks",
+            default="",
+            help="Destinos atendidos por este processo, separados por vírgula (padrão: todos).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=outbox.BATCH_SIZE,
+            help=f"Eventos por lote (padrão: {outbox.BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Segundos de espera quando não há nada a entregar (padrão: 1.0).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help=(
+                "Entrega o que está pendente e termina; um destino que falha é deixado para a "
+                "próxima execução."
+            ),
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        configured = outbox.configured_sinks()
+        names = [name.strip() for name in options["sinks"].split(",") if name.strip()]
+        names = names or list(configured)
+        unknown = set(names) - set(configured)
+        if unknown:
+            raise CommandError(f"Destinos não configurados: {', '.join(sorted(unknown))}")
+        if not names:
+            raise CommandError("Nenhum destino configurado em EVENTS_OUTBOX_SINKS")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size deve ser positivo")
+
+        active = [configured[name] for name in names]
+        delivered = dict.fromkeys(names, 0)
+        failures = dict.fromkeys(names, 0)
+        started = time.perf_counter()
+        try:
+            while active:
+                progress = False
+                for sink in list(active):
+                    try:
+                        sent = outbox.dispatch_batch(sink, options["batch_size"])
+                    except OperationalError:
+                        # e.g. another process holds the SQLite write lock; retry
+                        continue
+                    if sent > 0:
+                        delivered[sink.name] += sent
+                        progress = True
+                    elif sent < 0:
+                        failures[sink.name] += 1
+                        if options["verbosity"] > 1:
+                            self.stderr.write(
+                                f"{sink.name}: falha na entrega, nova tentativa com backoff"
+                            )
+                        if options["once"]:
+                            active.remove(sink)
+                if progress:
+                    outbox.prune()
+                elif options["once"]:
+                    break
+                else:
+                    time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            pass
+
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        stats = outbox.outbox_stats()["sinks"]
+        for name in names:
+            self.stdout.write(
+                f"{name}: {delivered[name]} eventos entregues "
+                f"({delivered[name] / elapsed:,.0f}/s), "
+                f"{failures[name]} falhas, pendentes: {stats[name]['pending']}, "
+                f"atraso: {stats[name]['lag_seconds']}s"
+            )
+        self.stdout.write(self.style.SUCCESS(f"{sum(delivered.values())} eventos entregues"))
@@ -0,0 +1,95 @@
+from typing import Any, Mapping
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import models, transaction
+
+from apps.events.counters import activity_from_events, count_from_events
+from apps.events.models import EventTypeCount, GuildEventCount, PlayerEventCount
+from apps.guilds.models import Guild
+from apps.players.models import Player
+
+
+def _diff(model: type[models.Model], expected: Mapping[Any, int]) -> list[tuple[Any, int, int]]:
+    stored = dict(model.objects.filter(count__gt=0).values_list("pk", "count"))
+    keys = set(stored) | set(expected)
+    return [
+        (key, stored.get(key, 0), expected.get(key, 0))
+        for key in keys
+        if stored.get(key, 0) != expected.get(key, 0)
+    ]
+
+
+def _stale_activity(
+    model: type[models.Model], expected: Mapping[Any, tuple[Any, str]]
+) -> list[Any]:
+    """Instances whose ``last_seen`` / ``last_event_type`` differ from ``expected``.
+
+    The returned instances already carry the corrected values.
+    """
+    stale = []
+    instances = model.objects.only("pk", "last_seen", "last_event_type")
+    for instance in instances.iterator(chunk_size=2000):
+        activity = expected.get(instance.pk, (None, ""))
+        if (instance.last_seen, instance.last_event_type) != activity:  # type: ignore[attr-defined]
+            instance.last_seen, instance.last_event_type = activity  # type: ignore[attr-defined]
+            stale.append(instance)
+    return stale
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula as tabelas de contadores de eventos e o resumo de atividade "
+        "(last_seen) de players e guilds a partir da tabela Event."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Apenas compara os contadores com os dados brutos, sem gravar.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        with transaction.atomic():
+            types, players, guilds = count_from_events()
+            tables: list[tuple[type[models.Model], Mapping[Any, int], str]] = [
+                (EventTypeCount, types, "type"),
+                (PlayerEventCount, players, "player_id"),
+                (GuildEventCount, guilds, "guild_id"),
+            ]
+            mismatches = 0
+            for model, expected, _ in tables:
+                for key, stored, actual in _diff(model, expected):
+                    mismatches += 1
+                    self.stdout.write(
+                        f"{model.__name__} {key}: contador={stored} real={actual}"
+                    )
+            latest_players, latest_guilds = activity_from_events()
+            stale = [
+                (Player, _stale_activity(Player, latest_players)),
+                (Guild, _stale_activity(Guild, latest_guilds)),
+            ]
+            for model, instances in stale:
+                for instance in instances:
+                    mismatches += 1
+                    self.stdout.write(f"{model.__name__} {instance.pk}: last_seen divergente")
+
+            if options["check"]:
+                if mismatches:
+                    raise CommandError(f"{mismatches} contadores divergentes")
+                self.stdout.write(self.style.SUCCESS("Contadores consistentes"))
+                return
+
+            for model, expected, pk_name in tables:
+                model.objects.all().delete()
+                model.objects.bulk_create(
+                    [model(**{pk_name: key, "count": value}) for key, value in expected.items()],
+                    batch_size=1000,
+                )
+            for model, instances in stale:
+                model.objects.bulk_update(
+                    instances, ["last_seen", "last_event_type"], batch_size=1000
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f"Contadores recalculados ({mismatches} divergências corrigidas)"
+        ))
@@ -0,0 +1,26 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from apps.events.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula os buckets de rollup (minuto, hora e dia) de /api/events/timeseries/ a partir "
+        "da tabela Event."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Eventos lidos por lote (padrão: 2000).",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size deve ser positivo")
+        processed = rebuild_rollups(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rollups recalculados ({processed} eventos lidos)"))
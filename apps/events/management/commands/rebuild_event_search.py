@@ -0,0 +1,40 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+
+from apps.events.models import Event
+from apps.events.search import reindex_events
+
+
+class Command(BaseCommand):
+    help = "Recria os documentos de busca textual (details) dos eventos já gravados."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Eventos processados por lote, cada um em sua transação (padrão: 2000).",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size deve ser positivo")
+
+        # Keyset chunks by id: no cursor stays open between the write transactions
+        events = Event.objects.order_by("id").only("id", "details")
+        last_id = None
+        processed = 0
+        while True:
+            pending = events.filter(id__gt=last_id) if last_id else events
+            chunk = list(pending[:options["chunk_size"]])
+            if not chunk:
+                break
+            with transaction.atomic():
+                reindex_events(chunk)
+            processed += len(chunk)
+            last_id = chunk[-1].pk
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{processed} eventos indexados")
+        self.stdout.write(self.style.SUCCESS(f"{processed} eventos indexados para busca"))
@@ -0,0 +1,26 @@
+from typing import Sequence
+
+from django.db import transaction
+
+from apps.core.metrics import Counter, Histogram
+from apps.events.models import Event
+
+EVENTS_INGESTED = Counter("eventhub_events_ingested_total", "Events committed, by type", ["type"])
+INGEST_SECONDS = Histogram(
+    "eventhub_ingest_seconds",
+    "Duration of one write request (single, bulk or stream), validation and signals included",
+    ["mode"],
+)
+
+
+def count_on_commit(events: Sequence[Event]) -> None:
+    """Count ``events`` by type once the write commits; rolled-back events are not counted."""
+    counts: dict[str, int] = {}
+    for event in events:
+        counts[event.type] = counts.get(event.type, 0) + 1
+
+    def count() -> None:
+        for event_type, n in counts.items():
+            EVENTS_INGESTED.inc(n, type=event_type)
+
+    transaction.on_commit(count)
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-18 11:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0002_alter_event_options_event_timestamp_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IngestCheckpoint",
+            fields=[
+                (
+                    "stream_id",
+                    models.CharField(max_length=200, primary_key=True, serialize=False),
+                ),
+                (
+                    "committed_offset",
+                    models.BigIntegerField(
+                        default=0,
+                        help_text="Byte offset just past the last committed line",
+                    ),
+                ),
+                ("committed_line", models.BigIntegerField(default=0)),
+                ("accepted", models.BigIntegerField(default=0)),
+                ("rejected", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
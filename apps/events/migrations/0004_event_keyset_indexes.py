@@ -0,0 +1,54 @@
+# Generated by Django 6.0 on 2026-10-18 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0003_ingestcheckpoint"),
+        ("guilds", "0001_initial"),
+        ("players", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="event",
+            name="events_even_type_52d8c6_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="event",
+            name="events_even_player__0c74b9_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="event",
+            name="events_even_guild_i_038776_idx",
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="events_even_created_99997e_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["type", "-created_at", "-id"],
+                name="events_even_type_3fd388_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["player", "-created_at", "-id"],
+                name="events_even_player__f68b44_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["guild", "-created_at", "-id"],
+                name="events_even_guild_i_c76c0b_idx",
+            ),
+        ),
+    ]
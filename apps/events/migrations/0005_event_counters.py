@@ -0,0 +1,97 @@
+# Generated by Django 6.0 on 2026-10-18 11:14
+
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    EventTypeCount = apps.get_model("events", "EventTypeCount")
+    PlayerEventCount = apps.get_model("events", "PlayerEventCount")
+    GuildEventCount = apps.get_model("events", "GuildEventCount")
+
+    types, players, guilds = Counter(), Counter(), Counter()
+    rows = Event.objects.order_by().values_list("type", "player_id", "guild_id")
+    for event_type, player_id, guild_id in rows.iterator(chunk_size=5000):
+        types[event_type] += 1
+        if player_id:
+            players[player_id] += 1
+        if guild_id:
+            guilds[guild_id] += 1
+
+    EventTypeCount.objects.bulk_create(
+        [EventTypeCount(type=k, count=v) for k, v in types.items()]
+    )
+    PlayerEventCount.objects.bulk_create(
+        [PlayerEventCount(player_id=k, count=v) for k, v in players.items()]
+    )
+    GuildEventCount.objects.bulk_create(
+        [GuildEventCount(guild_id=k, count=v) for k, v in guilds.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0004_event_keyset_indexes"),
+        ("guilds", "0001_initial"),
+        ("players", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventTypeCount",
+            fields=[
+                (
+                    "type",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                ("count", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="GuildEventCount",
+            fields=[
+                (
+                    "guild",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="event_count",
+                        serialize=False,
+                        to="guilds.guild",
+                    ),
+                ),
+                ("count", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["-count"], name="events_guil_count_24c050_idx")
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="PlayerEventCount",
+            fields=[
+                (
+                    "player",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="event_count",
+                        serialize=False,
+                        to="players.player",
+                    ),
+                ),
+                ("count", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["-count"], name="events_play_count_b3d541_idx")
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
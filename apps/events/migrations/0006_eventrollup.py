@@ -0,0 +1,51 @@
+# Generated by Django 6.0 on 2026-10-18 11:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0005_event_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "resolution",
+                    models.CharField(
+                        choices=[
+                            ("minute", "Minute"),
+                            ("hour", "Hour"),
+                            ("day", "Day"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("dimension", models.CharField(max_length=10)),
+                ("key", models.CharField(blank=True, max_length=64)),
+                ("bucket_start", models.DateTimeField()),
+                ("count", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["resolution", "bucket_start"],
+                        name="events_even_resolut_200d69_idx",
+                    )
+                ],
+                "unique_together": {("resolution", "dimension", "key", "bucket_start")},
+            },
+        ),
+    ]
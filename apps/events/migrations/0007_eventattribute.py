@@ -0,0 +1,49 @@
+# Generated by Django 6.0 on 2026-10-18 14:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0006_eventrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventAttribute",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=64)),
+                ("value", models.CharField(max_length=255)),
+                ("number", models.FloatField(blank=True, null=True)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attributes",
+                        to="events.event",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["key", "value", "event"], name="events_attr_value_idx"
+                    ),
+                    models.Index(
+                        fields=["key", "number", "event"], name="events_attr_number_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 6.0 on 2026-10-18 14:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SQLITE_INDEX = [
+    "CREATE VIRTUAL TABLE events_eventsearch_fts USING fts5("
+    "body, content='events_eventsearchdocument', content_rowid='id')",
+    "CREATE TRIGGER events_eventsearch_ai AFTER INSERT ON events_eventsearchdocument BEGIN "
+    "INSERT INTO events_eventsearch_fts(rowid, body) VALUES (new.id, new.body); END",
+    "CREATE TRIGGER events_eventsearch_ad AFTER DELETE ON events_eventsearchdocument BEGIN "
+    "INSERT INTO events_eventsearch_fts(events_eventsearch_fts, rowid, body) "
+    "VALUES ('delete', old.id, old.body); END",
+    "CREATE TRIGGER events_eventsearch_au AFTER UPDATE ON events_eventsearchdocument BEGIN "
+    "INSERT INTO events_eventsearch_fts(events_eventsearch_fts, rowid, body) "
+    "VALUES ('delete', old.id, old.body); "
+    "INSERT INTO events_eventsearch_fts(rowid, body) VALUES (new.id, new.body); END",
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS events_eventsearch_ai",
+    "DROP TRIGGER IF EXISTS events_eventsearch_ad",
+    "DROP TRIGGER IF EXISTS events_eventsearch_au",
+    "DROP TABLE IF EXISTS events_eventsearch_fts",
+]
+POSTGRES_INDEX = [
+    "CREATE INDEX events_eventsearch_gin ON events_eventsearchdocument "
+    "USING GIN (to_tsvector('simple', body))",
+]
+POSTGRES_DROP = ["DROP INDEX IF EXISTS events_eventsearch_gin"]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for sql in statements.get(vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0007_eventattribute"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventSearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("body", models.TextField()),
+                (
+                    "event",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_document",
+                        to="events.event",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(
+            _run({"sqlite": SQLITE_INDEX, "postgresql": POSTGRES_INDEX}),
+            _run({"sqlite": SQLITE_DROP, "postgresql": POSTGRES_DROP}),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 6.0 on 2026-10-18 15:20
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0008_event_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventOutbox",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("event_id", models.UUIDField()),
+                (
+                    "payload",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder
+                    ),
+                ),
+                ("enqueued_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="OutboxCursor",
+            fields=[
+                (
+                    "sink",
+                    models.CharField(max_length=100, primary_key=True, serialize=False),
+                ),
+                ("last_id", models.BigIntegerField(default=0)),
+                ("delivered", models.BigIntegerField(default=0)),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("next_attempt_at", models.DateTimeField(blank=True, null=True)),
+                ("leased_until", models.DateTimeField(blank=True, null=True)),
+                ("last_error", models.TextField(blank=True)),
+                ("last_delivered_at", models.DateTimeField(blank=True, null=True)),
+                ("last_batch_size", models.PositiveIntegerField(default=0)),
+                ("last_batch_seconds", models.FloatField(default=0.0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 6.0 on 2026-10-19 09:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def pending_deliveries(apps, schema_editor):
+    # Rows past each configured sink's old position are still to be sent
+    EventOutbox = apps.get_model("events", "EventOutbox")
+    OutboxCursor = apps.get_model("events", "OutboxCursor")
+    OutboxDelivery = apps.get_model("events", "OutboxDelivery")
+    positions = dict(OutboxCursor.objects.values_list("sink", "last_id"))
+    for sink in getattr(settings, "EVENTS_OUTBOX_SINKS", {}):
+        ids = EventOutbox.objects.filter(id__gt=positions.get(sink, 0)).values_list("id", flat=True)
+        OutboxDelivery.objects.bulk_create(
+            (OutboxDelivery(sink=sink, entry_id=entry_id) for entry_id in ids.iterator()),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0009_event_outbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxDelivery",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("sink", models.CharField(max_length=100)),
+                (
+                    "entry",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="deliveries",
+                        to="events.eventoutbox",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["sink", "id"], name="outbox_delivery_sink_idx")
+                ],
+            },
+        ),
+        migrations.RunPython(pending_deliveries, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="outboxcursor",
+            name="last_id",
+        ),
+    ]
@@ -1,5 +1,7 @@
 import uuid
-from django.db import models
+from typing import Any
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
 from apps.players.models import Player
 from apps.guilds.models import Guild
 
@@ -56,11 +58,201 @@ class Event(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        # Every index ends in (-created_at, -id) so keyset pages over any
+        # of the list filters are a single range scan.
         indexes = [
-            models.Index(fields=["type", "-created_at"]),
-            models.Index(fields=["player", "-created_at"]),
-            models.Index(fields=["guild", "-created_at"]),
+            models.Index(fields=["-created_at", "-id"]),
+            models.Index(fields=["type", "-created_at", "-id"]),
+            models.Index(fields=["player", "-created_at", "-id"]),
+            models.Index(fields=["guild", "-created_at", "-id"]),
         ]
 
     def __str__(self) -> str:
         return f"Event {self.id} ({self.type})"
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        # post_save receivers (counters, awards) share the insert's transaction
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+
+class IngestCheckpoint(models.Model):
+    """Last committed position of a resumable NDJSON upload."""
+
+    stream_id = models.CharField(max_length=200, primary_key=True)
+    committed_offset = models.BigIntegerField(
+        default=0,
+        help_text="Byte offset just past the last committed line"
+    )
+    committed_line = models.BigIntegerField(default=0)
+    accepted = models.BigIntegerField(default=0)
+    rejected = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"Checkpoint {self.stream_id} @ {self.committed_offset}"
+
+
+class EventTypeCount(models.Model):
+    type = models.CharField(max_length=50, primary_key=True)
+    count = models.BigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.type}: {self.count}"
+
+
+class PlayerEventCount(models.Model):
+    player = models.OneToOneField(
+        Player,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="event_count"
+    )
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["-count"])]
+
+    def __str__(self) -> str:
+        return f"{self.player_id}: {self.count}"
+
+
+class GuildEventCount(models.Model):
+    guild = models.OneToOneField(
+        Guild,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="event_count"
+    )
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["-count"])]
+
+    def __str__(self) -> str:
+        return f"{self.guild_id}: {self.count}"
+
+
+class RollupResolution(models.TextChoices):
+    MINUTE = "minute", "Minute"
+    HOUR = "hour", "Hour"
+    DAY = "day", "Day"
+
+
+class EventRollup(models.Model):
+    """Number of events in one time bucket for one dimension value.
+
+    ``dimension`` is ``all`` (empty ``key``), ``type``, ``guild`` or
+    ``player``; ``key`` holds the type name or the guild/player id.
+    """
+
+    resolution = models.CharField(max_length=10, choices=RollupResolution.choices)
+    dimension = models.CharField(max_length=10)
+    key = models.CharField(max_length=64, blank=True)
+    bucket_start = models.DateTimeField()
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("resolution", "dimension", "key", "bucket_start")
+        indexes = [models.Index(fields=["resolution", "bucket_start"])]
+
+    def __str__(self) -> str:
+        return f"{self.resolution} {self.dimension}={self.key} @ {self.bucket_start}: {self.count}"
+
+
+class EventAttribute(models.Model):
+    """One value extracted from ``Event.details`` at write time.
+
+    Which keys are extracted, per event type, is declared in
+    ``apps.events.attributes.ATTRIBUTES``. List values (``party_members``)
+    get one row per element. ``value`` holds the text form for equality
+    filters; ``number`` is set for numeric attributes and serves range filters.
+    """
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="attributes")
+    key = models.CharField(max_length=64)
+    value = models.CharField(max_length=255)
+    number = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["key", "value", "event"], name="events_attr_value_idx"),
+            models.Index(fields=["key", "number", "event"], name="events_attr_number_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.event_id} {self.key}={self.value}"
+
+
+class EventSearchDocument(models.Model):
+    """Searchable text of an event's ``details`` (see ``apps.events.search``).
+
+    The full-text index over ``body`` is database specific and created by
+    migration: an external-content FTS5 table kept in sync by triggers on
+    SQLite, a GIN index on ``to_tsvector('simple', body)`` on PostgreSQL.
+    """
+
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, related_name="search_document")
+    body = models.TextField()
+
+    def __str__(self) -> str:
+        return f"{self.event_id}: {self.body[:50]}"
+
+
+class EventOutbox(models.Model):
+    """A created event waiting to be forwarded to the downstream sinks.
+
+    Written in the transaction that inserts the event, so a committed event
+    always has its row and a rolled back one never does. ``payload`` is the
+    event as serialized at write time; the row is kept until every
+    configured sink has delivered it (see ``OutboxDelivery``).
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    event_id = models.UUIDField()
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    enqueued_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"Outbox {self.id} (event {self.event_id})"
+
+
+class OutboxDelivery(models.Model):
+    """One ``EventOutbox`` row still to be sent to one sink.
+
+    Written with the outbox row and deleted once the sink accepted it, so a
+    row is pending exactly until it is delivered, whatever order concurrent
+    ingest transactions commit in.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    sink = models.CharField(max_length=100)
+    entry = models.ForeignKey(EventOutbox, on_delete=models.CASCADE, related_name="deliveries")
+
+    class Meta:
+        indexes = [models.Index(fields=["sink", "id"], name="outbox_delivery_sink_idx")]
+
+    def __str__(self) -> str:
+        return f"{self.entry_id} -> {self.sink}"
+
+
+class OutboxCursor(models.Model):
+    """Delivery state of one sink: its retry schedule, lease and totals.
+
+    A failed batch is retried after ``next_attempt_at``; ``leased_until``
+    keeps a second dispatcher off the sink while one is sending.
+    """
+
+    sink = models.CharField(max_length=100, primary_key=True)
+    delivered = models.BigIntegerField(default=0)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    leased_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    last_delivered_at = models.DateTimeField(null=True, blank=True)
+    # Size and duration of the last delivered batch, for throughput
+    last_batch_size = models.PositiveIntegerField(default=0)
+    last_batch_seconds = models.FloatField(default=0.0)
+
+    def __str__(self) -> str:
+        return f"{self.sink} ({self.delivered} delivered)"
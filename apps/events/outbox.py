@@ -0,0 +1,159 @@
+import time
+import traceback
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Optional, Sequence
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Exists, Min, OuterRef, Q
+
+from apps.events.models import Event, EventOutbox, OutboxCursor, OutboxDelivery
+from apps.events.serializers import EventSerializer
+from apps.events.sinks import Sink, load_sinks
+
+# Sink name -> {"class": "apps.events.sinks.FileSink", **options}. With no
+# sink configured nothing is written to the outbox.
+SINKS: dict[str, dict[str, Any]] = getattr(settings, "EVENTS_OUTBOX_SINKS", {})
+BATCH_SIZE: int = getattr(settings, "EVENTS_OUTBOX_BATCH_SIZE", 500)
+# Retry delay after a failed batch: BACKOFF_BASE * 2 ** (attempts - 1), capped
+BACKOFF_BASE: float = getattr(settings, "EVENTS_OUTBOX_BACKOFF_BASE", 1.0)
+BACKOFF_MAX: float = getattr(settings, "EVENTS_OUTBOX_BACKOFF_MAX", 300.0)
+# How long a dispatcher owns a sink before another one may take over
+LEASE_SECONDS: float = getattr(settings, "EVENTS_OUTBOX_LEASE_SECONDS", 60.0)
+
+
+def _now() -> datetime:
+    return datetime.now(dt_timezone.utc)
+
+
+def enqueue(events: Sequence[Event]) -> int:
+    """Queue ``events`` for the sinks; must run in the transaction that writes them."""
+    if not SINKS or not events:
+        return 0
+    rows = EventOutbox.objects.bulk_create([
+        EventOutbox(event_id=row["id"], payload=row)
+        for row in EventSerializer(events, many=True).data
+    ], batch_size=1000)
+    if not connection.features.can_return_rows_from_bulk_insert:
+        ids = dict(EventOutbox.objects.filter(event_id__in=[row.event_id for row in rows])
+                   .values_list("event_id", "id"))
+        for row in rows:
+            row.id = ids[row.event_id]
+    # One pending delivery per sink, committed (or rolled back) with the event
+    OutboxDelivery.objects.bulk_create(
+        [OutboxDelivery(sink=name, entry_id=row.id) for row in rows for name in SINKS],
+        batch_size=1000,
+    )
+    return len(rows)
+
+
+def configured_sinks() -> dict[str, Sink]:
+    return load_sinks(SINKS)
+
+
+def backoff(attempts: int) -> float:
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** max(0, attempts - 1))
+
+
+def _lease(name: str, now: datetime) -> Optional[datetime]:
+    """Lease ``name``; returns the ``leased_until`` written, which identifies this lease."""
+    OutboxCursor.objects.get_or_create(sink=name)
+    free = Q(leased_until__isnull=True) | Q(leased_until__lt=now)
+    ready = Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now)
+    leased_until = now + timedelta(seconds=LEASE_SECONDS)
+    if OutboxCursor.objects.filter(free & ready, sink=name).update(leased_until=leased_until):
+        return leased_until
+    return None
+
+
+def dispatch_batch(sink: Sink, batch_size: int = BATCH_SIZE) -> int:
+    """Send the next batch of ``sink``'s pending rows, in outbox order.
+
+    Pending rows are ``OutboxDelivery`` rows, claimed with ``SELECT ... FOR
+    UPDATE SKIP LOCKED`` where supported and deleted in the same transaction
+    once ``send`` returns, so a crash or error in between sends the batch
+    again (at least once). A row whose ingest transaction commits late, after
+    higher ids were delivered, is simply picked up by a later batch. A failed
+    batch schedules its retry with exponential backoff and returns -1; a sink
+    leased by another dispatcher or backing off returns 0, as does an empty
+    queue.
+    """
+    leased_until = _lease(sink.name, _now())
+    if leased_until is None:
+        return 0
+    try:
+        with transaction.atomic():
+            pending = OutboxDelivery.objects.filter(sink=sink.name)
+            if connection.features.has_select_for_update_skip_locked:
+                pending = pending.select_for_update(skip_locked=True)
+            claimed = list(pending.order_by("id").values_list("id", "entry_id")[:batch_size])
+            if not claimed:
+                return 0
+            entries = dict(
+                EventOutbox.objects.filter(id__in=[entry for _, entry in claimed])
+                .values_list("id", "payload")
+            )
+            rows = sorted((entry, entries[entry]) for _, entry in claimed)
+            cursor = OutboxCursor.objects.get(sink=sink.name)
+            started = time.perf_counter()
+            try:
+                sink.send([{"seq": seq, "event": payload} for seq, payload in rows])
+            except Exception:
+                cursor.attempts += 1
+                cursor.next_attempt_at = _now() + timedelta(seconds=backoff(cursor.attempts))
+                cursor.last_error = traceback.format_exc(limit=5)
+                cursor.save(update_fields=["attempts", "next_attempt_at", "last_error"])
+                return -1
+            OutboxDelivery.objects.filter(id__in=[delivery for delivery, _ in claimed]).delete()
+            cursor.delivered += len(rows)
+            cursor.attempts = 0
+            cursor.next_attempt_at = None
+            cursor.last_error = ""
+            cursor.last_delivered_at = _now()
+            cursor.last_batch_size = len(rows)
+            cursor.last_batch_seconds = time.perf_counter() - started
+            cursor.save(update_fields=[
+                "delivered", "attempts", "next_attempt_at", "last_error",
+                "last_delivered_at", "last_batch_size", "last_batch_seconds",
+            ])
+            return len(rows)
+    finally:
+        # Only our own lease: if it expired mid-batch another dispatcher may hold the sink
+        OutboxCursor.objects.filter(sink=sink.name, leased_until=leased_until).update(
+            leased_until=None
+        )
+
+
+def prune() -> int:
+    """Delete rows every sink has delivered (no ``OutboxDelivery`` left)."""
+    deleted, _ = EventOutbox.objects.filter(
+        ~Exists(OutboxDelivery.objects.filter(entry=OuterRef("pk")))
+    ).delete()
+    return deleted
+
+
+def outbox_stats(now: Optional[datetime] = None) -> dict[str, Any]:
+    """Per sink: pending rows, lag of the oldest one, delivery totals and last batch throughput."""
+    now = now or _now()
+    cursors = {cursor.sink: cursor for cursor in OutboxCursor.objects.filter(sink__in=list(SINKS))}
+    result: dict[str, Any] = {"depth": EventOutbox.objects.count(), "sinks": {}}
+    for name in SINKS:
+        cursor = cursors.get(name) or OutboxCursor(sink=name)
+        pending = OutboxDelivery.objects.filter(sink=name).aggregate(
+            pending=Count("id"), oldest=Min("entry__enqueued_at")
+        )
+        oldest = pending["oldest"]
+        result["sinks"][name] = {
+            "pending": pending["pending"],
+            "lag_seconds": round((now - oldest).total_seconds(), 3) if oldest else 0.0,
+            "delivered": cursor.delivered,
+            "attempts": cursor.attempts,
+            "next_attempt_at": cursor.next_attempt_at,
+            "last_error": cursor.last_error.strip().splitlines()[-1] if cursor.last_error else "",
+            "last_delivered_at": cursor.last_delivered_at,
+            "events_per_second": (
+                round(cursor.last_batch_size / cursor.last_batch_seconds, 1)
+                if cursor.last_batch_seconds else None
+            ),
+        }
+    return result
@@ -0,0 +1,70 @@
+import json
+import uuid
+from base64 import urlsafe_b64decode
+from typing import Any, Optional
+
+from django.db.models import Model, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+
+from apps.core.pagination import KeysetPagination
+from apps.events.models import Event
+from apps.events.search import ranked
+
+
+class EventCursorPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class EventSearchPagination(KeysetPagination):
+    """Cursor pages over full-text hits, best first.
+
+    The key is ``(score, event id)`` of a hit rather than model fields, so
+    the cursor is decoded here and the page comes from ``search.ranked``.
+    """
+
+    ordering = ("score", "event_id")
+    page_size = 50
+    max_page_size = 200
+
+    def decode_cursor(
+        self, model: type[Model], request: Request
+    ) -> Optional[tuple[list[Any], bool]]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+            score, event_id = payload["v"]
+            return [float(score), str(event_id)], bool(payload.get("r"))
+        except Exception as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+
+    def paginate_search(
+        self, q: str, queryset: Optional[QuerySet[Event]], request: Request
+    ) -> list[tuple[float, Event]]:
+        """The current page as ``(score, event)``, best first."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(Event, request)
+        reverse = bool(cursor and cursor[1])
+
+        after = (cursor[0][0], cursor[0][1]) if cursor else None
+        hits = ranked(q, queryset, after=after, reverse=reverse, limit=page_size + 1)
+        has_more = len(hits) > page_size
+        hits = hits[:page_size]
+        if reverse:
+            hits.reverse()
+
+        has_next = has_more if not reverse else True
+        has_previous = (cursor is not None) if not reverse else has_more
+        self.next_values = list(hits[-1]) if hits and has_next else None
+        self.previous_values = list(hits[0]) if hits and has_previous else None
+
+        # Stored ids come back in the database's own form (hex text on SQLite)
+        events = Event.objects.in_bulk([uuid.UUID(str(event_id)) for _, event_id in hits])
+        return [
+            (score, events[uuid.UUID(str(event_id))])
+            for score, event_id in hits
+            if uuid.UUID(str(event_id)) in events
+        ]
@@ -0,0 +1,189 @@
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.core.db import increment_counts
+from apps.events.models import Event, EventRollup, RollupResolution
+
+# Finest first. Each bucket width divides the next one.
+RESOLUTIONS: dict[str, timedelta] = {
+    RollupResolution.MINUTE: timedelta(minutes=1),
+    RollupResolution.HOUR: timedelta(hours=1),
+    RollupResolution.DAY: timedelta(days=1),
+}
+
+# How long buckets of each resolution are kept; None keeps them forever.
+# Every event is counted at every resolution, so dropping an expired fine
+# bucket loses no totals, only detail.
+RETENTION: dict[str, Optional[timedelta]] = {
+    RollupResolution.MINUTE: timedelta(days=2),
+    RollupResolution.HOUR: timedelta(days=90),
+    RollupResolution.DAY: None,
+    **getattr(settings, "EVENTS_ROLLUP_RETENTION", {}),
+}
+COMPACT_INTERVAL: float = getattr(settings, "EVENTS_ROLLUP_COMPACT_INTERVAL", 300.0)
+MAX_POINTS: int = getattr(settings, "EVENTS_TIMESERIES_MAX_POINTS", 5000)
+
+KEY_FIELDS = ("resolution", "dimension", "key", "bucket_start")
+RollupKey = tuple[str, str, str, datetime]
+
+_last_compaction = 0.0
+
+
+def truncate(moment: datetime, resolution: str) -> datetime:
+    moment = moment.astimezone(dt_timezone.utc)
+    if resolution == RollupResolution.MINUTE:
+        return moment.replace(second=0, microsecond=0)
+    if resolution == RollupResolution.HOUR:
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def event_time(event: Event) -> datetime:
+    return event.timestamp or event.created_at
+
+
+def rollup_keys(event: Event) -> list[RollupKey]:
+    dimensions = [("all", ""), ("type", str(event.type))]
+    if event.guild_id:
+        dimensions.append(("guild", str(event.guild_id)))
+    if event.player_id:
+        dimensions.append(("player", str(event.player_id)))
+    moment = event_time(event)
+    return [
+        (resolution, dimension, key, truncate(moment, resolution))
+        for resolution in RESOLUTIONS
+        for dimension, key in dimensions
+    ]
+
+
+def _expired(key: RollupKey, now: datetime) -> bool:
+    keep = RETENTION.get(key[0])
+    return keep is not None and key[3] < truncate(now - keep, key[0])
+
+
+def apply_rollups(events: Iterable[Event], sign: int = 1) -> None:
+    now = datetime.now(dt_timezone.utc)
+    deltas: Counter[RollupKey] = Counter()
+    for event in events:
+        for key in rollup_keys(event):
+            # A retraction from a bucket past its retention has nothing left
+            # to correct: compaction drops (or already dropped) the row
+            if sign < 0 and _expired(key, now):
+                continue
+            deltas[key] += sign
+    increment_counts(EventRollup, KEY_FIELDS, deltas)
+    if sign > 0:
+        _schedule_compaction()
+
+
+def _schedule_compaction() -> None:
+    global _last_compaction
+    now = time.monotonic()
+    if now - _last_compaction < COMPACT_INTERVAL:
+        return
+    _last_compaction = now
+    # Runs after the ingest transaction so it never holds up the insert
+    transaction.on_commit(compact_rollups)
+
+
+def compact_rollups(now: Optional[datetime] = None) -> dict[str, int]:
+    """Delete buckets older than their resolution's retention."""
+    now = now or datetime.now(dt_timezone.utc)
+    deleted: dict[str, int] = {}
+    for resolution, keep in RETENTION.items():
+        if keep is None:
+            continue
+        cutoff = truncate(now - keep, resolution)
+        deleted[resolution], _ = EventRollup.objects.filter(
+            resolution=resolution, bucket_start__lt=cutoff
+        ).delete()
+    return deleted
+
+
+def rebuild_rollups(chunk_size: int = 2000, now: Optional[datetime] = None) -> int:
+    """Recount every rollup bucket from the ``Event`` table; returns the events read.
+
+    Events are read in keyset chunks by id and their buckets upserted with
+    ``increment_counts``, all in one transaction so readers never see a
+    partial recount. Buckets already past their retention are not recreated.
+    """
+    now = now or datetime.now(dt_timezone.utc)
+    events = Event.objects.order_by("id").only(
+        "id", "type", "player_id", "guild_id", "timestamp", "created_at"
+    )
+    processed = 0
+    last_id = None
+    with transaction.atomic():
+        EventRollup.objects.all().delete()
+        while True:
+            pending = events.filter(id__gt=last_id) if last_id else events
+            chunk = list(pending[:chunk_size])
+            if not chunk:
+                break
+            deltas = Counter(
+                key for event in chunk for key in rollup_keys(event) if not _expired(key, now)
+            )
+            increment_counts(EventRollup, KEY_FIELDS, deltas)
+            processed += len(chunk)
+            last_id = chunk[-1].pk
+    return processed
+
+
+def choose_resolution(start: datetime, end: datetime, now: Optional[datetime] = None) -> str:
+    """Coarsest resolution whose buckets line up with ``[start, end)``.
+
+    Resolutions whose retention no longer covers ``start`` are skipped, and
+    one that would return more than ``MAX_POINTS`` buckets is only used when
+    nothing coarser is available.
+    """
+    now = now or datetime.now(dt_timezone.utc)
+    available = [
+        resolution for resolution in RESOLUTIONS
+        if RETENTION.get(resolution) is None
+        or start >= truncate(now - RETENTION[resolution], resolution)  # type: ignore[operator]
+    ] or [list(RESOLUTIONS)[-1]]
+    for resolution in reversed(available):
+        if truncate(start, resolution) == start and truncate(end, resolution) == end:
+            return resolution
+    for resolution in available:
+        if (end - start) / RESOLUTIONS[resolution] <= MAX_POINTS:
+            return resolution
+    return available[-1]
+
+
+def timeseries(
+    start: datetime,
+    end: datetime,
+    dimension: str = "all",
+    key: str = "",
+    resolution: Optional[str] = None,
+) -> dict[str, Any]:
+    resolution = resolution or choose_resolution(start, end)
+    first = truncate(start, resolution)
+    rows = (
+        EventRollup.objects.filter(
+            resolution=resolution,
+            dimension=dimension,
+            key=key,
+            bucket_start__gte=first,
+            bucket_start__lt=end,
+            count__gt=0,
+        )
+        .order_by("bucket_start")
+        .values_list("bucket_start", "count")
+    )
+    points = [{"bucket": bucket, "count": count} for bucket, count in rows]
+    return {
+        "resolution": resolution,
+        "start": first,
+        "end": end,
+        "dimension": dimension,
+        "key": key,
+        "total": sum(p["count"] for p in points),
+        "points": points,
+    }
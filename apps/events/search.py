@@ -0,0 +1,139 @@
+import re
+from typing import Any, Iterable, Optional, Sequence
+
+from django.db import connections, router
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+from apps.events.models import Event, EventSearchDocument
+
+# Longest document indexed per event; the rest of a huge payload is not searchable
+MAX_BODY = 10000
+MAX_TERMS = 16
+FTS_TABLE = "events_eventsearch_fts"
+DOC_TABLE = EventSearchDocument._meta.db_table
+
+# (score, event id as stored): lower scores rank first
+Hit = tuple[float, Any]
+
+
+def document(details: Any) -> str:
+    """The scalar values of ``details`` (nested too), joined into one searchable text."""
+    parts: list[str] = []
+    stack = [details]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(reversed(list(value.values())))
+        elif isinstance(value, list):
+            stack.extend(reversed(value))
+        elif value is not None:
+            parts.append(str(value))
+    return " ".join(parts)[:MAX_BODY]
+
+
+def index_events(events: Iterable[Event]) -> None:
+    """Store the search documents of newly written ``events`` in one batch."""
+    EventSearchDocument.objects.bulk_create(
+        [EventSearchDocument(event=event, body=document(event.details)) for event in events],
+        batch_size=1000,
+    )
+
+
+def reindex_events(events: Sequence[Event]) -> None:
+    """Replace the search documents of ``events`` (after an update, or to rebuild)."""
+    EventSearchDocument.objects.filter(event__in=[event.pk for event in events]).delete()
+    index_events(events)
+
+
+def terms(q: str) -> list[str]:
+    return re.findall(r"\w+", q.lower())[:MAX_TERMS]
+
+
+def _vendor() -> str:
+    return connections[router.db_for_read(EventSearchDocument)].vendor
+
+
+def matching(q: str) -> QuerySet[EventSearchDocument]:
+    """Documents containing every term of ``q``, through the full-text index."""
+    words = terms(q)
+    documents = EventSearchDocument.objects.all()
+    if not words:
+        return documents.none()
+    vendor = _vendor()
+    if vendor == "sqlite":
+        return documents.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [_fts_query(words)]
+        ))
+    if vendor == "postgresql":
+        return documents.filter(id__in=RawSQL(
+            f"SELECT id FROM {DOC_TABLE} "
+            "WHERE to_tsvector('simple', body) @@ plainto_tsquery('simple', %s)",
+            [" ".join(words)],
+        ))
+    # No full-text index: plain substring scan
+    condition = Q()
+    for word in words:
+        condition &= Q(body__icontains=word)
+    return documents.filter(condition)
+
+
+def _fts_query(words: Sequence[str]) -> str:
+    # Every term quoted: user input never reaches the FTS5 query syntax
+    return " ".join(f'"{word}"' for word in words)
+
+
+def ranked(
+    q: str,
+    events: Optional[QuerySet[Event]] = None,
+    after: Optional[Hit] = None,
+    reverse: bool = False,
+    limit: int = 100,
+) -> list[Hit]:
+    """Up to ``limit`` events matching ``q`` as ``(score, event id)``, best first.
+
+    Hits are ordered by ``(score, event id)``, and only those after the key
+    ``after`` are returned, so pages are stable for a given query. With
+    ``reverse`` the scan runs backwards from ``after`` and hits come in that
+    (descending) order. ``events`` restricts the hits to a filtered queryset.
+    """
+    words = terms(q)
+    if not words:
+        return []
+    vendor = _vendor()
+    connection = connections[router.db_for_read(EventSearchDocument)]
+    if vendor == "sqlite":
+        score = f"bm25({FTS_TABLE})"
+        source = (
+            f"FROM {FTS_TABLE} JOIN {DOC_TABLE} d ON d.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s"
+        )
+        params: list[Any] = [_fts_query(words)]
+    elif vendor == "postgresql":
+        score = "-ts_rank(to_tsvector('simple', d.body), plainto_tsquery('simple', %s))"
+        source = (
+            f"FROM {DOC_TABLE} d "
+            "WHERE to_tsvector('simple', d.body) @@ plainto_tsquery('simple', %s)"
+        )
+        params = [" ".join(words), " ".join(words)]
+    else:
+        score = "0.0"
+        source = f"FROM {DOC_TABLE} d WHERE " + " AND ".join(["LOWER(d.body) LIKE %s"] * len(words))
+        params = [f"%{word}%" for word in words]
+
+    sql = f"SELECT {score} AS score, d.event_id {source}"
+    if events is not None:
+        subquery, subparams = events.order_by().values("pk").query.sql_with_params()
+        sql += f" AND d.event_id IN ({subquery})"
+        params.extend(subparams)
+    if after is not None:
+        op = "<" if reverse else ">"
+        sql += f" AND ({score} {op} %s OR ({score} = %s AND d.event_id {op} %s))"
+        score_params = params[:1] if vendor == "postgresql" else []
+        params.extend([*score_params, after[0], *score_params, after[0], after[1]])
+    direction = "DESC" if reverse else "ASC"
+    sql += f" ORDER BY score {direction}, d.event_id {direction} LIMIT %s"
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(float(score), event_id) for score, event_id in cursor.fetchall()]
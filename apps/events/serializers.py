@@ -1,8 +1,102 @@
-from typing import Any
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Event
+from rest_framework.settings import api_settings
+
+from .models import Event, EventType
 
 class EventSerializer(serializers.ModelSerializer[Any]):
     class Meta:
         model = Event
         fields = '__all__'
+
+
+# EventSerializer's output fields, in its order, and the column each one reads
+ROW_COLUMNS = {
+    "id": "id",
+    "type": "type",
+    "details": "details",
+    "timestamp": "timestamp",
+    "created_at": "created_at",
+    "player": "player_id",
+    "guild": "guild_id",
+}
+
+
+def parse_fields(value: Optional[str]) -> Optional[list[str]]:
+    """The fields of a ``?fields=a,b`` parameter, or ``None`` for all of them.
+
+    Raises ``ValueError``, with the message for the client, for unknown fields.
+    """
+    if value is None:
+        return None
+    fields = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in fields if name not in ROW_COLUMNS]
+    if not fields or unknown:
+        raise ValueError(f'fields deve conter apenas: {", ".join(ROW_COLUMNS)}')
+    return fields
+
+
+def _datetime_converter() -> Callable[[Any], Any]:
+    """``DateTimeField.to_representation`` for the current settings and timezone."""
+    field_timezone = timezone.get_current_timezone() if settings.USE_TZ else None
+    output_format = api_settings.DATETIME_FORMAT
+    if field_timezone is None or output_format is None or output_format.lower() != "iso-8601":
+        return serializers.DateTimeField().to_representation
+
+    def convert(value: Optional[datetime]) -> Optional[str]:
+        if value is None:
+            return None
+        text = value.astimezone(field_timezone).isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+    return convert
+
+
+class EventRowSerializer:
+    """Read-only fast path with the same output as ``EventSerializer``.
+
+    Rows are ``values_list`` tuples, turned into dicts by one converter per
+    field chosen up front, with no model instance, field objects or
+    validation per row. ``leading`` columns always come first in each tuple
+    (a keyset paginator reads its key from there), whether or not they are
+    among the output ``fields``.
+    """
+
+    def __init__(self, fields: Optional[Sequence[str]] = None, leading: Sequence[str] = ()) -> None:
+        self.fields = [name for name in ROW_COLUMNS if fields is None or name in fields]
+        wanted = [ROW_COLUMNS[name] for name in self.fields]
+        self.columns = list(leading) + [column for column in wanted if column not in leading]
+
+    def rows(self, queryset: QuerySet[Event]) -> QuerySet[Event]:
+        return queryset.values_list(*self.columns)
+
+    def to_representation(self, rows: Sequence[tuple[Any, ...]]) -> list[dict[str, Any]]:
+        # UUIDField gives str; FKs (the pk), type and details pass through as
+        # PrimaryKeyRelatedField, CharField and JSONField return them
+        to_datetime = _datetime_converter()
+        converters: dict[str, Optional[Callable[[Any], Any]]] = {
+            "id": str, "timestamp": to_datetime, "created_at": to_datetime,
+        }
+        plan = [
+            (name, self.columns.index(ROW_COLUMNS[name]), converters.get(name))
+            for name in self.fields
+        ]
+        return [
+            {name: row[i] if convert is None else convert(row[i]) for name, i, convert in plan}
+            for row in rows
+        ]
+
+
+class EventBulkItemSerializer(serializers.Serializer[Any]):
+    # FKs are plain UUIDs here: existence is checked once per batch in
+    # apps.events.ingest instead of one query per item.
+    type = serializers.ChoiceField(choices=EventType.choices, default=EventType.OTHER)
+    details = serializers.JSONField()
+    timestamp = serializers.DateTimeField(required=False, allow_null=True)
+    player = serializers.UUIDField(required=False, allow_null=True)
+    guild = serializers.UUIDField(required=False, allow_null=True)
@@ -0,0 +1,84 @@
+from typing import Any, Optional, Sequence
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from apps.events.attributes import refresh_attributes, store_attributes
+from apps.events.counters import apply_activity, apply_counts, event_key
+from apps.events.feed import publish_on_commit
+from apps.events.metrics import count_on_commit
+from apps.events.models import Event
+from apps.events.outbox import enqueue as enqueue_outbox
+from apps.events.rollups import apply_rollups, event_time, rollup_keys
+from apps.events.search import index_events, reindex_events
+from apps.events.stats import bump_on_commit
+
+# Sent with ``events=[...]`` after a batch of events is written with
+# ``bulk_create``, which skips ``post_save``. Receivers run inside the
+# ingest transaction.
+events_created = Signal()
+
+
+@receiver(pre_save, sender=Event)
+def remember_previous_state(sender: Any, instance: Event, **kwargs: Any) -> None:
+    if instance._state.adding or kwargs.get("raw"):
+        return
+    # Updates can move an event between counters and buckets; keep what it
+    # was counted as so the old contribution can be retracted.
+    previous = Event.objects.filter(pk=instance.pk).only(
+        "type", "details", "player_id", "guild_id", "timestamp", "created_at"
+    ).first()
+    setattr(instance, "_previous_state", previous)
+
+
+@receiver(post_save, sender=Event)
+def aggregate_saved_event(sender: Any, instance: Event, created: bool, **kwargs: Any) -> None:
+    if kwargs.get("raw"):
+        return
+    if created:
+        apply_counts([event_key(instance)])
+        apply_activity([instance])
+        apply_rollups([instance])
+        store_attributes([instance])
+        index_events([instance])
+        bump_on_commit([instance])
+        enqueue_outbox([instance])
+        publish_on_commit([instance])
+        count_on_commit([instance])
+        return
+    previous: Optional[Event] = getattr(instance, "_previous_state", None)
+    if previous is None:
+        return
+    bump_on_commit([previous, instance])
+    if (previous.type, previous.details) != (instance.type, instance.details):
+        refresh_attributes([instance])
+    if previous.details != instance.details:
+        reindex_events([instance])
+    if event_key(previous) != event_key(instance):
+        apply_counts([event_key(previous)], sign=-1)
+        apply_counts([event_key(instance)])
+    if (event_key(previous), event_time(previous)) != (event_key(instance), event_time(instance)):
+        apply_activity([instance])
+    if rollup_keys(previous) != rollup_keys(instance):
+        apply_rollups([previous], sign=-1)
+        apply_rollups([instance])
+
+
+@receiver(post_delete, sender=Event)
+def retract_deleted_event(sender: Any, instance: Event, **kwargs: Any) -> None:
+    apply_counts([event_key(instance)], sign=-1)
+    apply_rollups([instance], sign=-1)
+    bump_on_commit([instance])
+
+
+@receiver(events_created, sender=Event)
+def aggregate_created_events(sender: Any, events: Sequence[Event], **kwargs: Any) -> None:
+    apply_counts(event_key(event) for event in events)
+    apply_activity(events)
+    apply_rollups(events)
+    store_attributes(events)
+    index_events(events)
+    bump_on_commit(events)
+    enqueue_outbox(events)
+    publish_on_commit(events)
+    count_on_commit(events)
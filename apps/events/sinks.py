@@ -0,0 +1,77 @@
+import json
+import os
+import urllib.request
+from typing import Any, Mapping, Optional, Sequence
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+# One delivered outbox row: {"seq": outbox id, "event": serialized event}
+Record = dict[str, Any]
+
+
+def ndjson(records: Sequence[Record]) -> bytes:
+    return "".join(json.dumps(record, cls=DjangoJSONEncoder) + "\n" for record in records).encode()
+
+
+class Sink:
+    """A downstream consumer of outbox batches.
+
+    ``send`` gets records in outbox order and must raise if the batch was
+    not accepted; it is then sent again, so consumers should deduplicate on
+    ``seq`` (delivery is at least once).
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def send(self, records: Sequence[Record]) -> None:
+        raise NotImplementedError
+
+
+class FileSink(Sink):
+    """Appends each batch as NDJSON to a local file, synced to disk before returning."""
+
+    def __init__(self, name: str, path: str) -> None:
+        super().__init__(name)
+        self.path = path
+
+    def send(self, records: Sequence[Record]) -> None:
+        with open(self.path, "ab") as output:
+            output.write(ndjson(records))
+            output.flush()
+            os.fsync(output.fileno())
+
+
+class HTTPSink(Sink):
+    """POSTs each batch as NDJSON; any non-2xx response or network error fails the batch."""
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        timeout: float = 10.0,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        super().__init__(name)
+        self.url = url
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/x-ndjson", **(headers or {})}
+
+    def send(self, records: Sequence[Record]) -> None:
+        request = urllib.request.Request(
+            self.url, data=ndjson(records), headers=self.headers, method="POST"
+        )
+        # urlopen raises HTTPError for 4xx/5xx
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def load_sinks(config: Mapping[str, Mapping[str, Any]]) -> dict[str, Sink]:
+    """Instantiate ``{name: {"class": "dotted.path", **options}}`` sink declarations."""
+    sinks: dict[str, Sink] = {}
+    for name, options in config.items():
+        options = dict(options)
+        sink_class = import_string(options.pop("class"))
+        sinks[name] = sink_class(name, **options)
+    return sinks
@@ -0,0 +1,274 @@
+import threading
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, Max
+
+from apps.core.aio import concurrently
+from apps.core.cache import MISSING, LRUCache
+from apps.core.metrics import REGISTRY, cache_collector
+from apps.events.models import Event
+from apps.guilds.models import Guild
+from apps.players.models import Player
+
+# (kind, entity id), kind being "player" or "guild"
+EntityKey = tuple[str, str]
+
+
+class StatsCache:
+    """Per-entity stats payloads, keyed by an explicit version per entity.
+
+    ``bump(kind, id)`` is called after every committed event write touching
+    the entity, so a cached payload stays valid until something actually
+    changes. A payload is stored under the version read *before* it was
+    computed, so a write racing with the computation leaves it stale rather
+    than served. Versions are never dropped when a payload is evicted (one
+    integer per entity seen), so a ``bump`` racing with an eviction is
+    never lost.
+
+    Payloads live in an in-process LRU. With ``backend`` (an alias in
+    ``CACHES``) versions and payloads are also kept there, shared by every
+    process; without it versions are process-local and the TTL bounds
+    staleness from writes made by other processes.
+    """
+
+    prefix = "events-stats"
+
+    def __init__(
+        self, maxsize: int, ttl: Optional[float] = None, backend: Optional[str] = None
+    ) -> None:
+        self.ttl = ttl
+        self.backend = backend
+        self._local = LRUCache(maxsize, ttl=ttl)
+        self._versions: dict[EntityKey, int] = {}
+        self._lock = threading.Lock()
+        self.backend_hits = 0
+
+    def _version_key(self, key: EntityKey) -> str:
+        return f"{self.prefix}:v:{key[0]}:{key[1]}"
+
+    def _payload_key(self, key: EntityKey, version: int) -> str:
+        return f"{self.prefix}:{key[0]}:{key[1]}:{version}"
+
+    def version(self, kind: str, entity_id: Any) -> int:
+        key = (kind, str(entity_id))
+        if self.backend:
+            return int(caches[self.backend].get(self._version_key(key), 0))
+        with self._lock:
+            return self._versions.setdefault(key, 0)
+
+    def bump(self, keys: Iterable[EntityKey]) -> None:
+        for kind, entity_id in set(keys):
+            key = (kind, str(entity_id))
+            if self.backend:
+                backend = caches[self.backend]
+                try:
+                    backend.incr(self._version_key(key))
+                except ValueError:
+                    if not backend.add(self._version_key(key), 1, timeout=None):
+                        backend.incr(self._version_key(key))
+            else:
+                with self._lock:
+                    self._versions[key] = self._versions.setdefault(key, 0) + 1
+            self._local.pop(key)
+
+    def _lookup(self, key: EntityKey) -> tuple[int, Any]:
+        """Current version of ``key`` and its payload, or ``MISSING``."""
+        version = self.version(*key)
+        entry = self._local.get(key)
+        if entry is not MISSING and entry[0] == version:
+            return version, entry[1]
+        if self.backend:
+            payload = caches[self.backend].get(self._payload_key(key, version), MISSING)
+            if payload is not MISSING:
+                self.backend_hits += 1
+                self._local.set(key, (version, payload))
+                return version, payload
+        return version, MISSING
+
+    def _store(self, key: EntityKey, version: int, payload: Any) -> None:
+        if self.version(*key) != version:
+            return  # bumped while computing; the payload may already be stale
+        self._local.set(key, (version, payload))
+        if self.backend:
+            caches[self.backend].set(self._payload_key(key, version), payload, timeout=self.ttl)
+
+    def get_or_compute(self, kind: str, entity_id: Any, compute: Callable[[], Any]) -> Any:
+        key = (kind, str(entity_id))
+        version, payload = self._lookup(key)
+        if payload is MISSING:
+            payload = compute()
+            self._store(key, version, payload)
+        return payload
+
+    async def aget_or_compute(
+        self, kind: str, entity_id: Any, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """``get_or_compute`` for async views; a backend is reached off the event loop."""
+        key = (kind, str(entity_id))
+        if self.backend:
+            version, payload = await sync_to_async(self._lookup)(key)
+        else:
+            version, payload = self._lookup(key)
+        if payload is MISSING:
+            payload = await compute()
+            if self.backend:
+                await sync_to_async(self._store)(key, version, payload)
+            else:
+                self._store(key, version, payload)
+        return payload
+
+    def clear(self) -> None:
+        self._local.clear()
+        with self._lock:
+            self._versions.clear()
+
+    def stats(self) -> dict[str, Any]:
+        stats = self._local.stats()
+        # A local miss answered by the backend still saved the queries
+        lookups = stats["hits"] + stats["misses"]
+        hits = stats["hits"] + self.backend_hits
+        stats.update({
+            "backend": self.backend,
+            "backend_hits": self.backend_hits,
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+        })
+        return stats
+
+
+stats_cache = StatsCache(
+    maxsize=getattr(settings, "EVENTS_STATS_CACHE_SIZE", 5000),
+    ttl=getattr(settings, "EVENTS_STATS_CACHE_TTL", 600.0),
+    backend=getattr(settings, "EVENTS_STATS_CACHE_BACKEND", None),
+)
+
+
+def _cache_counts() -> dict[str, Any]:
+    stats = stats_cache.stats()
+    # A local miss answered by the backend still saved the queries
+    return {
+        **stats,
+        "hits": stats["hits"] + stats["backend_hits"],
+        "misses": stats["misses"] - stats["backend_hits"],
+    }
+
+
+REGISTRY.add_collector(cache_collector("events_stats", _cache_counts))
+
+
+def bump_on_commit(events: Iterable[Event]) -> None:
+    """Bump the stats version of every player and guild in ``events`` once the write commits.
+
+    Bumping before the commit would let a concurrent read cache a payload
+    that misses the write under the new version.
+    """
+    keys: set[EntityKey] = set()
+    for event in events:
+        if event.player_id:
+            keys.add(("player", str(event.player_id)))
+        if event.guild_id:
+            keys.add(("guild", str(event.guild_id)))
+    if keys:
+        transaction.on_commit(lambda: stats_cache.bump(keys))
+
+
+def _type_counts(events: Any) -> list[dict[str, Any]]:
+    types = events.order_by().values_list("type").annotate(n=Count("pk"))
+    return [{"type": event_type, "count": n} for event_type, n in types]
+
+
+def _last_activity(events: Any) -> Any:
+    return events.aggregate(last=Max("created_at"))["last"]
+
+
+def _player_guilds(player_id: Any) -> list[dict[str, Any]]:
+    guilds = Guild.objects.filter(events__player_id=player_id).distinct().values_list("id", "name")
+    return [{"guild__id": str(pk), "guild__name": name} for pk, name in guilds]
+
+
+def _guild_players(guild_id: Any) -> list[dict[str, Any]]:
+    players = (
+        Player.objects.filter(events__guild_id=guild_id)
+        .distinct()
+        .values_list("id", "user__username")
+    )
+    return [{"player__id": str(pk), "player__user__username": username} for pk, username in players]
+
+
+def _player_payload(
+    player_id: Any,
+    event_types: list[dict[str, Any]],
+    last_activity: Any,
+    guilds: list[dict[str, Any]],
+) -> Optional[dict[str, Any]]:
+    if not event_types:
+        return None
+    return {
+        "player_id": str(player_id),
+        "total_events": sum(row["count"] for row in event_types),
+        "event_types": event_types,
+        "last_activity": last_activity,
+        "guilds_related": guilds,
+    }
+
+
+def _guild_payload(
+    guild_id: Any,
+    event_types: list[dict[str, Any]],
+    last_activity: Any,
+    players: list[dict[str, Any]],
+) -> Optional[dict[str, Any]]:
+    if not event_types:
+        return None
+    return {
+        "guild_id": str(guild_id),
+        "total_events": sum(row["count"] for row in event_types),
+        "event_types": event_types,
+        "players_involved": players,
+        "last_activity": last_activity,
+    }
+
+
+def player_stats(player_id: Any) -> Optional[dict[str, Any]]:
+    """Stats of a player's events, or ``None`` when it has none. Three queries."""
+    events = Event.objects.filter(player_id=player_id)
+    event_types = _type_counts(events)
+    if not event_types:
+        return None
+    return _player_payload(
+        player_id, event_types, _last_activity(events), _player_guilds(player_id)
+    )
+
+
+def guild_stats(guild_id: Any) -> Optional[dict[str, Any]]:
+    """Stats of a guild's events, or ``None`` when it has none. Three queries."""
+    events = Event.objects.filter(guild_id=guild_id)
+    event_types = _type_counts(events)
+    if not event_types:
+        return None
+    return _guild_payload(
+        guild_id, event_types, _last_activity(events), _guild_players(guild_id)
+    )
+
+
+async def aplayer_stats(player_id: Any) -> Optional[dict[str, Any]]:
+    """``player_stats`` with its three independent queries run concurrently."""
+    events = Event.objects.filter(player_id=player_id)
+    return _player_payload(player_id, *await concurrently(
+        lambda: _type_counts(events),
+        lambda: _last_activity(events),
+        lambda: _player_guilds(player_id),
+    ))
+
+
+async def aguild_stats(guild_id: Any) -> Optional[dict[str, Any]]:
+    """``guild_stats`` with its three independent queries run concurrently."""
+    events = Event.objects.filter(guild_id=guild_id)
+    return _guild_payload(guild_id, *await concurrently(
+        lambda: _type_counts(events),
+        lambda: _last_activity(events),
+        lambda: _guild_players(guild_id),
+    ))
@@ -1,13 +1,60 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
 import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from unittest import mock, skipUnless
 
 from rest_framework.test import APITestCase
 from rest_framework.test import APIClient
 from rest_framework import status
-from apps.events.models import Event, EventType
+from rest_framework.authtoken.models import Token
+from apps.core import aio, instrumentation, metrics
+from apps.core.renderers import msgpack
+from apps.events import outbox
+from apps.events.feed import EventBroker, FeedFilter, broker as feed_broker, stream as feed_stream
+from apps.events.ingest import NDJSONReader, create_events
+from apps.events.metrics import EVENTS_INGESTED, INGEST_SECONDS
+from apps.events.models import (
+    Event,
+    EventAttribute,
+    EventOutbox,
+    EventRollup,
+    EventType,
+    EventTypeCount,
+    GuildEventCount,
+    IngestCheckpoint,
+    OutboxCursor,
+    OutboxDelivery,
+    PlayerEventCount,
+)
+from apps.events.pagination import EventCursorPagination
+from apps.events.rollups import compact_rollups
+from apps.events.serializers import EventSerializer
+from apps.events.stats import StatsCache, stats_cache
 from apps.players.models import Player
+from apps.players.resolver import player_resolver
 from apps.guilds.models import Guild
 from apps.users.models import User
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections, transaction
+from django.db.backends.signals import connection_created
+from django.http import QueryDict
+from django.test import AsyncClient, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 
 class EventModelTests(APITestCase):
@@ -84,8 +131,8 @@ class EventViewSetTests(APITestCase):
         """Test retrieving a list of all events."""
         response = self.client.get("/api/events/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["type"], EventType.PLAYER_LEVEL_UP)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["type"], EventType.PLAYER_LEVEL_UP)
 
     def test_create_event(self) -> None:
         """Test creating an event via POST."""
@@ -146,5 +193,1426 @@ class EventViewSetTests(APITestCase):
         response = self.client.get("/api/events/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Check that events are in reverse chronological order
-        types = [e["type"] for e in response.data]
+        types = [e["type"] for e in response.data["results"]]
         self.assertEqual(types[0], "event3")  # Most recent first
+
+
+class EventBulkIngestTests(APITestCase):
+    """Tests for POST /api/events/bulk/."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.user = User.objects.create(username="bulkuser")
+        self.guild = Guild.objects.create(name="Bulk Guild", score="0")
+        self.player = Player.objects.create(user=self.user, guild=self.guild)
+        AuthUser = get_user_model()
+        self.auth_user = AuthUser.objects.create_user(username="events_bulk_auth")
+        self.client.force_authenticate(user=self.auth_user)
+
+    def test_bulk_creates_all_valid_events(self) -> None:
+        """Test that a valid batch is inserted in full."""
+        payload = [
+            {"type": EventType.PLAYER_LEVEL_UP, "details": {"level": i},
+             "player": str(self.player.id), "guild": str(self.guild.id)}
+            for i in range(5)
+        ]
+        response = self.client.post("/api/events/bulk/", payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 5)
+        self.assertEqual(response.data["errors"], [])
+        self.assertEqual(Event.objects.filter(player=self.player).count(), 5)
+
+    def test_bulk_reports_per_item_errors(self) -> None:
+        """Test that invalid items are reported by index without failing the batch."""
+        payload = [
+            {"type": EventType.OTHER, "details": {}},
+            {"type": "NOT_A_TYPE", "details": {}},
+            {"type": EventType.OTHER, "details": {}, "player": str(uuid.uuid4())},
+            {"type": EventType.OTHER},
+        ]
+        response = self.client.post("/api/events/bulk/", payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual([e["index"] for e in response.data["errors"]], [1, 2, 3])
+        self.assertIn("player", response.data["errors"][1]["errors"])
+
+    def test_bulk_query_count_is_constant(self) -> None:
+        """Test that the number of queries does not grow with the batch size."""
+        query_counts = []
+        for size in (5, 50):
+            payload = [
+                {"type": EventType.QUEST_COMPLETE, "details": {"quest": i},
+                 "player": str(self.player.id), "guild": str(self.guild.id)}
+                for i in range(size)
+            ]
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post("/api/events/bulk/", payload, format="json")
+            self.assertEqual(response.data["created"], size)
+            query_counts.append(len(ctx.captured_queries))
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    def test_bulk_rejects_non_list_body(self) -> None:
+        """Test that the body must be a JSON array."""
+        response = self.client.post("/api/events/bulk/", {"type": "OTHER"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_requires_authentication(self) -> None:
+        """Test that bulk ingestion is a write operation."""
+        self.client.force_authenticate(user=None)
+        response = self.client.post("/api/events/bulk/", [], format="json")
+        self.assertIn(
+            response.status_code,
+            (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN),
+        )
+
+
+class EventStreamIngestTests(APITestCase):
+    """Tests for the NDJSON streaming endpoint /api/events/ingest/."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.user = User.objects.create(username="streamuser")
+        self.player = Player.objects.create(user=self.user)
+        AuthUser = get_user_model()
+        self.auth_user = AuthUser.objects.create_user(username="events_stream_auth")
+        self.client.force_authenticate(user=self.auth_user)
+
+    def _lines(self, count: int) -> list[bytes]:
+        return [
+            json.dumps({"type": "QUEST_COMPLETE", "details": {"quest": i},
+                        "player": str(self.player.id)}).encode() + b"\n"
+            for i in range(count)
+        ]
+
+    def _post(self, body: bytes, query: str = "") -> Any:
+        return self.client.post(
+            f"/api/events/ingest/{query}", data=body, content_type="application/x-ndjson"
+        )
+
+    def test_stream_reports_accepted_and_rejected_lines(self) -> None:
+        """Test that bad lines are reported by number and good lines are committed."""
+        lines = self._lines(4)
+        body = (
+            lines[0] + b"{not json\n" + lines[1] + b"\n"
+            + b'{"type": "NOPE", "details": {}}\n' + lines[2]
+        )
+        response = self._post(body)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["accepted"], 3)
+        self.assertEqual(response.data["accepted_lines"], [[1, 1], [3, 3], [6, 6]])
+        self.assertEqual([r["line"] for r in response.data["rejected_lines"]], [2, 5])
+        self.assertEqual(Event.objects.filter(player=self.player).count(), 3)
+        self.assertTrue(response.data["complete"])
+
+    def test_stream_commits_in_chunks(self) -> None:
+        """Test that each chunk is committed and checkpointed separately."""
+        with mock.patch("apps.events.ingest.STREAM_CHUNK_LINES", 2), \
+                mock.patch("apps.events.ingest.create_events", wraps=create_events) as spy:
+            response = self._post(b"".join(self._lines(5)), "?stream_id=shard-1")
+        self.assertEqual(spy.call_count, 3)
+        self.assertEqual(response.data["accepted_lines"], [[1, 5]])
+        checkpoint = IngestCheckpoint.objects.get(stream_id="shard-1")
+        self.assertEqual(checkpoint.committed_line, 5)
+        self.assertEqual(checkpoint.committed_offset, len(b"".join(self._lines(5))))
+
+    def test_stream_resume_from_checkpoint(self) -> None:
+        """Test that an interrupted upload can be resumed from the committed offset."""
+        lines = self._lines(6)
+        first_part = b"".join(lines[:3])
+        self._post(first_part, "?stream_id=shard-2")
+
+        status_response = self.client.get("/api/events/ingest/?stream_id=shard-2")
+        offset = status_response.data["committed_offset"]
+        self.assertEqual(offset, len(first_part))
+
+        # resume sending only the remainder
+        response = self._post(b"".join(lines[3:]), f"?stream_id=shard-2&offset={offset}")
+        self.assertEqual(response.data["accepted_lines"], [[4, 6]])
+
+        # resending the whole body skips what is already committed
+        response = self._post(b"".join(lines), "?stream_id=shard-2")
+        self.assertEqual(response.data["accepted"], 0)
+        self.assertEqual(Event.objects.filter(player=self.player).count(), 6)
+
+    def test_stream_rejects_unknown_offset(self) -> None:
+        """Test that resuming from an offset other than the checkpoint conflicts."""
+        self._post(b"".join(self._lines(2)), "?stream_id=shard-3")
+        response = self._post(b"".join(self._lines(1)), "?stream_id=shard-3&offset=7")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_reader_drops_partial_line_of_truncated_body(self) -> None:
+        """Test that a body shorter than Content-Length does not commit its tail."""
+        body = b"".join(self._lines(2)) + b'{"type": "OTH'
+        reader = NDJSONReader(io.BytesIO(body), expected_length=len(body) + 100)
+        self.assertEqual([line.number for line in reader], [1, 2])
+        self.assertTrue(reader.truncated)
+
+    def test_reader_rejects_oversized_line(self) -> None:
+        """Test that a line longer than the limit is rejected without buffering it."""
+        body = b'{"a": "' + b"x" * 300 + b'"}\n{"b": 1}\n'
+        with mock.patch("apps.events.ingest.STREAM_MAX_LINE_BYTES", 64), \
+                mock.patch("apps.events.ingest.STREAM_READ_SIZE", 32):
+            lines = list(NDJSONReader(io.BytesIO(body)))
+        self.assertIsNotNone(lines[0].error)
+        self.assertEqual(lines[1].payload, {"b": 1})
+        self.assertEqual(lines[1].end_offset, len(body))
+
+
+class EventPaginationTests(APITestCase):
+    """Tests for keyset pagination on GET /api/events/."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.user = User.objects.create(username="pageuser")
+        self.player = Player.objects.create(user=self.user)
+        base = timezone.now()
+        # Pairs of events share created_at so the id tie-breaker is exercised
+        self.events = create_events([
+            Event(type=EventType.QUEST_COMPLETE if i % 2 else EventType.PLAYER_KILL,
+                  details={"n": i}, player=self.player if i % 3 else None)
+            for i in range(25)
+        ])
+        for i, event in enumerate(self.events):
+            Event.objects.filter(pk=event.pk).update(created_at=base + timedelta(seconds=i // 2))
+
+    def _walk(self, url: str) -> list[str]:
+        ids: list[str] = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(e["id"] for e in response.data["results"])
+            url = response.data["next"]
+        return ids
+
+    def test_pages_cover_all_rows_in_order(self) -> None:
+        """Test that following next links returns every event once, newest first."""
+        ids = self._walk("/api/events/?page_size=4")
+        expected = [
+            str(pk) for pk in
+            Event.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        ]
+        self.assertEqual(ids, expected)
+
+    def test_pagination_with_filters(self) -> None:
+        """Test that filters and cursors combine."""
+        ids = self._walk(f"/api/events/?page_size=3&type=QUEST_COMPLETE&player_id={self.player.id}")
+        expected = Event.objects.filter(type=EventType.QUEST_COMPLETE, player=self.player)
+        self.assertEqual(sorted(ids), sorted(str(e.id) for e in expected))
+
+    def test_previous_link_returns_prior_page(self) -> None:
+        """Test that the previous link walks back to the same page."""
+        first = self.client.get("/api/events/?page_size=5")
+        self.assertIsNone(first.data["previous"])
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(
+            [e["id"] for e in back.data["results"]],
+            [e["id"] for e in first.data["results"]],
+        )
+
+    def test_page_query_has_no_offset_or_count(self) -> None:
+        """Test that a page is fetched with a keyset predicate and LIMIT only."""
+        first = self.client.get("/api/events/?page_size=5")
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(first.data["next"])
+        sql = " ".join(q["sql"] for q in ctx.captured_queries).upper()
+        self.assertNotIn("OFFSET", sql)
+        self.assertNotIn("COUNT(", sql)
+        self.assertIn("LIMIT 6", sql)
+
+    def test_invalid_cursor(self) -> None:
+        """Test that a garbage cursor is rejected."""
+        response = self.client.get("/api/events/?cursor=bm9wZQ")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class EventCounterTests(APITestCase):
+    """Tests for the counter tables behind /api/events/statistics/."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.guild = Guild.objects.create(name="Counter Guild", score="0")
+        self.players = [
+            Player.objects.create(
+                user=User.objects.create(username=f"counter{i}"), guild=self.guild
+            )
+            for i in range(3)
+        ]
+
+    def _counts(self) -> tuple[dict[str, int], dict[Any, int], dict[Any, int]]:
+        return (
+            dict(EventTypeCount.objects.values_list("type", "count")),
+            dict(PlayerEventCount.objects.values_list("player_id", "count")),
+            dict(GuildEventCount.objects.values_list("guild_id", "count")),
+        )
+
+    def test_single_and_bulk_inserts_update_counters(self) -> None:
+        """Test that both ingest paths keep the counters in sync."""
+        Event.objects.create(
+            type=EventType.PLAYER_KILL, details={}, player=self.players[0], guild=self.guild
+        )
+        create_events([
+            Event(type=EventType.QUEST_COMPLETE, details={}, player=self.players[i % 2])
+            for i in range(5)
+        ])
+        types, players, guilds = self._counts()
+        self.assertEqual(types, {EventType.PLAYER_KILL: 1, EventType.QUEST_COMPLETE: 5})
+        self.assertEqual(players, {self.players[0].id: 4, self.players[1].id: 2})
+        self.assertEqual(guilds, {self.guild.id: 1})
+
+    def test_update_and_delete_adjust_counters(self) -> None:
+        """Test that moving or deleting an event moves its counts."""
+        event = Event.objects.create(type=EventType.PLAYER_KILL, details={}, player=self.players[0])
+        event.type = EventType.OTHER
+        event.player = self.players[1]
+        event.save()
+        types, players, _ = self._counts()
+        self.assertEqual(types[EventType.PLAYER_KILL], 0)
+        self.assertEqual(types[EventType.OTHER], 1)
+        self.assertEqual(players[self.players[1].id], 1)
+
+        event.delete()
+        types, players, _ = self._counts()
+        self.assertEqual(types[EventType.OTHER], 0)
+        self.assertEqual(players[self.players[1].id], 0)
+
+    def test_statistics_reads_counters(self) -> None:
+        """Test statistics totals and top lists with a constant number of queries."""
+        create_events(
+            [Event(type=EventType.PLAYER_KILL, details={}, player=self.players[2], guild=self.guild)
+               for _ in range(3)]
+            + [Event(type=EventType.OTHER, details={}, player=self.players[1]) for _ in range(2)]
+        )
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/events/statistics/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_events"], 5)
+        self.assertEqual(response.data["top_players"][0]["player__user__username"], "counter2")
+        self.assertEqual(response.data["top_players"][0]["count"], 3)
+        self.assertEqual(response.data["top_guilds"], [
+            {"guild__id": str(self.guild.id), "guild__name": "Counter Guild", "count": 3}
+        ])
+
+    def test_rebuild_command_checks_and_repairs(self) -> None:
+        """Test that rebuild_event_counters detects drift and fixes it."""
+        Event.objects.create(type=EventType.OTHER, details={}, player=self.players[0])
+        call_command("rebuild_event_counters", "--check", stdout=io.StringIO())
+
+        PlayerEventCount.objects.filter(player=self.players[0]).update(count=42)
+        EventTypeCount.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command("rebuild_event_counters", "--check", stdout=io.StringIO())
+
+        call_command("rebuild_event_counters", stdout=io.StringIO())
+        types, players, _ = self._counts()
+        self.assertEqual(types, {EventType.OTHER: 1})
+        self.assertEqual(players, {self.players[0].id: 1})
+
+
+class EventRollupTests(APITestCase):
+    """Tests for time-bucketed rollups and /api/events/timeseries/."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.guild = Guild.objects.create(name="Rollup Guild", score="0")
+        self.player = Player.objects.create(
+            user=User.objects.create(username="rolluser"), guild=self.guild
+        )
+        self.base = datetime(2026, 3, 1, 10, 0, tzinfo=dt_timezone.utc)
+
+    def _at(self, minutes: int, **kwargs: Any) -> Event:
+        kwargs.setdefault("type", EventType.QUEST_COMPLETE)
+        return Event(details={}, timestamp=self.base + timedelta(minutes=minutes), **kwargs)
+
+    def test_ingest_updates_every_resolution(self) -> None:
+        """Test that one event is counted in its minute, hour and day buckets."""
+        create_events(
+            [self._at(5, player=self.player, guild=self.guild), self._at(5), self._at(70)]
+        )
+        minute = EventRollup.objects.get(
+            resolution="minute", dimension="all", bucket_start=self.base + timedelta(minutes=5)
+        )
+        self.assertEqual(minute.count, 2)
+        hours = dict(
+            EventRollup.objects.filter(resolution="hour", dimension="all")
+            .values_list("bucket_start", "count")
+        )
+        self.assertEqual(hours, {self.base: 2, self.base + timedelta(hours=1): 1})
+        day = EventRollup.objects.get(resolution="day", dimension="player", key=str(self.player.id))
+        self.assertEqual(day.count, 1)
+
+    def test_single_insert_falls_back_to_created_at(self) -> None:
+        """Test that events without a game timestamp are bucketed by created_at."""
+        event = Event.objects.create(type=EventType.OTHER, details={})
+        bucket = EventRollup.objects.get(resolution="minute", dimension="type", key=EventType.OTHER)
+        self.assertEqual(bucket.bucket_start, event.created_at.replace(second=0, microsecond=0))
+        event.delete()
+        bucket.refresh_from_db()
+        self.assertEqual(bucket.count, 0)
+
+    def test_timeseries_uses_coarsest_aligned_resolution(self) -> None:
+        """Test resolution selection and the bucket values returned."""
+        create_events([self._at(m, guild=self.guild) for m in (0, 1, 61, 62, 63)] + [self._at(2)])
+        with mock.patch(
+            "apps.events.rollups.RETENTION", {"minute": None, "hour": None, "day": None}
+        ):
+            response = self.client.get(
+                "/api/events/timeseries/",
+                {"start": "2026-03-01T10:00:00Z", "end": "2026-03-01T12:00:00Z",
+                 "guild_id": str(self.guild.id)},
+            )
+            self.assertEqual(response.data["resolution"], "hour")
+            self.assertEqual([p["count"] for p in response.data["points"]], [2, 3])
+
+            response = self.client.get(
+                "/api/events/timeseries/",
+                {"start": "2026-03-01T10:00:00Z", "end": "2026-03-01T10:30:00Z"},
+            )
+            self.assertEqual(response.data["resolution"], "minute")
+            self.assertEqual(response.data["total"], 3)
+
+    def test_timeseries_rejects_bad_range(self) -> None:
+        """Test validation of the query parameters."""
+        response = self.client.get(
+            "/api/events/timeseries/",
+            {"start": "2026-03-02T00:00:00Z", "end": "2026-03-01T00:00:00Z"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get("/api/events/timeseries/", {"resolution": "week"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_compaction_drops_expired_fine_buckets(self) -> None:
+        """Test that expired minute buckets are removed while coarser totals remain."""
+        create_events([self._at(0), self._at(1)])
+        compact_rollups(now=self.base + timedelta(days=30))
+        self.assertFalse(EventRollup.objects.filter(resolution="minute").exists())
+        self.assertEqual(EventRollup.objects.get(resolution="hour", dimension="all").count, 2)
+        self.assertEqual(EventRollup.objects.get(resolution="day", dimension="all").count, 2)
+
+    def test_retraction_skips_expired_buckets(self) -> None:
+        """Test that deleting an old event only touches buckets still within retention."""
+        first, _ = create_events([self._at(0), self._at(1)])
+        compact_rollups()
+        with CaptureQueriesContext(connection) as queries:
+            first.delete()
+        updates = [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+        self.assertTrue(updates)
+        self.assertFalse([sql for sql in updates if "'minute'" in sql or "'hour'" in sql])
+        self.assertFalse(EventRollup.objects.filter(resolution__in=["minute", "hour"]).exists())
+        self.assertEqual(EventRollup.objects.get(resolution="day", dimension="all").count, 1)
+
+    def test_rebuild_command_backfills_history(self) -> None:
+        """Test that events written before the rollups existed are counted by the rebuild."""
+        Event.objects.bulk_create([self._at(0, guild=self.guild), self._at(1), self._at(65)])
+        self.assertFalse(EventRollup.objects.exists())
+        retention = {"minute": None, "hour": None, "day": None}
+        with mock.patch("apps.events.rollups.RETENTION", retention):
+            for _ in range(2):
+                out = io.StringIO()
+                call_command("rebuild_event_rollups", "--chunk-size", "2", stdout=out)
+            self.assertIn("3 eventos lidos", out.getvalue())
+            hours = dict(
+                EventRollup.objects.filter(resolution="hour", dimension="all")
+                .values_list("bucket_start", "count")
+            )
+        self.assertEqual(hours, {self.base: 2, self.base + timedelta(hours=1): 1})
+        guild_day = EventRollup.objects.get(resolution="day", dimension="guild")
+        self.assertEqual(guild_day.count, 1)
+
+        # Past their retention, fine buckets are not recreated
+        call_command("rebuild_event_rollups", stdout=io.StringIO())
+        self.assertFalse(EventRollup.objects.filter(resolution="minute").exists())
+        self.assertEqual(EventRollup.objects.get(resolution="day", dimension="all").count, 3)
+
+
+class EventStatsCacheTests(APITestCase):
+    """Tests for the versioned player_stats / guild_stats cache."""
+
+    def setUp(self) -> None:
+        self.guild = Guild.objects.create(name="Stats Guild", score="0")
+        self.player = Player.objects.create(
+            user=User.objects.create(username="stats_player"), guild=self.guild
+        )
+        AuthUser = get_user_model()
+        self.client.force_authenticate(user=AuthUser.objects.create_user(username="stats_auth"))
+        self._event(EventType.QUEST_COMPLETE)
+
+    def _event(self, event_type: str) -> None:
+        # Versions are bumped on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            Event.objects.create(type=event_type, details={}, player=self.player, guild=self.guild)
+
+    def test_stats_are_cached_until_an_event_arrives(self) -> None:
+        url = "/api/events/player_stats/"
+        first = self.client.get(url, {"player_id": str(self.player.id)})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data["total_events"], 1)
+        self.assertEqual(first.data["guilds_related"][0]["guild__name"], "Stats Guild")
+        with self.assertNumQueries(0):
+            again = self.client.get(url, {"player_id": str(self.player.id)})
+        self.assertEqual(again.data, first.data)
+
+        self._event(EventType.PLAYER_KILL)
+        response = self.client.get(url, {"player_id": str(self.player.id)})
+        self.assertEqual(response.data["total_events"], 2)
+        self.assertEqual(
+            sorted((row["type"], row["count"]) for row in response.data["event_types"]),
+            [("PLAYER_KILL", 1), ("QUEST_COMPLETE", 1)],
+        )
+        response = self.client.get("/api/events/guild_stats/", {"guild_id": str(self.guild.id)})
+        involved = response.data["players_involved"]
+        self.assertEqual(involved[0]["player__user__username"], "stats_player")
+        self.assertIsNotNone(self.client.get("/api/events/cache_stats/").data["hit_ratio"])
+
+    def test_unknown_and_invalid_ids(self) -> None:
+        response = self.client.get("/api/events/guild_stats/", {"guild_id": str(uuid.uuid4())})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get("/api/events/player_stats/", {"player_id": "nope"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {"error": "player_id inválido"})
+        response = self.client.get("/api/events/guild_stats/")
+        self.assertEqual(response.data, {"error": "guild_id é obrigatório"})
+
+    def test_bump_during_compute_after_eviction(self) -> None:
+        cache = StatsCache(10, ttl=60)
+        key = ("guild", str(self.guild.id))
+
+        def stale() -> str:
+            cache.bump([key])
+            return "stale"
+
+        with mock.patch("apps.core.cache.time.monotonic", return_value=0.0):
+            cache.get_or_compute(*key, lambda: "v1")
+        # The entry expires on lookup, then an event arrives mid-computation
+        with mock.patch("apps.core.cache.time.monotonic", return_value=120.0):
+            self.assertEqual(cache.get_or_compute(*key, stale), "stale")
+            self.assertEqual(cache.get_or_compute(*key, lambda: "v2"), "v2")
+
+    def test_backend_shares_versions_between_processes(self) -> None:
+        # Two caches on the same backend stand in for two worker processes
+        first, second = StatsCache(10, backend="default"), StatsCache(10, backend="default")
+        compute = mock.Mock(side_effect=["v1", "v2"])
+        self.assertEqual(first.get_or_compute("guild", self.guild.id, compute), "v1")
+        self.assertEqual(second.get_or_compute("guild", self.guild.id, compute), "v1")
+        self.assertEqual(second.stats()["backend_hits"], 1)
+
+        first.bump([("guild", str(self.guild.id))])
+        self.assertEqual(second.get_or_compute("guild", self.guild.id, compute), "v2")
+        self.assertEqual(compute.call_count, 2)
+
+
+class ActivitySummaryTests(APITestCase):
+    """Tests for the denormalized last_seen / last_event_type of players and guilds."""
+
+    def setUp(self) -> None:
+        self.guild = Guild.objects.create(name="Active Guild", score="0")
+        self.players = [
+            Player.objects.create(user=User.objects.create(username=f"active{i}"), guild=self.guild)
+            for i in range(3)
+        ]
+        self.base = datetime(2026, 10, 1, tzinfo=dt_timezone.utc)
+
+    def _event(self, player: Player, event_type: str, hours: int) -> Event:
+        return Event(
+            type=event_type, details={}, player=player, guild=self.guild,
+            timestamp=self.base + timedelta(hours=hours),
+        )
+
+    def test_bulk_ingest_keeps_latest_event(self) -> None:
+        create_events([
+            self._event(self.players[0], EventType.PLAYER_KILL, 5),
+            self._event(self.players[0], EventType.QUEST_COMPLETE, 2),
+            self._event(self.players[1], EventType.DUNGEON_CLEAR, 1),
+        ])
+        # An older, late-arriving event must not move last_seen back
+        Event.objects.create(
+            type=EventType.ITEM_PURCHASE, details={}, player=self.players[0], timestamp=self.base
+        )
+        player = Player.objects.get(pk=self.players[0].pk)
+        self.assertEqual(
+            (player.last_seen, player.last_event_type),
+            (self.base + timedelta(hours=5), "PLAYER_KILL"),
+        )
+        guild = Guild.objects.get(pk=self.guild.pk)
+        self.assertEqual(guild.last_seen, self.base + timedelta(hours=5))
+
+        call_command("rebuild_event_counters", "--check", stdout=io.StringIO())
+        Player.objects.filter(pk=self.players[1].pk).update(last_seen=None, last_event_type="")
+        with self.assertRaises(CommandError):
+            call_command("rebuild_event_counters", "--check", stdout=io.StringIO())
+        call_command("rebuild_event_counters", stdout=io.StringIO())
+        self.assertEqual(Player.objects.get(pk=self.players[1].pk).last_event_type, "DUNGEON_CLEAR")
+
+    def test_players_by_recent_activity(self) -> None:
+        create_events([
+            self._event(self.players[0], EventType.PLAYER_KILL, 1),
+            self._event(self.players[1], EventType.PLAYER_KILL, 3),
+            self._event(self.players[1], EventType.PLAYER_KILL, 4),
+        ])
+        since = (self.base + timedelta(minutes=30)).isoformat()
+        response = self.client.get(
+            "/api/players/", {"active_since": since, "ordering": "-last_seen", "page_size": 1}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first = response.data["results"][0]
+        self.assertEqual((first["id"], first["event_count"]), (str(self.players[1].id), 2))
+        response = self.client.get(response.data["next"])
+        self.assertEqual([row["id"] for row in response.data["results"]], [str(self.players[0].id)])
+        self.assertIsNone(response.data["next"])
+
+        since = (self.base + timedelta(hours=2)).isoformat()
+        response = self.client.get("/api/players/", {"active_since": since})
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(self.client.get("/api/players/", {"ordering": "name"}).status_code, 400)
+        response = self.client.get("/api/players/", {"active_since": "ontem"})
+        self.assertEqual(response.status_code, 400)
+
+
+class EventAttributeTests(APITestCase):
+    """Tests for attributes extracted from details and the ?details.<key>= filters."""
+
+    def setUp(self) -> None:
+        self.player = Player.objects.create(user=User.objects.create(username="attr_player"))
+        self.target = Player.objects.create(user=User.objects.create(username="attr_target"))
+        self.kill, self.dungeon, self.purchase = create_events([
+            Event(
+                type=EventType.PLAYER_KILL,
+                details={"target_id": str(self.target.id)},
+                player=self.player,
+            ),
+            Event(
+                type=EventType.DUNGEON_CLEAR,
+                details={"party_members": ["p1", "p2"], "dungeon_id": 3},
+            ),
+            Event(type=EventType.ITEM_PURCHASE, details={"item_id": "sword", "price": 12.5}),
+        ])
+        Event.objects.create(type=EventType.ITEM_PURCHASE, details={"item_id": "bow", "price": "4"})
+
+    def _ids(self, **params: str) -> set[str]:
+        response = self.client.get("/api/events/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {row["id"] for row in response.data["results"]}
+
+    def test_filters_use_extracted_attributes(self) -> None:
+        self.assertEqual(
+            self._ids(**{"details.target_id": str(self.target.id)}), {str(self.kill.id)}
+        )
+        self.assertEqual(self._ids(**{"details.party_members": "p2"}), {str(self.dungeon.id)})
+        self.assertEqual(self._ids(**{"details.dungeon_id": "3"}), {str(self.dungeon.id)})
+        self.assertEqual(self._ids(**{"details.price__gte": "10"}), {str(self.purchase.id)})
+        self.assertEqual(len(self._ids(**{"details.price__lt": "100", "type": "ITEM_PURCHASE"})), 2)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self._ids(**{"details.item_id": "sword"})
+        sql = " ".join(q["sql"] for q in ctx.captured_queries)
+        self.assertIn("events_eventattribute", sql)
+        self.assertNotIn('"details"', sql.split("WHERE", 1)[1])
+
+        invalid = ({"details.mood": "x"}, {"details.item_id__gt": "a"}, {"details.price": "cheap"})
+        for params in invalid:
+            response = self.client.get("/api/events/", params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIsInstance(response.data["error"], str)
+        response = self.client.get("/api/events/", {"details.mood": "x"})
+        self.assertEqual(response.data, {"error": "Atributo não indexado: mood"})
+
+    def test_updates_and_backfill_refresh_attributes(self) -> None:
+        AuthUser = get_user_model()
+        self.client.force_authenticate(user=AuthUser.objects.create_user(username="attr_auth"))
+        response = self.client.patch(
+            f"/api/events/{self.purchase.id}/",
+            {"details": {"item_id": "axe", "price": 1}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._ids(**{"details.item_id": "sword"}), set())
+        self.assertEqual(self._ids(**{"details.item_id": "axe"}), {str(self.purchase.id)})
+
+        EventAttribute.objects.all().delete()
+        out = io.StringIO()
+        call_command("backfill_event_attributes", "--chunk-size", "2", stdout=out)
+        self.assertIn("4 eventos processados", out.getvalue())
+        self.assertEqual(self._ids(**{"details.party_members": "p1"}), {str(self.dungeon.id)})
+        self.assertEqual(EventAttribute.objects.filter(event=self.dungeon).count(), 3)
+
+
+class EventSearchTests(APITestCase):
+    """Tests for the full-text ?q= search over details."""
+
+    def setUp(self) -> None:
+        self.player = Player.objects.create(user=User.objects.create(username="searcher"))
+        self.sword, self.swords, self.bow, self.note = create_events([
+            Event(
+                type=EventType.ITEM_PURCHASE,
+                details={"item_id": "sword", "price": 10},
+                player=self.player,
+            ),
+            Event(
+                type=EventType.MARKET_TRANSACTION,
+                details={"items": ["sword", "sword"], "note": "Espada rara"},
+            ),
+            Event(type=EventType.ITEM_PURCHASE, details={"item_id": "bow"}, player=self.player),
+            Event(type=EventType.OTHER, details={"note": {"text": "Vendo espada (quase nova)!"}}),
+        ])
+
+    def _search(self, **params: Any) -> Any:
+        response = self.client.get("/api/events/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_ranked_search_with_cursor_pages(self) -> None:
+        data = self._search(q="sword", page_size=1)
+        first = data["results"][0]
+        # Two matches of the term outrank one
+        self.assertEqual(first["id"], str(self.swords.id))
+        self.assertIn("search_score", first)
+        data = self.client.get(data["next"]).data
+        self.assertEqual([row["id"] for row in data["results"]], [str(self.sword.id)])
+        self.assertIsNone(data["next"])
+        back = self.client.get(data["previous"]).data
+        self.assertEqual([row["id"] for row in back["results"]], [str(self.swords.id)])
+
+        # Nested values, case and punctuation in the query are handled
+        self.assertEqual({row["id"] for row in self._search(q="ESPADA")["results"]},
+                         {str(self.swords.id), str(self.note.id)})
+        rows = self._search(q='"quase" nova)')["results"]
+        self.assertEqual([row["id"] for row in rows], [str(self.note.id)])
+        # Combined with the regular filters
+        rows = self._search(q="sword", player_id=str(self.player.id))["results"]
+        self.assertEqual([row["id"] for row in rows], [str(self.sword.id)])
+        self.assertEqual(self.client.get("/api/events/", {"q": "  "}).status_code, 400)
+
+    def test_index_follows_updates_and_deletes(self) -> None:
+        AuthUser = get_user_model()
+        self.client.force_authenticate(user=AuthUser.objects.create_user(username="search_auth"))
+        self.client.patch(
+            f"/api/events/{self.bow.id}/", {"details": {"item_id": "crossbow"}}, format="json"
+        )
+        self.assertEqual(self._search(q="bow")["results"], [])
+        self.assertEqual(len(self._search(q="crossbow")["results"]), 1)
+
+        self.sword.delete()
+        rows = self._search(q="sword")["results"]
+        self.assertEqual([row["id"] for row in rows], [str(self.swords.id)])
+
+        call_command("rebuild_event_search", "--chunk-size", "2", stdout=io.StringIO())
+        self.assertEqual(len(self._search(q="crossbow")["results"]), 1)
+
+    def test_admin_search_uses_index(self) -> None:
+        AuthUser = get_user_model()
+        admin = AuthUser.objects.create_superuser(username="search_admin", password="x")
+        self.client.force_login(admin)
+        response = self.client.get("/admin/events/event/", {"q": "crossbow espada"})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get("/admin/events/event/", {"q": "rara"})
+        self.assertContains(response, str(self.swords.id))
+
+
+class EventExportTests(APITestCase):
+    """Tests for the streaming /api/events/export/ action."""
+
+    def setUp(self) -> None:
+        self.player = Player.objects.create(user=User.objects.create(username="exporter"))
+        base = timezone.now() - timedelta(hours=1)
+        self.events = create_events([
+            Event(
+                type=EventType.ITEM_PURCHASE if i % 2 else EventType.OTHER,
+                details={"item_id": f"item-{i}", "note": "a, \"quoted\"\nline"},
+                player=self.player if i % 2 else None,
+                created_at=base + timedelta(minutes=i),
+            )
+            for i in range(7)
+        ])
+
+    def _body(self, response: Any) -> bytes:
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b"".join(response.streaming_content)
+
+    def test_ndjson_is_default_and_filtered(self) -> None:
+        response = self.client.get("/api/events/export/", {"type": EventType.ITEM_PURCHASE})
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertIn('filename="events.ndjson"', response["Content-Disposition"])
+        rows = [json.loads(line) for line in self._body(response).decode().splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row["type"] for row in rows}, {EventType.ITEM_PURCHASE})
+        self.assertEqual(rows[0]["player_id"], str(self.player.id))
+        self.assertEqual(rows[0]["details"]["item_id"], "item-5")
+
+    def test_csv_with_quoting(self) -> None:
+        response = self.client.get(
+            "/api/events/export/", {"format": "csv", "player_id": str(self.player.id)}
+        )
+        self.assertTrue(response["Content-Type"].startswith("text/csv"))
+        rows = list(csv.reader(io.StringIO(self._body(response).decode())))
+        self.assertEqual(
+            rows[0], ["id", "type", "timestamp", "created_at", "player_id", "guild_id", "details"]
+        )
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(json.loads(rows[1][6])["note"], "a, \"quoted\"\nline")
+        self.assertEqual(rows[1][5], "")
+
+    def test_gzip_and_chunked_reads(self) -> None:
+        # Chunks smaller than the result: every row comes out once, newest first
+        with mock.patch("apps.events.export.CHUNK_SIZE", 2):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get("/api/events/export/", {"compress": "gzip"})
+                body = self._body(response)
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn('filename="events.ndjson.gz"', response["Content-Disposition"])
+        rows = [json.loads(line) for line in gzip.decompress(body).decode().splitlines()]
+        self.assertEqual(
+            [row["id"] for row in rows], [str(event.id) for event in reversed(self.events)]
+        )
+        self.assertEqual(len(queries), 4)
+
+    async def test_streamed_chunk_by_chunk_under_asgi(self) -> None:
+        produced: list[int] = []
+
+        def rows(*args: Any, **kwargs: Any) -> Any:
+            for event in reversed(self.events):
+                produced.append(1)
+                yield {"id": event.id, "type": event.type, "details": {}}
+
+        with mock.patch("apps.events.views.export_rows", rows), \
+                mock.patch("apps.events.export._batches", lambda rows: ([row] for row in rows)):
+            response = await AsyncClient().get("/api/events/export/")
+            self.assertTrue(response.is_async)
+            chunks = []
+            async for chunk in response.streaming_content:
+                # Nothing is read ahead of what was sent
+                self.assertEqual(len(produced), len(chunks) + 1)
+                chunks.append(chunk)
+        self.assertEqual(len(chunks), len(self.events))
+        self.assertEqual(json.loads(chunks[0])["id"], str(self.events[-1].id))
+
+    def test_invalid_parameters(self) -> None:
+        response = self.client.get("/api/events/export/", {"compress": "zip"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(json.loads(response.content)["error"], "compress deve ser gzip")
+        response = self.client.get("/api/events/export/", {"details.unknown": "x"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class EventRowSerializerTests(APITestCase):
+    """Tests for the values_list fast path behind the event list."""
+
+    def setUp(self) -> None:
+        self.guild = Guild.objects.create(name="Rows", score=0)
+        self.player = Player.objects.create(
+            user=User.objects.create(username="rows"), guild=self.guild
+        )
+        self.events = create_events([
+            Event(type=EventType.PLAYER_KILL,
+                  details={"target_id": "x", "nested": [1, {"a": None}]},
+                  player=self.player, guild=self.guild,
+                  timestamp=datetime(2024, 5, 1, 12, 30, 15, 250000, tzinfo=dt_timezone.utc)),
+            Event(type=EventType.OTHER, details={"note": "sem player"}),
+        ])
+
+    def test_same_output_as_model_serializer(self) -> None:
+        expected = EventSerializer(Event.objects.order_by("-created_at", "-id"), many=True).data
+        response = self.client.get("/api/events/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], [dict(row) for row in expected])
+        self.assertEqual(
+            json.loads(response.content)["results"],
+            json.loads(json.dumps(expected, cls=DjangoJSONEncoder)),
+        )
+
+    def test_sparse_fieldsets(self) -> None:
+        data = self.client.get("/api/events/", {"fields": "type,id", "page_size": 1}).data
+        self.assertEqual(list(data["results"][0]), ["id", "type"])
+        # The cursor still works without the key fields in the output
+        data = self.client.get(data["next"]).data
+        self.assertEqual(
+            data["results"], [{"id": str(self.events[0].id), "type": EventType.PLAYER_KILL}]
+        )
+
+        data = self.client.get("/api/events/", {"fields": "details", "q": "sem"}).data
+        self.assertEqual(data["results"][0]["details"], {"note": "sem player"})
+        self.assertEqual(set(data["results"][0]), {"details", "search_score"})
+
+        response = self.client.get("/api/events/", {"fields": "id,password"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIsInstance(response.data["error"], str)
+
+    def test_benchmark_command(self) -> None:
+        out = io.StringIO()
+        call_command(
+            "benchmark_event_serializers", "--synthetic", "--rows", "20", "--repeat", "1",
+            stdout=out,
+        )
+        self.assertIn("linhas/s", out.getvalue())
+        # The synthetic rows are rolled back
+        self.assertEqual(Event.objects.count(), 2)
+
+
+@skipUnless(msgpack, "msgpack não instalado")
+class MessagePackTests(APITestCase):
+    """Tests for MessagePack content negotiation on the event endpoints."""
+
+    def setUp(self) -> None:
+        self.player = Player.objects.create(user=User.objects.create(username="packer"))
+        auth_user = get_user_model().objects.create_user(username="packer_auth")
+        self.client.force_authenticate(user=auth_user)
+        self.items = [
+            {"type": "QUEST_COMPLETE", "details": {"quest": i}, "player": str(self.player.id)}
+            for i in range(3)
+        ]
+
+    def test_list_negotiated_by_accept(self) -> None:
+        create_events([Event(type=EventType.OTHER, details={"n": 1}, player=self.player)])
+        response = self.client.get("/api/events/", HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        data = msgpack.unpackb(response.content)
+        as_json = json.loads(self.client.get("/api/events/").content)
+        self.assertEqual(data["results"], as_json["results"])
+
+    def test_bulk_accepts_msgpack_body(self) -> None:
+        response = self.client.post(
+            "/api/events/bulk/", data=msgpack.packb(self.items), content_type="application/msgpack"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 3)
+
+        response = self.client.post(
+            "/api/events/bulk/", data=b"\xc1", content_type="application/msgpack"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_stream_ingest_of_concatenated_objects(self) -> None:
+        objects = [msgpack.packb(item) for item in self.items]
+        with mock.patch("apps.events.ingest.STREAM_CHUNK_LINES", 2):
+            response = self.client.post(
+                "/api/events/ingest/?stream_id=packed", data=b"".join(objects) + b"\xc1",
+                content_type="application/msgpack",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["accepted"], 3)
+        # The malformed trailer is reported and the checkpoint stays after the last good object
+        self.assertEqual([r["line"] for r in response.data["rejected_lines"]], [4])
+        self.assertEqual(response.data["committed_offset"], len(b"".join(objects)))
+        self.assertEqual(Event.objects.filter(player=self.player).count(), 3)
+
+        # A cut-off body is resumed from the checkpoint
+        body = b"".join(objects)
+        response = self.client.post(
+            "/api/events/ingest/?stream_id=cut", data=body[:-2], content_type="application/msgpack",
+        )
+        self.assertEqual(response.data["accepted"], 2)
+        errors = response.data["rejected_lines"][0]["errors"]
+        self.assertEqual(errors["line"], ["MessagePack incompleto"])
+
+
+class EventFeedTests(APITestCase):
+    """Tests for the in-process broker and the SSE feed at /api/events/feed/."""
+
+    def setUp(self) -> None:
+        self.player = Player.objects.create(user=User.objects.create(username="watcher"))
+        now = timezone.now()
+        self.kill = Event(
+            id=uuid.uuid4(),
+            type=EventType.PLAYER_KILL,
+            details={},
+            player=self.player,
+            created_at=now,
+        )
+        self.quest = Event(
+            id=uuid.uuid4(), type=EventType.QUEST_COMPLETE, details={}, created_at=now
+        )
+
+    async def test_broker_fans_out_to_matching_subscribers(self) -> None:
+        broker = EventBroker(buffer=10, overflow="drop")
+        everyone = broker.subscribe(FeedFilter())
+        kills = broker.subscribe(FeedFilter(type=EventType.PLAYER_KILL))
+        mine = broker.subscribe(
+            FeedFilter(type=EventType.QUEST_COMPLETE, player_id=str(self.player.id))
+        )
+        broker.publish([self.kill, self.quest])
+
+        self.assertEqual(
+            [item.id for item in await everyone.get(1)], [str(self.kill.id), str(self.quest.id)]
+        )
+        self.assertEqual([item.id for item in await kills.get(1)], [str(self.kill.id)])
+        self.assertEqual(await mine.get(0.01), [])
+        self.assertEqual(broker.stats(), {"subscribers": 3, "published": 2, "delivered": 3})
+        # Every subscriber gets the same encoded frame
+        frame = (await asyncio.wait_for(self._one(broker), 1)).frame
+        self.assertIn(b"event: event\n", frame)
+        self.assertIn(f'"id": "{self.kill.id}"'.encode(), frame)
+
+    async def _one(self, broker: EventBroker) -> Any:
+        subscription = broker.subscribe(FeedFilter(type=EventType.PLAYER_KILL))
+        broker.publish([self.kill])
+        return (await subscription.get(1))[0]
+
+    async def test_slow_consumer_policies(self) -> None:
+        broker = EventBroker(buffer=1, overflow="drop")
+        subscription = broker.subscribe(FeedFilter())
+        broker.publish([self.kill, self.quest])
+        await asyncio.sleep(0)
+        self.assertEqual([item.id for item in await subscription.get(1)], [str(self.quest.id)])
+        self.assertEqual(subscription.dropped, 1)
+
+        broker = EventBroker(buffer=1, overflow="disconnect")
+        subscription = broker.subscribe(FeedFilter())
+        broker.publish([self.kill, self.quest])
+        await asyncio.sleep(0)
+        body = feed_stream(subscription)
+        self.assertTrue((await anext(body)).startswith(b"retry:"))
+        self.assertIn(b"event: overflow", await anext(body))
+        with self.assertRaises(StopAsyncIteration):
+            await anext(body)
+        self.assertEqual(broker.stats()["subscribers"], 0)
+
+    async def test_feed_streams_live_events_and_resumes(self) -> None:
+        first, second = await sync_to_async(create_events)([
+            Event(type=EventType.PLAYER_KILL, details={"n": 1}, player=self.player),
+            Event(type=EventType.PLAYER_KILL, details={"n": 2}, player=self.player),
+        ])
+        cursor = EventCursorPagination().encode_cursor([first.created_at, first.id], reverse=False)
+
+        response = await self.async_client.get(
+            "/api/events/feed/",
+            {"player_id": str(self.player.id)},
+            headers={"Last-Event-ID": cursor},
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = aiter(response.streaming_content)
+        self.assertTrue((await anext(body)).startswith(b"retry:"))
+        # Replay of what was committed after the cursor, then live events
+        self.assertIn(str(second.id).encode(), await anext(body))
+        feed_broker.publish([self.kill, self.quest])
+        live = await asyncio.wait_for(anext(body), 1)
+        self.assertIn(str(self.kill.id).encode(), live)
+        self.assertIn(b"id: ", live)
+        # A client leaving cancels the pending read (as the ASGI handler does) and drops the
+        # subscription
+        pending = asyncio.ensure_future(anext(body))
+        await asyncio.sleep(0)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertEqual(feed_broker.stats()["subscribers"], 0)
+
+    async def test_feed_validation(self) -> None:
+        response = await self.async_client.get("/api/events/feed/", {"type": "NOPE"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = await self.async_client.get("/api/events/feed/", {"cursor": "bogus"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # Under WSGI the stream would hold a worker forever
+        response = await sync_to_async(self.client.get)("/api/events/feed/")
+        self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+
+
+class _Receiver(BaseHTTPRequestHandler):
+    """Local stand-in for an HTTP consumer: records bodies, fails while ``failing`` is set."""
+
+    bodies: list[bytes] = []
+    failing = False
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if type(self).failing:
+            self.send_response(503)
+        else:
+            type(self).bodies.append(body)
+            self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+class EventOutboxTests(APITestCase):
+    """Tests for the transactional outbox and its dispatcher."""
+
+    def setUp(self) -> None:
+        self.player = Player.objects.create(user=User.objects.create(username="forwarded"))
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "events.ndjson")
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _Receiver)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        _Receiver.bodies, _Receiver.failing = [], False
+
+        sinks = {
+            "analytics": {"class": "apps.events.sinks.FileSink", "path": self.path},
+            "anticheat": {
+                "class": "apps.events.sinks.HTTPSink",
+                "url": f"http://127.0.0.1:{server.server_port}/",
+            },
+        }
+        patcher = mock.patch("apps.events.outbox.SINKS", sinks)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _events(self, count: int) -> list[Event]:
+        return create_events([
+            Event(type=EventType.QUEST_COMPLETE, details={"n": i}, player=self.player)
+            for i in range(count)
+        ])
+
+    def test_written_in_the_event_transaction(self) -> None:
+        single = Event.objects.create(type=EventType.OTHER, details={})
+        self._events(2)
+        self.assertEqual(EventOutbox.objects.count(), 3)
+        self.assertEqual(EventOutbox.objects.order_by("id").first().payload["id"], str(single.id))
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self._events(1)
+            raise RuntimeError("rollback")
+        self.assertEqual(EventOutbox.objects.count(), 3)
+
+        with mock.patch("apps.events.outbox.SINKS", {}):
+            self._events(1)
+        self.assertEqual(EventOutbox.objects.count(), 3)
+
+    def test_ordered_batches_to_every_sink_then_pruned(self) -> None:
+        events = self._events(5)
+        out = io.StringIO()
+        call_command("dispatch_event_outbox", "--once", "--batch-size", "2", stdout=out)
+        self.assertIn("analytics: 5 eventos entregues", out.getvalue())
+        self.assertIn("anticheat: 5 eventos entregues", out.getvalue())
+
+        with open(self.path) as written:
+            records = [json.loads(line) for line in written]
+        self.assertEqual([r["event"]["id"] for r in records], [str(e.id) for e in events])
+        self.assertEqual([r["seq"] for r in records], sorted(r["seq"] for r in records))
+        posted = [json.loads(line) for body in _Receiver.bodies for line in body.splitlines()]
+        self.assertEqual(posted, records)
+        self.assertEqual(len(_Receiver.bodies), 3)
+        # Delivered to every sink: nothing left to keep
+        self.assertFalse(EventOutbox.objects.exists())
+
+    def test_failed_batch_is_retried_with_backoff(self) -> None:
+        self._events(2)
+        http = outbox.configured_sinks()["anticheat"]
+        _Receiver.failing = True
+        self.assertEqual(outbox.dispatch_batch(http), -1)
+        cursor = OutboxCursor.objects.get(sink="anticheat")
+        self.assertEqual(cursor.attempts, 1)
+        self.assertEqual(OutboxDelivery.objects.filter(sink="anticheat").count(), 2)
+        self.assertIn("503", cursor.last_error)
+        # Backing off: not retried before next_attempt_at
+        _Receiver.failing = False
+        self.assertEqual(outbox.dispatch_batch(http), 0)
+        self.assertEqual(outbox.backoff(3), 4 * outbox.BACKOFF_BASE)
+
+        OutboxCursor.objects.filter(sink="anticheat").update(next_attempt_at=timezone.now())
+        self.assertEqual(outbox.dispatch_batch(http), 2)
+        cursor.refresh_from_db()
+        self.assertEqual((cursor.attempts, cursor.delivered), (0, 2))
+        # The file sink has not delivered yet, so the rows stay
+        self.assertEqual(outbox.prune(), 0)
+
+        stats = self.client.get("/api/events/outbox/").data
+        self.assertEqual(stats["sinks"]["analytics"]["pending"], 2)
+        self.assertEqual(stats["sinks"]["anticheat"]["pending"], 0)
+        self.assertGreaterEqual(stats["sinks"]["analytics"]["lag_seconds"], 0)
+        self.assertIsNotNone(stats["sinks"]["anticheat"]["events_per_second"])
+
+    def test_late_commit_below_delivered_rows_is_sent(self) -> None:
+        first, *_ = self._events(3)
+        analytics = outbox.configured_sinks()["analytics"]
+        # As if the first row's transaction had not committed yet
+        late = list(OutboxDelivery.objects.filter(sink="analytics", entry__event_id=first.id))
+        OutboxDelivery.objects.filter(pk__in=[d.pk for d in late]).delete()
+        self.assertEqual(outbox.dispatch_batch(analytics), 2)
+
+        OutboxDelivery.objects.bulk_create(late)
+        self.assertEqual(outbox.dispatch_batch(analytics), 1)
+        with open(self.path) as written:
+            records = [json.loads(line) for line in written]
+        self.assertEqual(records[-1]["event"]["id"], str(first.id))
+        self.assertFalse(OutboxDelivery.objects.filter(sink="analytics").exists())
+
+    def test_leased_sink_is_skipped(self) -> None:
+        self._events(1)
+        OutboxCursor.objects.create(
+            sink="analytics", leased_until=timezone.now() + timedelta(minutes=1)
+        )
+        self.assertEqual(outbox.dispatch_batch(outbox.configured_sinks()["analytics"]), 0)
+        self.assertFalse(os.path.exists(self.path))
+
+
+    def test_expired_lease_taken_over_is_kept(self) -> None:
+        self._events(1)
+        analytics = outbox.configured_sinks()["analytics"]
+        taken = timezone.now() + timedelta(minutes=5)
+        send = analytics.send
+
+        def slow_send(records: list[dict[str, Any]]) -> None:
+            # The lease ran out and another dispatcher took the sink over
+            OutboxCursor.objects.filter(sink="analytics").update(leased_until=taken)
+            send(records)
+
+        with mock.patch.object(analytics, "send", side_effect=slow_send):
+            self.assertEqual(outbox.dispatch_batch(analytics), 1)
+        self.assertEqual(OutboxCursor.objects.get(sink="analytics").leased_until, taken)
+
+class EventAsyncReadPathTests(TransactionTestCase):
+    """The async views that serve the hot reads under ASGI (config/urls_async.py)."""
+
+    def setUp(self) -> None:
+        self.guild = Guild.objects.create(name="Async Guild", score="10")
+        self.player = Player.objects.create(
+            user=User.objects.create(username="async"), guild=self.guild
+        )
+        create_events([
+            Event(
+                type=EventType.PLAYER_KILL, details={"n": i}, player=self.player, guild=self.guild
+            )
+            for i in range(3)
+        ] + [Event(type=EventType.QUEST_COMPLETE, details={}, player=self.player)])
+        self.async_client = AsyncClient()
+        stats_cache.clear()
+        self.addCleanup(stats_cache.clear)
+
+    async def _both(self, path: str, params: dict[str, Any]) -> tuple[Any, Any]:
+        with mock.patch("apps.core.aio.sync_view", wraps=aio.sync_view) as fallback:
+            served = await self.async_client.get(path, params)
+        self.assertFalse(fallback.called, path)
+        stats_cache.clear()
+        expected = await sync_to_async(self.client.get)(path, params)
+        return served, expected
+
+    async def test_matches_the_sync_views(self) -> None:
+        cases = [
+            ("/api/events/", {"page_size": 2}),
+            ("/api/events/", {"type": EventType.PLAYER_KILL, "fields": "id,type,details"}),
+            ("/api/events/statistics/", {}),
+            ("/api/events/player_stats/", {"player_id": str(self.player.id)}),
+            ("/api/events/guild_stats/", {"guild_id": str(self.guild.id)}),
+            ("/api/events/player_stats/", {"player_id": str(uuid.uuid4())}),
+            ("/api/events/guild_stats/", {"guild_id": "nope"}),
+            ("/api/events/player_stats/", {}),
+            ("/api/events/", {"fields": "nope"}),
+            ("/api/events/", {"cursor": "nope"}),
+            ("/api/events/", {"details.mood": "x"}),
+        ]
+        for path, params in cases:
+            served, expected = await self._both(path, params)
+            self.assertEqual(served.status_code, expected.status_code, (path, params))
+            self.assertEqual(served.json(), expected.json(), (path, params))
+
+        # Following the cursor gives the same next page
+        page = (await self.async_client.get("/api/events/", {"page_size": 2})).json()
+        query = QueryDict(page["next"].split("?")[1])
+        served, expected = await self._both("/api/events/", dict(query.items()))
+        self.assertEqual(served.json(), expected.json())
+        self.assertEqual(len(served.json()["results"]), 2)
+
+    async def test_sequential_queries(self) -> None:
+        with mock.patch("apps.core.aio.CONCURRENT_QUERIES", False):
+            served, expected = await self._both(
+                "/api/events/player_stats/", {"player_id": str(self.player.id)}
+            )
+        self.assertEqual(served.json(), expected.json())
+        self.assertEqual(served.json()["total_events"], 4)
+
+    async def test_query_threads_keep_their_connections(self) -> None:
+        path, params = "/api/events/player_stats/", {"player_id": str(self.player.id)}
+        churn: list[str] = []
+
+        def on_pool_thread(event: str) -> None:
+            # The request's own sync code runs on the main thread in tests
+            if threading.current_thread() is not threading.main_thread():
+                churn.append(event)
+
+        def created(sender: Any, connection: Any, **kwargs: Any) -> None:
+            on_pool_thread("open")
+
+        # Start every pool thread, each opening its connection once
+        barrier = threading.Barrier(aio.QUERY_THREADS)
+
+        def warm() -> bool:
+            barrier.wait(timeout=5)
+            return Event.objects.exists()
+
+        await aio.concurrently(*[warm] * aio.QUERY_THREADS)
+        connection_created.connect(created)
+        self.addCleanup(connection_created.disconnect, created)
+        wrapper_class = type(connections["default"])
+        close = wrapper_class.close
+
+        def closing(wrapper: Any) -> None:
+            on_pool_thread("close")
+            close(wrapper)
+
+        with mock.patch.object(wrapper_class, "close", closing):
+            for _ in range(3):
+                stats_cache.clear()
+                response = await self.async_client.get(path, params)
+                self.assertEqual(response.json()["total_events"], 4)
+        # CONN_MAX_AGE is 0 here, yet no query opened or closed a connection
+        self.assertEqual(churn, [])
+
+    async def test_concurrent_queries_are_measured(self) -> None:
+        instrumentation.registry.clear()
+        self.addCleanup(instrumentation.registry.clear)
+        with mock.patch("apps.core.instrumentation.SAMPLE_RATE", 1.0):
+            response = await self.async_client.get("/api/events/statistics/")
+        # The three counter reads ran on worker threads
+        self.assertIn('db;dur=', response["Server-Timing"])
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
+        self.assertEqual(instrumentation.registry.stats()["GET event-statistics"]["requests"], 1)
+
+    async def test_other_requests_use_the_sync_views(self) -> None:
+        with mock.patch("apps.core.aio.sync_view", wraps=aio.sync_view) as fallback:
+            response = await self.async_client.get("/api/events/", {"format": "api"})
+        self.assertTrue(fallback.called)
+        self.assertEqual(response["Content-Type"], "text/html; charset=utf-8")
+        # Full-text search stays on the sync view
+        with mock.patch("apps.events.async_views.sync_view", wraps=aio.sync_view) as fallback:
+            response = await self.async_client.get("/api/events/", {"q": "kill"})
+        self.assertTrue(fallback.called)
+        self.assertEqual(response.status_code, 200)
+
+        token = await sync_to_async(Token.objects.create)(
+            user=await sync_to_async(get_user_model().objects.create_user)(username="async_writer")
+        )
+        response = await self.async_client.post(
+            "/api/events/", {"type": EventType.OTHER, "details": {}},
+            content_type="application/json", headers={"Authorization": f"Token {token.key}"},
+        )
+        self.assertEqual(response.status_code, 201)
+        response = await self.async_client.get(
+            "/api/events/", headers={"Authorization": "Token nope"}
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+class RequestMetricsTests(APITestCase):
+    """Tests for the sampled per-request instrumentation (Server-Timing, per-route histograms)."""
+
+    def setUp(self) -> None:
+        player = Player.objects.create(user=User.objects.create(username="measured"))
+        create_events([
+            Event(type=EventType.QUEST_COMPLETE, details={}, player=player) for _ in range(3)
+        ])
+        instrumentation.registry.clear()
+        self.addCleanup(instrumentation.registry.clear)
+
+    def test_unsampled_requests_are_untouched(self) -> None:
+        response = self.client.get("/api/events/statistics/")
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(instrumentation.registry.stats(), {})
+
+    @mock.patch("apps.core.instrumentation.SAMPLE_RATE", 1.0)
+    def test_server_timing_and_route_histograms(self) -> None:
+        response = self.client.get("/api/events/statistics/")
+        timing = response["Server-Timing"]
+        self.assertTrue(timing.startswith('db;dur='), timing)
+        self.assertIn('desc="3 queries"', timing)
+        for name in ("serialize", "view", "render", "total"):
+            self.assertIn(f"{name};dur=", timing)
+        self.assertNotIn("budget", timing)
+
+        self.client.get("/api/events/", {"page_size": 2})
+        routes = self.client.get("/api/request-metrics/").data["routes"]
+        self.assertEqual(set(routes), {"GET event-statistics", "GET event-list"})
+        stats = routes["GET event-statistics"]
+        self.assertEqual(
+            (stats["requests"], stats["max_queries"], stats["over_query_budget"]), (1, 3, 0)
+        )
+        # Cumulative buckets: 3 queries falls in le=5
+        self.assertEqual(dict(stats["queries"]["buckets"])[2], 0)
+        self.assertEqual(dict(stats["queries"]["buckets"])[5], 1)
+
+    @mock.patch("apps.core.instrumentation.SAMPLE_RATE", 1.0)
+    def test_budgets(self) -> None:
+        with mock.patch("apps.core.instrumentation.QUERY_BUDGET", 2), \
+                self.assertLogs("apps.core.instrumentation", "WARNING") as logs:
+            response = self.client.get("/api/events/statistics/")
+        self.assertIn('budget;desc="queries"', response["Server-Timing"])
+        self.assertIn("GET event-statistics over budget (queries): 3 queries", logs.output[0])
+
+        with mock.patch("apps.core.instrumentation.LATENCY_BUDGET_MS", 0.0), \
+                self.assertLogs("apps.core.instrumentation", "WARNING"):
+            self.client.get("/api/events/statistics/")
+        stats = instrumentation.registry.stats()["GET event-statistics"]
+        self.assertEqual((stats["over_query_budget"], stats["over_latency_budget"]), (1, 1))
+
+
+class PrometheusMetricsTests(APITestCase):
+    """Tests for the /metrics exposition and its aggregation across worker processes."""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        writer = get_user_model().objects.create_user(username="metrics_writer")
+        self.client.force_authenticate(user=writer)
+
+    def _sample(self, body: str, line: str) -> float:
+        for row in body.splitlines():
+            if row.startswith(line + " "):
+                return float(row.rsplit(" ", 1)[1])
+        return 0.0
+
+    def test_ingest_counts_and_latency(self) -> None:
+        ingested = EVENTS_INGESTED.value(type=EventType.QUEST_COMPLETE)
+        timed = INGEST_SECONDS.count(mode="bulk")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/api/events/bulk/", [
+                {"type": EventType.QUEST_COMPLETE, "details": {}} for _ in range(3)
+            ], format="json")
+        # Rolled back: not counted
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.client.post(
+                "/api/events/", {"type": EventType.QUEST_COMPLETE, "details": {}}, format="json"
+            )
+        self.assertTrue(callbacks)
+        self.assertEqual(EVENTS_INGESTED.value(type=EventType.QUEST_COMPLETE), ingested + 3)
+        self.assertEqual(INGEST_SECONDS.count(mode="bulk"), timed + 1)
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4; charset=utf-8")
+        body = response.content.decode()
+        ingested_now = self._sample(body, 'eventhub_events_ingested_total{type="QUEST_COMPLETE"}')
+        self.assertEqual(ingested_now, ingested + 3)
+        timed_now = self._sample(body, 'eventhub_ingest_seconds_count{mode="bulk"}')
+        self.assertEqual(timed_now, timed + 1)
+        self.assertIn('eventhub_ingest_seconds_bucket{le="+Inf",mode="bulk"}', body)
+        # Both caches report under one family
+        self.assertEqual(body.count("# TYPE eventhub_cache_hits_total counter"), 1)
+        self.assertIn('eventhub_cache_hits_total{cache="players_resolver"}', body)
+
+    def test_workers_are_summed_through_the_directory(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with mock.patch("apps.core.metrics.METRICS_DIR", directory.name):
+            before = EVENTS_INGESTED.value(type=EventType.OTHER)
+            EVENTS_INGESTED.inc(2, type=EventType.OTHER)
+
+            # A forked worker starts from zero, writes its snapshot and exits
+            def worker() -> None:
+                EVENTS_INGESTED.inc(5, type=EventType.OTHER)
+                metrics.REGISTRY.flush()
+
+            process = multiprocessing.get_context("fork").Process(target=worker)
+            process.start()
+            process.join(10)
+            self.assertEqual(process.exitcode, 0)
+
+            body = self.client.get("/metrics").content.decode()
+            self.assertEqual(len(os.listdir(directory.name)), 2)
+        # The exited worker's counter stays; its gauges do not
+        ingested = self._sample(body, 'eventhub_events_ingested_total{type="OTHER"}')
+        self.assertEqual(ingested, before + 7)
+        entries = player_resolver.stats()["size"]
+        self.assertEqual(
+            self._sample(body, 'eventhub_cache_entries{cache="players_resolver"}'), entries
+        )
+
+    def test_exposition_escapes_labels(self) -> None:
+        registry = metrics.Registry()
+        counter = metrics.Counter("demo_total", "Line\\one", ["name"], registry=registry)
+        counter.inc(name='say "hi"\n')
+        self.assertEqual(
+            metrics.exposition(registry.collect()),
+            '# HELP demo_total Line\\\\one\n# TYPE demo_total counter\n'
+            'demo_total{name="say \\"hi\\"\\n"} 1\n',
+        )
@@ -1,7 +1,9 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import EventViewSet
+from .views import EventViewSet, event_feed
 
 router = DefaultRouter()
 router.register(r'events', EventViewSet)
 
-urlpatterns = router.urls
+# Before the router, whose detail route would take "feed" for a pk
+urlpatterns = [path('events/feed/', event_feed, name='event-feed')] + router.urls
@@ -1,182 +1,457 @@
-from typing import Any
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Mapping, Optional
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
-from django.db.models import Count, Max, QuerySet
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import NotFound
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
-from apps.events.models import Event
-from apps.events.serializers import EventSerializer
+from apps.events.attributes import filter_by_attributes
+from apps.events.export import (
+    CSVRenderer,
+    NDJSONRenderer,
+    async_stream,
+    csv_stream,
+    export_rows,
+    gzip_stream,
+    ndjson_stream,
+)
+from apps.core.instrumentation import span
+from apps.core.renderers import MEDIA_TYPE as MSGPACK_MEDIA_TYPE, msgpack
+from apps.events.ingest import (
+    BULK_MAX_EVENTS,
+    CheckpointMismatch,
+    MessagePackReader,
+    NDJSONReader,
+    create_events,
+    ingest_ndjson,
+    validate_event_batch,
+)
+from apps.events.feed import FeedFilter, FeedItem, broker, replay, stream as feed_stream
+from apps.events.metrics import INGEST_SECONDS
+from apps.events.models import (
+    Event,
+    EventType,
+    EventTypeCount,
+    GuildEventCount,
+    IngestCheckpoint,
+    PlayerEventCount,
+)
+from apps.events.outbox import outbox_stats
+from apps.events.pagination import EventCursorPagination, EventSearchPagination
+from apps.events.rollups import RESOLUTIONS, timeseries as rollup_timeseries
+from apps.events.search import terms as search_terms
+from apps.events.serializers import EventRowSerializer, EventSerializer, parse_fields
+from apps.events.stats import guild_stats as compute_guild_stats
+from apps.events.stats import player_stats as compute_player_stats
+from apps.events.stats import stats_cache
+
+
+def _parse_moment(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        raise ValueError(value)
+    if timezone.is_naive(moment):
+        moment = moment.replace(tzinfo=dt_timezone.utc)
+    return moment
+
+
+def filtered_events(params: Mapping[str, str]) -> QuerySet[Event]:
+    queryset = Event.objects.all()
+    
+    # Filtro por tipo de evento
+    event_type = params.get('type')
+    if event_type:
+        queryset = queryset.filter(type=event_type)
+    
+    # Filtro por player
+    player_id = params.get('player_id')
+    if player_id:
+        queryset = queryset.filter(player_id=player_id)
+    
+    # Filtro por guild
+    guild_id = params.get('guild_id')
+    if guild_id:
+        queryset = queryset.filter(guild_id=guild_id)
+    
+    # Filtro por intervalo de datas
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    if start_date:
+        queryset = queryset.filter(created_at__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(created_at__lte=end_date)
+
+    # Filtros por atributos extraídos de details (?details.target_id=...)
+    return filter_by_attributes(queryset, params)
+
+
+def required_uuid(params: Mapping[str, str], name: str) -> str:
+    """The ``name`` parameter; ``ValueError`` (message for the client) unless it is a UUID."""
+    value = params.get(name)
+    if not value:
+        raise ValueError(f'{name} é obrigatório')
+    try:
+        uuid.UUID(value)
+    except ValueError as exc:
+        raise ValueError(f'{name} inválido') from exc
+    return value
+
+
+def type_counts() -> list[tuple[str, int]]:
+    return list(
+        EventTypeCount.objects.filter(count__gt=0)
+        .order_by('type')
+        .values_list('type', 'count')
+    )
+
+
+def top_players() -> list[tuple[Any, str, int]]:
+    return list(
+        PlayerEventCount.objects.filter(count__gt=0)
+        .order_by('-count')
+        .values_list('player_id', 'player__user__username', 'count')[:10]
+    )
+
+
+def top_guilds() -> list[tuple[Any, str, int]]:
+    return list(
+        GuildEventCount.objects.filter(count__gt=0)
+        .order_by('-count')
+        .values_list('guild_id', 'guild__name', 'count')[:10]
+    )
+
+
+def statistics_payload(
+    type_counts: list[tuple[str, int]],
+    top_players: list[tuple[Any, str, int]],
+    top_guilds: list[tuple[Any, str, int]],
+) -> dict[str, Any]:
+    return {
+        'total_events': sum(count for _, count in type_counts),
+        'events_by_type': [{'type': t, 'count': c} for t, c in type_counts],
+        'top_players': [
+            {'player__id': str(pid), 'player__user__username': username, 'count': c}
+            for pid, username, c in top_players
+        ],
+        'top_guilds': [
+            {'guild__id': str(gid), 'guild__name': name, 'count': c}
+            for gid, name, c in top_guilds
+        ],
+    }
 
 
 class EventViewSet(viewsets.ModelViewSet[Any]):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = EventCursorPagination
 
     def get_queryset(self) -> QuerySet[Event]:
-        queryset = Event.objects.all()
-        
-        # Filtro por tipo de evento
-        event_type = self.request.query_params.get('type')
-        if event_type:
-            queryset = queryset.filter(type=event_type)
-        
-        # Filtro por player
-        player_id = self.request.query_params.get('player_id')
-        if player_id:
-            queryset = queryset.filter(player_id=player_id)
-        
-        # Filtro por guild
-        guild_id = self.request.query_params.get('guild_id')
-        if guild_id:
-            queryset = queryset.filter(guild_id=guild_id)
-        
-        # Filtro por intervalo de datas
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-        if start_date:
-            queryset = queryset.filter(created_at__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(created_at__lte=end_date)
-        
-        return queryset
+        # Os filtros da listagem não se aplicam ao acesso por id
+        if self.detail:
+            return Event.objects.all()
+        return filtered_events(self.request.query_params)
+
+    def perform_create(self, serializer: Any) -> None:
+        with INGEST_SECONDS.time(mode='single'):
+            serializer.save()
+
+    def list(self, request: Any, *args: Any, **kwargs: Any) -> Response:
+        # ?fields=id,type,... limita os campos de cada linha
+        try:
+            fields = parse_fields(request.query_params.get('fields'))
+            queryset = self.get_queryset()
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        q = request.query_params.get('q')
+        if q is None:
+            # Leitura direta em tuplas (values_list), sem instanciar modelos nem o ModelSerializer
+            paginator = self.paginator
+            rows = EventRowSerializer(fields, leading=paginator.fields)
+            page = paginator.paginate_queryset(rows.rows(queryset), request, view=self)
+            with span('serialize'):
+                data = rows.to_representation(page)
+            return paginator.get_paginated_response(data)
+
+        # Busca textual em details, ordenada por relevância e paginada por cursor
+        if not search_terms(q):
+            return Response(
+                {'error': 'q deve conter ao menos um termo'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        paginator = EventSearchPagination()
+        page = paginator.paginate_search(q, queryset if queryset.query.where else None, request)
+        with span('serialize'):
+            data = self.get_serializer([event for _, event in page], many=True).data
+            wanted = EventRowSerializer(fields).fields
+            data = [{name: row[name] for name in wanted} for row in data]
+            for row, (score, _) in zip(data, page):
+                row['search_score'] = score
+        return paginator.get_paginated_response(data)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request: Any) -> Response:
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'error': 'O corpo deve ser uma lista não vazia de eventos'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > BULK_MAX_EVENTS:
+            return Response(
+                {'error': f'Máximo de {BULK_MAX_EVENTS} eventos por requisição'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+
+        # Validação em uma passada; itens inválidos vão para o relatório
+        with INGEST_SECONDS.time(mode='bulk'):
+            events, errors = validate_event_batch(items)
+            created = create_events(events)
+
+        return Response(
+            {
+                'received': len(items),
+                'created': len(created),
+                'ids': [str(event.id) for event in created],
+                'errors': errors,
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        )
+
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request: Any) -> Any:
+        compress = request.query_params.get('compress')
+        if compress not in (None, '', 'gzip'):
+            return Response({'error': 'compress deve ser gzip'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Mesmos filtros da listagem; linhas lidas em blocos e escritas à medida que saem
+        try:
+            queryset = self.get_queryset()
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.accepted_renderer.format
+        encode = csv_stream if fmt == 'csv' else ndjson_stream
+        stream = encode(export_rows(queryset))
+        filename = f'events.{fmt}'
+        content_type = request.accepted_renderer.media_type
+        if compress:
+            stream = gzip_stream(stream)
+            filename += '.gz'
+            content_type = 'application/gzip'
+
+        # Sob ASGI, um iterador síncrono seria lido inteiro antes do envio
+        if isinstance(request._request, ASGIRequest):
+            stream = async_stream(stream)
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=False, methods=['get', 'post'])
+    def ingest(self, request: Any) -> Response:
+        stream_id = request.query_params.get('stream_id') or None
+
+        if request.method == 'GET':
+            # Consulta do checkpoint para retomar um upload interrompido
+            if not stream_id:
+                return Response(
+                    {'error': 'stream_id é obrigatório'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            checkpoint = IngestCheckpoint.objects.filter(stream_id=stream_id).first()
+            return Response({
+                'stream_id': stream_id,
+                'committed_offset': checkpoint.committed_offset if checkpoint else 0,
+                'committed_line': checkpoint.committed_line if checkpoint else 0,
+                'accepted': checkpoint.accepted if checkpoint else 0,
+                'rejected': checkpoint.rejected if checkpoint else 0,
+            })
+
+        try:
+            offset = int(request.query_params.get('offset', 0))
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return Response(
+                {'error': 'offset inválido'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # NDJSON por padrão; objetos MessagePack concatenados com Content-Type: application/msgpack
+        reader_class: type[NDJSONReader] = NDJSONReader
+        if request.content_type.split(';')[0].strip() == MSGPACK_MEDIA_TYPE:
+            if msgpack is None:
+                return Response(
+                    {'error': 'MessagePack não disponível neste servidor'},
+                    status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+                )
+            reader_class = MessagePackReader
+
+        # Lê o corpo direto do stream, sem passar pelos parsers do DRF
+        body = request.stream
+        if body is None:
+            return Response(
+                {'error': 'Corpo vazio'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            with INGEST_SECONDS.time(mode='stream'):
+                report = ingest_ndjson(
+                    body,
+                    stream_id=stream_id,
+                    offset=offset,
+                    expected_length=content_length or None,
+                    reader_class=reader_class,
+                )
+        except CheckpointMismatch as exc:
+            return Response(
+                {
+                    'error': str(exc),
+                    'committed_offset': exc.checkpoint.committed_offset,
+                    'committed_line': exc.checkpoint.committed_line,
+                },
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(report)
 
     @action(detail=False, methods=['get'])
     def statistics(self, request: Any) -> Response:
-        total_events = Event.objects.count()
-        response_data: dict[str, Any] = {
-            'total_events': total_events,
-            'events_by_type': [],
-            'top_players': [],
-            'top_guilds': [],
-        }
-        from django.db.models import QuerySet
+        # Lê das tabelas de contadores mantidas na ingestão (sem varrer Event)
+        counts = type_counts(), top_players(), top_guilds()
+        with span('serialize'):
+            return Response(statistics_payload(*counts))
+
+    @action(detail=False, methods=['get'])
+    def timeseries(self, request: Any) -> Response:
+        params = request.query_params
+        now = timezone.now()
         try:
-            event_types_qs: QuerySet[Any] = Event.objects.all()
-            type_counts: dict[str, int] = {}
-            for event in event_types_qs:
-                type_counts[event.type] = type_counts.get(event.type, 0) + 1
-            response_data['events_by_type'] = [
-                {'type': k, 'count': v} for k, v in type_counts.items()
-            ]
-            
-            # Top players
-            player_counts: dict[str, int] = {}
-            for event in event_types_qs.filter(player__isnull=False):
-                username = event.player.user.username if event.player else 'Unknown'
-                player_counts[username] = player_counts.get(username, 0) + 1
-            response_data['top_players'] = [
-                {'player__user__username': k, 'count': v}
-                for k, v in sorted(player_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-            ]
-            
-            # Top guilds
-            guild_counts: dict[str, int] = {}
-            for event in event_types_qs.filter(guild__isnull=False):
-                guild_name = event.guild.name if event.guild else 'Unknown'
-                guild_counts[guild_name] = guild_counts.get(guild_name, 0) + 1
-            response_data['top_guilds'] = [
-                {'guild__name': k, 'count': v}
-                for k, v in sorted(guild_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-            ]
-        except Exception:  # pragma: no cover
-            pass
-        
-        return Response(response_data)
-        
-        return Response(response_data)
+            end = _parse_moment(params.get('end')) or now
+            start = _parse_moment(params.get('start')) or end - timedelta(days=1)
+        except ValueError:
+            return Response(
+                {'error': 'start/end devem estar em formato ISO 8601'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if start >= end:
+            return Response(
+                {'error': 'start deve ser anterior a end'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-    @action(detail=False, methods=["get"])
-    def player_stats(self, request: Any) -> Response:
-        player_id = request.query_params.get('player_id')
-        if not player_id:
+        resolution = params.get('resolution') or None
+        if resolution and resolution not in RESOLUTIONS:
             return Response(
-                {'error': 'player_id é obrigatório'},
+                {'error': f'resolution deve ser um de: {", ".join(RESOLUTIONS)}'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        events_qs = Event.objects.filter(player_id=player_id)
-        if not events_qs.exists():
+
+        # Uma dimensão por consulta: tipo, guild ou player (ou o total)
+        dimension, key = 'all', ''
+        if params.get('type'):
+            dimension, key = 'type', params['type']
+        elif params.get('guild_id'):
+            dimension, key = 'guild', params['guild_id']
+        elif params.get('player_id'):
+            dimension, key = 'player', params['player_id']
+
+        return Response(rollup_timeseries(start, end, dimension, key, resolution))
+
+    @action(detail=False, methods=["get"])
+    def player_stats(self, request: Any) -> Response:
+        try:
+            player_id = required_uuid(request.query_params, 'player_id')
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Cacheado até o próximo evento do player (versão por entidade)
+        stats = stats_cache.get_or_compute(
+            'player', player_id, lambda: compute_player_stats(player_id)
+        )
+        if stats is None:
             return Response(
                 {'error': 'Player não encontrado'},
                 status=status.HTTP_404_NOT_FOUND
             )
-        
-        total_events = events_qs.count()
-        
-        # Count event types without .annotate() to avoid mypy-django-plugin crash
-        event_types: dict[str, int] = {}
-        for event in events_qs:
-            event_types[event.type] = event_types.get(event.type, 0) + 1
-        
-        # Get last activity
-        last_activity = None
-        for event in events_qs.order_by('-created_at')[:1]:
-            last_activity = event.created_at
-        
-        # Get related guilds
-        guilds_list: list[dict[str, Any]] = []
-        guild_ids: set[Any] = set()
-        for event in events_qs.filter(guild__isnull=False):
-            if event.guild and event.guild.id not in guild_ids:
-                guilds_list.append({
-                    'guild__id': str(event.guild.id),
-                    'guild__name': event.guild.name
-                })
-                guild_ids.add(event.guild.id)
-        
-        return Response({
-            'player_id': str(player_id),
-            'total_events': total_events,
-            'event_types': [{'type': k, 'count': v} for k, v in event_types.items()],
-            'last_activity': last_activity,
-            'guilds_related': guilds_list,
-        })
+        return Response(stats)
 
     @action(detail=False, methods=['get'])
     def guild_stats(self, request: Any) -> Response:
-        guild_id = request.query_params.get('guild_id')
-        if not guild_id:
-            return Response(
-                {'error': 'guild_id é obrigatório'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        events_qs = Event.objects.filter(guild_id=guild_id)
-        if not events_qs.exists():
+        try:
+            guild_id = required_uuid(request.query_params, 'guild_id')
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Cacheado até o próximo evento da guild (versão por entidade)
+        stats = stats_cache.get_or_compute('guild', guild_id, lambda: compute_guild_stats(guild_id))
+        if stats is None:
             return Response(
                 {'error': 'Guild não encontrada'},
                 status=status.HTTP_404_NOT_FOUND
             )
-        
-        total_events = events_qs.count()
-        
-        # Count event types without .annotate() to avoid mypy-django-plugin crash
-        event_types: dict[str, int] = {}
-        for event in events_qs:
-            event_types[event.type] = event_types.get(event.type, 0) + 1
-        
-        # Get involved players
-        players_list: list[dict[str, Any]] = []
-        player_ids: set[Any] = set()
-        for event in events_qs.filter(player__isnull=False):
-            if event.player and event.player.id not in player_ids:
-                players_list.append({
-                    'player__id': str(event.player.id),
-                    'player__user__username': event.player.user.username
-                })
-                player_ids.add(event.player.id)
-        
-        # Get last activity
-        last_activity = None
-        for event in events_qs.order_by('-created_at')[:1]:
-            last_activity = event.created_at
-        
-        return Response({
-            'guild_id': str(guild_id),
-            'total_events': total_events,
-            'event_types': [{'type': k, 'count': v} for k, v in event_types.items()],
-            'players_involved': players_list,
-            'last_activity': last_activity,
-        })
+        return Response(stats)
+
+    @action(detail=False, methods=['get'])
+    def cache_stats(self, request: Any) -> Response:
+        # Taxa de acerto do cache de player_stats/guild_stats
+        return Response(stats_cache.stats())
+
+    @action(detail=False, methods=['get'])
+    def outbox(self, request: Any) -> Response:
+        # Pendências, atraso e vazão de cada destino do outbox
+        return Response(outbox_stats())
+
+
+@require_GET
+async def event_feed(request: HttpRequest) -> HttpResponse:
+    """Eventos novos em tempo real via Server-Sent Events (somente sob ASGI, config/asgi.py)."""
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'O feed requer um servidor ASGI (config.asgi)'}, status=501)
+
+    params = request.GET
+    event_type = params.get('type') or None
+    if event_type and event_type not in EventType.values:
+        return JsonResponse({'error': 'type inválido'}, status=400)
+    ids: dict[str, Optional[str]] = {}
+    for name in ('player_id', 'guild_id'):
+        try:
+            ids[name] = str(uuid.UUID(params[name])) if params.get(name) else None
+        except ValueError:
+            return JsonResponse({'error': f'{name} inválido'}, status=400)
+    feed_filter = FeedFilter(type=event_type, **ids)
+
+    # Retomada: o EventSource reenvia o último id recebido em Last-Event-ID
+    cursor = request.headers.get('Last-Event-ID') or params.get('cursor')
+    after = None
+    if cursor:
+        try:
+            after, _ = EventCursorPagination().decode(Event, cursor)
+        except NotFound:
+            return JsonResponse({'error': 'Cursor inválido'}, status=400)
+
+    # Inscreve antes do replay: nada commitado entre os dois passos se perde
+    subscription = broker.subscribe(feed_filter)
+    replayed: list[FeedItem] = []
+    truncated = False
+    if after:
+        try:
+            replayed, truncated = await sync_to_async(replay)(feed_filter, after)
+        except BaseException:
+            broker.unsubscribe(subscription)
+            raise
+
+    response = StreamingHttpResponse(
+        feed_stream(subscription, replayed, truncated), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -4,3 +4,7 @@ class GuildsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.guilds'
     verbose_name = "Guilds"
+
+    def ready(self) -> None:
+        # import signal handlers (score maintenance)
+        import apps.guilds.signals  # noqa: F401
@@ -0,0 +1,43 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+
+from apps.guilds.models import Guild
+from apps.guilds.scoring import scores_from_history
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula o score numérico das guilds a partir dos eventos e prêmios, com os pesos "
+        "configurados, somados ao score antigo importado como texto (legacy_score)."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Apenas compara os scores gravados com os recalculados, sem gravar.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        with transaction.atomic():
+            expected = scores_from_history()
+            changed: list[Guild] = []
+            for guild in Guild.objects.only("id", "name", "score").iterator(chunk_size=2000):
+                score = expected.get(guild.pk, 0)
+                if guild.score != score:
+                    self.stdout.write(f"{guild.pk} {guild.name}: score={guild.score} real={score}")
+                    guild.score = score
+                    changed.append(guild)
+
+            if options["check"]:
+                if changed:
+                    raise CommandError(f"{len(changed)} scores divergentes")
+                self.stdout.write(self.style.SUCCESS("Scores consistentes"))
+                return
+
+            Guild.objects.bulk_update(changed, ["score"], batch_size=1000)
+        self.stdout.write(self.style.SUCCESS(
+            f"Scores recalculados ({len(changed)} guilds atualizadas)"
+        ))
@@ -0,0 +1,69 @@
+# Generated by Django 6.0 on 2026-10-18 13:05
+
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+
+
+def parse_legacy_score(value):
+    try:
+        return int(Decimal(str(value).strip().replace(",", "")))
+    except (InvalidOperation, ValueError):
+        return 0
+
+
+def convert_scores(apps, schema_editor):
+    Guild = apps.get_model("guilds", "Guild")
+    guilds = list(Guild.objects.only("id", "score_text"))
+    for guild in guilds:
+        # The imported value stays as the base that events and awards add to
+        guild.legacy_score = guild.score = parse_legacy_score(guild.score_text)
+    Guild.objects.bulk_update(guilds, ["legacy_score", "score"], batch_size=1000)
+
+
+def restore_scores(apps, schema_editor):
+    Guild = apps.get_model("guilds", "Guild")
+    guilds = list(Guild.objects.only("id", "score"))
+    for guild in guilds:
+        guild.score_text = str(guild.score)
+    Guild.objects.bulk_update(guilds, ["score_text"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("guilds", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name="guild",
+            old_name="score",
+            new_name="score_text",
+        ),
+        migrations.AddField(
+            model_name="guild",
+            name="score",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="guild",
+            name="legacy_score",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(convert_scores, restore_scores),
+        # A default lets the migration be reversed on tables with rows
+        migrations.AlterField(
+            model_name="guild",
+            name="score_text",
+            field=models.CharField(max_length=50, default=""),
+        ),
+        migrations.RemoveField(
+            model_name="guild",
+            name="score_text",
+        ),
+        migrations.AddIndex(
+            model_name="guild",
+            index=models.Index(fields=["-score", "-id"], name="guilds_score_idx"),
+        ),
+    ]
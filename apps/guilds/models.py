@@ -10,9 +10,24 @@ class Guild(models.Model):
         unique=True
     )
     name = models.CharField(max_length=150)
-    score = models.CharField(max_length=50)
+    # Weighted sum of the guild's events and awards (see apps.guilds.scoring)
+    score = models.BigIntegerField(default=0)
+    # Score imported as text before scores were derived; score always
+    # includes it, on top of the weighted history.
+    legacy_score = models.BigIntegerField(default=0)
     awards = models.JSONField(default=list)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Latest event seen at ingest (apps.events.counters.apply_activity); the
+    # lifetime count is the ``event_count`` row kept by the same receivers.
+    last_seen = models.DateTimeField(null=True, blank=True)
+    last_event_type = models.CharField(max_length=50, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            # Serves /api/guilds/ranking/ pages and rank counts
+            models.Index(fields=["-score", "-id"], name="guilds_score_idx"),
+            models.Index(fields=["-last_seen", "-id"], name="guilds_last_seen_idx"),
+        ]
 
     def __str__(self) -> str:
         return str(self.name)
@@ -0,0 +1,7 @@
+from apps.core.pagination import KeysetPagination
+
+
+class GuildRankingPagination(KeysetPagination):
+    ordering = ("-score", "-id")
+    page_size = 20
+    max_page_size = 500
@@ -0,0 +1,133 @@
+from collections import Counter
+from typing import Any, Iterable, Mapping, Optional
+
+from django.conf import settings
+from django.db.models import Count, F, Q, QuerySet
+from django.db.models.functions import Coalesce
+
+from apps.awards.models import Award
+from apps.events.models import Event
+from apps.guilds.models import Guild
+from apps.players.models import Player
+
+# Points a guild gets per event of each type and per award of each type.
+# Changing them only affects new events until rebuild_guild_scores runs.
+EVENT_WEIGHTS: dict[str, int] = getattr(settings, "GUILD_SCORE_EVENT_WEIGHTS", {
+    "PLAYER_KILL": 2,
+    "DUNGEON_CLEAR": 10,
+    "PLAYER_LEVEL_UP": 3,
+    "QUEST_COMPLETE": 5,
+})
+AWARD_WEIGHTS: dict[str, int] = getattr(settings, "GUILD_SCORE_AWARD_WEIGHTS", {
+    "GUILD_HARMONY": 50,
+    "SOLO_CLEAR": 25,
+    "REVENGE_AWARD": 15,
+    "RIVAL_SLAYER": 15,
+})
+
+# (player_id, event_id, award_type)
+AwardKey = tuple[Any, Any, str]
+
+
+def event_scores(events: Iterable[Any], sign: int = 1) -> Counter[Any]:
+    """Score delta per guild for ``events`` (``Event`` instances)."""
+    deltas: Counter[Any] = Counter()
+    for event in events:
+        weight = EVENT_WEIGHTS.get(event.type, 0)
+        if event.guild_id is not None and weight:
+            deltas[event.guild_id] += sign * weight
+    return deltas
+
+
+def award_keys(awards: Iterable[Award]) -> tuple[list[AwardKey], dict[Any, Any]]:
+    """``award_scores`` arguments for ``awards``, reusing events already loaded on them."""
+    keys: list[AwardKey] = []
+    event_guilds: dict[Any, Any] = {}
+    for award in awards:
+        keys.append((award.player_id, award.event_id, award.award_type))
+        if award.event_id and Award.event.is_cached(award):  # type: ignore[attr-defined]
+            event_guilds[award.event_id] = award.event.guild_id
+    return keys, event_guilds
+
+
+def award_scores(
+    keys: Iterable[AwardKey], sign: int = 1, event_guilds: Optional[Mapping[Any, Any]] = None
+) -> Counter[Any]:
+    """Score delta per guild for awards given as ``(player_id, event_id, award_type)``.
+
+    An award counts for the guild of its event, or for the player's guild when
+    the event has none. ``event_guilds`` maps event ids whose guild is already
+    known; the rest are resolved with one query, and players with another.
+    """
+    keys = [key for key in keys if AWARD_WEIGHTS.get(key[2], 0)]
+    if not keys:
+        return Counter()
+    event_guilds = dict(event_guilds or {})
+    unknown = {key[1] for key in keys if key[1] and key[1] not in event_guilds}
+    if unknown:
+        event_guilds.update(Event.objects.filter(pk__in=unknown).values_list("id", "guild_id"))
+    orphans = {player_id for player_id, event_id, _ in keys if not event_guilds.get(event_id)}
+    player_guilds = dict(
+        Player.objects.filter(pk__in=orphans, guild__isnull=False).values_list("id", "guild_id")
+    ) if orphans else {}
+
+    deltas: Counter[Any] = Counter()
+    for player_id, event_id, award_type in keys:
+        guild_id = event_guilds.get(event_id) or player_guilds.get(player_id)
+        if guild_id is not None:
+            deltas[guild_id] += sign * AWARD_WEIGHTS[award_type]
+    return deltas
+
+
+def apply_scores(deltas: Mapping[Any, int]) -> None:
+    """Add ``deltas[guild_id]`` to each guild's score, one UPDATE per distinct delta."""
+    by_delta: dict[int, list[Any]] = {}
+    for guild_id, delta in deltas.items():
+        if guild_id is not None and delta:
+            by_delta.setdefault(delta, []).append(guild_id)
+    for delta, guild_ids in by_delta.items():
+        Guild.objects.filter(pk__in=guild_ids).update(score=F("score") + delta)
+
+
+def ranking() -> QuerySet[Guild]:
+    return Guild.objects.all()
+
+
+def ranks(scores: Iterable[int]) -> dict[int, int]:
+    """Competition rank (1 + guilds with a higher score) of each score, in one query."""
+    wanted = sorted(set(scores))
+    if not wanted:
+        return {}
+    found = ranking().filter(score__gt=wanted[0]).aggregate(**{
+        f"above_{i}": Count("pk", filter=Q(score__gt=value)) for i, value in enumerate(wanted)
+    })
+    return {value: found[f"above_{i}"] + 1 for i, value in enumerate(wanted)}
+
+
+def scores_from_history() -> Counter[Any]:
+    """Score of every guild recomputed from ``Event`` and ``Award`` (grouped in the database).
+
+    Starts from ``Guild.legacy_score``, the base the ingest deltas are added to.
+    """
+    scores: Counter[Any] = Counter(
+        dict(Guild.objects.exclude(legacy_score=0).values_list("id", "legacy_score"))
+    )
+    events = (
+        Event.objects.filter(guild__isnull=False, type__in=list(EVENT_WEIGHTS))
+        .order_by()
+        .values_list("guild_id", "type")
+        .annotate(n=Count("pk"))
+    )
+    for guild_id, event_type, n in events:
+        scores[guild_id] += EVENT_WEIGHTS[event_type] * n
+    awards = (
+        Award.objects.filter(award_type__in=list(AWARD_WEIGHTS))
+        .annotate(guild_id=Coalesce("event__guild_id", "player__guild_id"))
+        .filter(guild_id__isnull=False)
+        .order_by()
+        .values_list("guild_id", "award_type")
+        .annotate(n=Count("pk"))
+    )
+    for guild_id, award_type, n in awards:
+        scores[guild_id] += AWARD_WEIGHTS[award_type] * n
+    return scores
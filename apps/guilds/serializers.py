@@ -4,7 +4,17 @@ from apps.guilds.models import Guild
 
 
 class GuildSerializer(serializers.ModelSerializer[Any]):
+    # Lifetime event count, from the counter row kept at ingest
+    event_count = serializers.SerializerMethodField()
+
     class Meta:
         model = Guild
         fields = "__all__"
-        read_only_fields = ("id", "created_at")
+        # score is derived from legacy_score, events and awards (apps.guilds.scoring)
+        read_only_fields = (
+            "id", "created_at", "last_seen", "last_event_type", "score", "legacy_score"
+        )
+
+    def get_event_count(self, obj: Any) -> int:
+        counter = getattr(obj, "event_count", None)
+        return counter.count if counter is not None else 0
@@ -0,0 +1,67 @@
+from typing import Any, Optional, Sequence
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.awards.leaderboard import awards_created
+from apps.awards.models import Award
+from apps.events.models import Event
+from apps.events.signals import events_created
+from apps.guilds.scoring import apply_scores, award_keys, award_scores, event_scores
+
+
+@receiver(post_save, sender=Event)
+def score_saved_event(sender: Any, instance: Event, created: bool, **kwargs: Any) -> None:
+    if kwargs.get("raw"):
+        return
+    if created:
+        apply_scores(event_scores([instance]))
+        return
+    # Set by apps.events.signals.remember_previous_state
+    previous: Optional[Event] = getattr(instance, "_previous_state", None)
+    if previous is None:
+        return
+    if (previous.type, previous.guild_id) != (instance.type, instance.guild_id):
+        deltas = event_scores([instance])
+        deltas.update(event_scores([previous], sign=-1))
+        apply_scores(deltas)
+
+
+@receiver(post_delete, sender=Event)
+def score_deleted_event(sender: Any, instance: Event, **kwargs: Any) -> None:
+    apply_scores(event_scores([instance], sign=-1))
+
+
+@receiver(events_created, sender=Event)
+def score_created_events(sender: Any, events: Sequence[Event], **kwargs: Any) -> None:
+    apply_scores(event_scores(events))
+
+
+@receiver(post_save, sender=Award)
+def score_saved_award(sender: Any, instance: Award, created: bool, **kwargs: Any) -> None:
+    if kwargs.get("raw"):
+        return
+    keys, event_guilds = award_keys([instance])
+    if created:
+        apply_scores(award_scores(keys, event_guilds=event_guilds))
+        return
+    # Set by apps.awards.signals.remember_previous_award
+    previous = getattr(instance, "_previous_key", None)
+    if previous is not None and previous != (instance.player_id, instance.award_type):
+        deltas = award_scores(keys, event_guilds=event_guilds)
+        deltas.update(award_scores(
+            [(previous[0], instance.event_id, previous[1])], sign=-1, event_guilds=event_guilds
+        ))
+        apply_scores(deltas)
+
+
+@receiver(post_delete, sender=Award)
+def score_deleted_award(sender: Any, instance: Award, **kwargs: Any) -> None:
+    keys, event_guilds = award_keys([instance])
+    apply_scores(award_scores(keys, sign=-1, event_guilds=event_guilds))
+
+
+@receiver(awards_created, sender=Award)
+def score_created_awards(sender: Any, awards: Sequence[Award], **kwargs: Any) -> None:
+    keys, event_guilds = award_keys(awards)
+    apply_scores(award_scores(keys, event_guilds=event_guilds))
@@ -1,7 +1,17 @@
+import importlib
+import io
 import uuid
+from unittest import mock
 from rest_framework import status
 from rest_framework.test import APITestCase
+from apps.awards.models import Award
+from apps.events.ingest import create_events
+from apps.events.models import Event, EventType
 from apps.guilds.models import Guild
+from apps.players.models import Player
+from apps.users.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 
@@ -76,7 +86,8 @@ class GuildModelTests(APITestCase):
         response = self.client.post(url, payload, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Guild.objects.count(), 3)
-        self.assertEqual(Guild.objects.get(name="New Guild").score, "750")
+        # score is derived from events and awards; a client value is ignored
+        self.assertEqual(Guild.objects.get(name="New Guild").score, 0)
 
     def test_update_guild(self) -> None:
         """Test PUT /guilds/{id}/ updates a guild."""
@@ -86,16 +97,18 @@ class GuildModelTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.guild1.refresh_from_db()
         self.assertEqual(self.guild1.name, "Updated Guild")
-        self.assertEqual(self.guild1.score, "2000")
+        self.assertEqual(self.guild1.score, 1000)
 
     def test_partial_update_guild(self) -> None:
         """Test PATCH /guilds/{id}/ partially updates a guild."""
         url = reverse('guild-detail', args=[self.guild2.id])
-        payload = {"score": "900"}
+        payload = {"name": "Renamed Guild", "score": "900"}
         response = self.client.patch(url, payload, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['score'], 500)
         self.guild2.refresh_from_db()
-        self.assertEqual(self.guild2.score, "900")
+        self.assertEqual(self.guild2.name, "Renamed Guild")
+        self.assertEqual(self.guild2.score, 500)
 
     def test_delete_guild(self) -> None:
         """Test DELETE /guilds/{id}/ deletes a guild."""
@@ -103,3 +116,82 @@ class GuildModelTests(APITestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Guild.objects.filter(id=self.guild1.id).exists())
+
+
+@mock.patch.dict(
+    "apps.guilds.scoring.EVENT_WEIGHTS", {"QUEST_COMPLETE": 5, "DUNGEON_CLEAR": 10}, clear=True
+)
+@mock.patch.dict("apps.guilds.scoring.AWARD_WEIGHTS", {"SOLO_CLEAR": 25}, clear=True)
+class GuildScoreTests(APITestCase):
+    """Tests for the weighted guild score and GET /guilds/ranking/."""
+
+    def setUp(self) -> None:
+        self.guilds = [Guild.objects.create(name=f"Ranked {i}") for i in range(3)]
+        self.player = Player.objects.create(
+            user=User.objects.create(username="guild_scorer"), guild=self.guilds[0]
+        )
+
+    def _score(self, guild: Guild) -> int:
+        guild.refresh_from_db()
+        return guild.score
+
+    def test_events_and_awards_update_score(self) -> None:
+        """Each event and award adds its weight to its guild."""
+        create_events([
+            Event(type=EventType.QUEST_COMPLETE, details={}, guild=self.guilds[0]),
+            Event(type=EventType.QUEST_COMPLETE, details={}, guild=self.guilds[0]),
+            Event(type=EventType.ITEM_PURCHASE, details={}, guild=self.guilds[0]),
+        ])
+        event = Event.objects.create(type=EventType.DUNGEON_CLEAR, details={}, guild=self.guilds[1])
+        self.assertEqual((self._score(self.guilds[0]), self._score(self.guilds[1])), (10, 10))
+
+        event.guild = self.guilds[2]
+        event.save()
+        self.assertEqual((self._score(self.guilds[1]), self._score(self.guilds[2])), (0, 10))
+
+        # Without an event, an award counts for the player's guild
+        award = Award.objects.create(player=self.player, award_type="SOLO_CLEAR")
+        self.assertEqual(self._score(self.guilds[0]), 35)
+        award.delete()
+        event.delete()
+        self.assertEqual((self._score(self.guilds[0]), self._score(self.guilds[2])), (10, 0))
+
+    def test_ranking_pages_by_score(self) -> None:
+        """Ranking is ordered by score with shared ranks for ties."""
+        Guild.objects.filter(pk=self.guilds[0].pk).update(score=30)
+        Guild.objects.filter(pk=self.guilds[1].pk).update(score=30)
+        url = reverse("guild-ranking")
+        response = self.client.get(url, {"page_size": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["rank"] for r in response.data["results"]], [1, 1])
+        response = self.client.get(response.data["next"])
+        self.assertEqual(
+            [(r["rank"], r["name"], r["score"]) for r in response.data["results"]],
+            [(3, "Ranked 2", 0)],
+        )
+
+        response = self.client.get(url, {"guild_id": str(self.guilds[2].id)})
+        self.assertEqual(response.data["rank"], 3)
+        response = self.client.get(url, {"guild_id": "x"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_keeps_legacy_scores(self) -> None:
+        """rebuild_guild_scores adds the history to legacy_score, as ingest does."""
+        Event.objects.create(type=EventType.QUEST_COMPLETE, details={}, guild=self.guilds[1])
+        Guild.objects.filter(pk=self.guilds[0].pk).update(legacy_score=1000)
+        Guild.objects.filter(pk=self.guilds[2].pk).update(score=70)
+        with self.assertRaises(CommandError):
+            call_command("rebuild_guild_scores", "--check", stdout=io.StringIO())
+        call_command("rebuild_guild_scores", stdout=io.StringIO())
+        self.assertEqual([self._score(g) for g in self.guilds], [1000, 5, 0])
+
+        # Live deltas land on top of the legacy base and --check agrees
+        Event.objects.create(type=EventType.QUEST_COMPLETE, details={}, guild=self.guilds[0])
+        self.assertEqual(self._score(self.guilds[0]), 1005)
+        call_command("rebuild_guild_scores", "--check", stdout=io.StringIO())
+
+    def test_legacy_score_parsing(self) -> None:
+        """The numeric migration keeps parseable string scores."""
+        migration = importlib.import_module("apps.guilds.migrations.0002_numeric_score")
+        parsed = [migration.parse_legacy_score(v) for v in ("1000", " 1,500 ", "12.9", "", "n/a")]
+        self.assertEqual(parsed, [1000, 1500, 12, 0, 0])
@@ -1,14 +1,54 @@
+import uuid
 from typing import Any
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from django.db.models import QuerySet
 
+from apps.core.views import ActivityListMixin
 from apps.guilds.models import Guild
+from apps.guilds.pagination import GuildRankingPagination
+from apps.guilds.scoring import ranking, ranks
 from .serializers import GuildSerializer
 
 
-class GuildViewSet(viewsets.ModelViewSet[Any]):
+def _ranking_entries(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    rank_of = ranks(row['score'] for row in rows)
+    return [
+        {
+            'rank': rank_of[row['score']],
+            'id': str(row['id']),
+            'name': row['name'],
+            'score': row['score'],
+        }
+        for row in rows
+    ]
+
+
+class GuildViewSet(ActivityListMixin, viewsets.ModelViewSet[Any]):
     queryset = Guild.objects.all()
     serializer_class = GuildSerializer
 
     def get_queryset(self) -> QuerySet[Guild]:
-        return Guild.objects.all()
+        return Guild.objects.select_related('event_count')
+
+    @action(detail=False, methods=['get'])
+    def ranking(self, request: Any) -> Response:
+        # Percorre o índice (-score, -id); a posição é uma contagem por faixa no mesmo índice
+        rows = ranking().values('id', 'name', 'score')
+
+        # Posição de uma guild específica
+        guild_id = request.query_params.get('guild_id')
+        if guild_id:
+            try:
+                uuid.UUID(guild_id)
+            except ValueError:
+                return Response({'error': 'guild_id inválido'}, status=status.HTTP_400_BAD_REQUEST)
+            row = rows.filter(id=guild_id).first()
+            if row is None:
+                return Response({'error': 'Guild não encontrada'}, status=status.HTTP_404_NOT_FOUND)
+            return Response(_ranking_entries([row])[0])
+
+        paginator = GuildRankingPagination()
+        page = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response(_ranking_entries(page))
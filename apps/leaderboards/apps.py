@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class LeaderboardsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.leaderboards'
+    verbose_name = "Leaderboards"
+
+    def ready(self) -> None:
+        # import signal handlers (window maintenance)
+        import apps.leaderboards.signals  # noqa: F401
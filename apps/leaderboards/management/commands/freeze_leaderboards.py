@@ -0,0 +1,31 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from apps.leaderboards.windows import freeze_closed_periods, recount_open_periods
+
+
+class Command(BaseCommand):
+    help = (
+        "Congela os períodos encerrados dos rankings por janela (diário, semanal, temporada) "
+        "em snapshots imutáveis."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--recount",
+            action="store_true",
+            help="Também recalcula os períodos abertos a partir de Event e Award.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        frozen = freeze_closed_periods()
+        for period in frozen:
+            self.stdout.write(
+                f"{period.board}/{period.window} {period.period_start:%Y-%m-%d}: "
+                f"{period.participants} participantes"
+            )
+        self.stdout.write(self.style.SUCCESS(f"{len(frozen)} períodos congelados"))
+        if options["recount"]:
+            rows = recount_open_periods()
+            self.stdout.write(self.style.SUCCESS(f"Períodos abertos recalculados ({rows} linhas)"))
@@ -0,0 +1,100 @@
+# Generated by Django 6.0 on 2026-10-18 11:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="FrozenPeriod",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("board", models.CharField(max_length=20)),
+                ("window", models.CharField(max_length=20)),
+                ("period_start", models.DateTimeField()),
+                ("period_end", models.DateTimeField()),
+                ("participants", models.PositiveIntegerField(default=0)),
+                ("frozen_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "unique_together": {("board", "window", "period_start")},
+            },
+        ),
+        migrations.CreateModel(
+            name="WindowScore",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("board", models.CharField(max_length=20)),
+                ("window", models.CharField(max_length=20)),
+                ("period_start", models.DateTimeField()),
+                ("subject", models.CharField(max_length=64)),
+                ("count", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=[
+                            "board",
+                            "window",
+                            "period_start",
+                            "-count",
+                            "-subject",
+                        ],
+                        name="leaderboards_window_rank_idx",
+                    )
+                ],
+                "unique_together": {("board", "window", "period_start", "subject")},
+            },
+        ),
+        migrations.CreateModel(
+            name="LeaderboardSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("position", models.PositiveIntegerField()),
+                ("rank", models.PositiveIntegerField()),
+                ("subject", models.CharField(max_length=64)),
+                ("count", models.BigIntegerField()),
+                (
+                    "period",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="entries",
+                        to="leaderboards.frozenperiod",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("period", "position")},
+            },
+        ),
+    ]
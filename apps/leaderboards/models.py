@@ -0,0 +1,67 @@
+from django.db import models
+
+
+class WindowScore(models.Model):
+    """Running total of one subject in one open period of a windowed board.
+
+    ``subject`` is the player or guild id, depending on the board. Rows of a
+    period are deleted once it is frozen into ``LeaderboardSnapshot``.
+    """
+
+    board = models.CharField(max_length=20)
+    window = models.CharField(max_length=20)
+    period_start = models.DateTimeField()
+    subject = models.CharField(max_length=64)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('board', 'window', 'period_start', 'subject')
+        indexes = [
+            models.Index(
+                fields=['board', 'window', 'period_start', '-count', '-subject'],
+                name='leaderboards_window_rank_idx',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return (
+            f"{self.board}/{self.window} {self.period_start:%Y-%m-%d} "
+            f"{self.subject}: {self.count}"
+        )
+
+
+class FrozenPeriod(models.Model):
+    """A closed period whose ranking was copied into ``LeaderboardSnapshot``."""
+
+    board = models.CharField(max_length=20)
+    window = models.CharField(max_length=20)
+    period_start = models.DateTimeField()
+    period_end = models.DateTimeField()
+    participants = models.PositiveIntegerField(default=0)
+    frozen_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('board', 'window', 'period_start')
+
+    def __str__(self) -> str:
+        return f"{self.board}/{self.window} {self.period_start:%Y-%m-%d} (frozen)"
+
+
+class LeaderboardSnapshot(models.Model):
+    """Immutable final ranking of a frozen period, in ``position`` order."""
+
+    period = models.ForeignKey(
+        FrozenPeriod,
+        on_delete=models.CASCADE,
+        related_name='entries'
+    )
+    position = models.PositiveIntegerField()
+    rank = models.PositiveIntegerField()
+    subject = models.CharField(max_length=64)
+    count = models.BigIntegerField()
+
+    class Meta:
+        unique_together = ('period', 'position')
+
+    def __str__(self) -> str:
+        return f"#{self.rank} {self.subject}: {self.count}"
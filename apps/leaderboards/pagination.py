@@ -0,0 +1,13 @@
+from apps.core.pagination import KeysetPagination
+
+
+class LiveBoardPagination(KeysetPagination):
+    ordering = ("-count", "-subject")
+    page_size = 20
+    max_page_size = 500
+
+
+class SnapshotPagination(KeysetPagination):
+    ordering = ("position",)
+    page_size = 20
+    max_page_size = 500
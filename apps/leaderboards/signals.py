@@ -0,0 +1,58 @@
+from typing import Any, Optional, Sequence
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.awards.leaderboard import awards_created
+from apps.awards.models import Award
+from apps.events.models import Event
+from apps.events.signals import events_created
+from apps.leaderboards.windows import apply_contributions, award_contributions, event_contributions
+
+
+@receiver(post_save, sender=Event)
+def window_saved_event(sender: Any, instance: Event, created: bool, **kwargs: Any) -> None:
+    if kwargs.get("raw"):
+        return
+    if created:
+        apply_contributions(event_contributions(instance))
+        return
+    # Set by apps.events.signals.remember_previous_state
+    previous: Optional[Event] = getattr(instance, "_previous_state", None)
+    if previous is not None and event_contributions(previous) != event_contributions(instance):
+        apply_contributions(event_contributions(previous), sign=-1)
+        apply_contributions(event_contributions(instance))
+
+
+@receiver(post_delete, sender=Event)
+def window_deleted_event(sender: Any, instance: Event, **kwargs: Any) -> None:
+    apply_contributions(event_contributions(instance), sign=-1)
+
+
+@receiver(events_created, sender=Event)
+def window_created_events(sender: Any, events: Sequence[Event], **kwargs: Any) -> None:
+    apply_contributions(c for event in events for c in event_contributions(event))
+
+
+@receiver(post_save, sender=Award)
+def window_saved_award(sender: Any, instance: Award, created: bool, **kwargs: Any) -> None:
+    if kwargs.get("raw"):
+        return
+    if created:
+        apply_contributions(award_contributions(instance))
+        return
+    # Set by apps.awards.signals.remember_previous_award
+    previous = getattr(instance, "_previous_key", None)
+    if previous is not None and previous[0] != instance.player_id:
+        apply_contributions([("awards", previous[0], instance.earned_at)], sign=-1)
+        apply_contributions(award_contributions(instance))
+
+
+@receiver(post_delete, sender=Award)
+def window_deleted_award(sender: Any, instance: Award, **kwargs: Any) -> None:
+    apply_contributions(award_contributions(instance), sign=-1)
+
+
+@receiver(awards_created, sender=Award)
+def window_created_awards(sender: Any, awards: Sequence[Award], **kwargs: Any) -> None:
+    apply_contributions(c for award in awards for c in award_contributions(award))
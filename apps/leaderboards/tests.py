@@ -0,0 +1,166 @@
+import io
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.awards.models import Award
+from apps.core.cache import LRUCache
+from apps.events.ingest import create_events
+from apps.events.models import Event, EventType
+from apps.guilds.models import Guild
+from apps.leaderboards.models import FrozenPeriod, LeaderboardSnapshot, WindowScore
+from apps.leaderboards import windows
+from apps.leaderboards.windows import freeze_closed_periods, period
+from apps.players.models import Player
+from apps.users.models import User
+
+
+class WindowPeriodTests(APITestCase):
+    def test_period_boundaries(self) -> None:
+        moment = datetime(2026, 10, 18, 15, 30, tzinfo=dt_timezone.utc)  # a Sunday
+        self.assertEqual(
+            period("daily", moment)[0], datetime(2026, 10, 18, tzinfo=dt_timezone.utc)
+        )
+        start, end = period("weekly", moment)
+        self.assertEqual(start, datetime(2026, 10, 12, tzinfo=dt_timezone.utc))
+        self.assertEqual(end - start, timedelta(days=7))
+        self.assertEqual(
+            period("season", moment),
+            (
+                datetime(2026, 10, 1, tzinfo=dt_timezone.utc),
+                datetime(2027, 1, 1, tzinfo=dt_timezone.utc),
+            ),
+        )
+
+
+class WindowedLeaderboardTests(APITestCase):
+    def setUp(self) -> None:
+        self.guild = Guild.objects.create(name="WindowGuild", score="0")
+        self.players = [
+            Player.objects.create(
+                user=User.objects.create(username=f"windowed{i}"), guild=self.guild
+            )
+            for i in range(3)
+        ]
+        self.now = timezone.now()
+        # Frozen periods are cached per process; the rows roll back between tests
+        self.addCleanup(windows._frozen_keys.clear)
+
+    def _events(self, player: Player, n: int, when: datetime) -> list[Event]:
+        return create_events([
+            Event(
+                type=EventType.QUEST_COMPLETE,
+                details={},
+                player=player,
+                guild=self.guild,
+                timestamp=when,
+            )
+            for _ in range(n)
+        ])
+
+    def test_open_period_ranking(self) -> None:
+        self._events(self.players[0], 3, self.now)
+        self._events(self.players[1], 1, self.now)
+        Event.objects.create(
+            type=EventType.QUEST_COMPLETE, details={}, player=self.players[2], timestamp=self.now
+        )
+        Award.objects.create(player=self.players[1], award_type='SOLO_CLEAR')
+
+        response = self.client.get(
+            "/api/leaderboards/", {"board": "player_events", "window": "daily"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data["frozen"])
+        results = response.data["results"]
+        self.assertEqual([r["name"] for r in results][0], "windowed0")
+        self.assertEqual([r["rank"] for r in results], [1, 2, 2])
+
+        response = self.client.get(
+            "/api/leaderboards/",
+            {"board": "player_events", "window": "season", "subject": str(self.players[0].id)},
+        )
+        self.assertEqual((response.data["rank"], response.data["count"]), (1, 3))
+
+        response = self.client.get(
+            "/api/leaderboards/", {"board": "guild_events", "window": "weekly"}
+        )
+        # The event created without a guild only counts for its player
+        self.assertEqual(response.data["results"][0]["count"], 4)
+        self.assertEqual(response.data["results"][0]["name"], "WindowGuild")
+
+        response = self.client.get(
+            "/api/leaderboards/", {"board": "awards", "window": "weekly"}
+        )
+        self.assertEqual([r["name"] for r in response.data["results"]], ["windowed1"])
+
+    def test_deletes_retract_and_bad_params(self) -> None:
+        event, = self._events(self.players[0], 1, self.now)
+        event.delete()
+        response = self.client.get(
+            "/api/leaderboards/", {"board": "player_events", "window": "daily"}
+        )
+        self.assertEqual(response.data["results"], [])
+        response = self.client.get("/api/leaderboards/", {"window": "hourly"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/api/leaderboards/", {"period": "ontem"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_closed_period_is_frozen_into_snapshot(self) -> None:
+        last_week = self.now - timedelta(days=7)
+        self._events(self.players[0], 2, last_week)
+        self._events(self.players[1], 2, last_week)
+        self._events(self.players[2], 1, last_week)
+
+        frozen = freeze_closed_periods(self.now + timedelta(days=1))
+        weekly = next(p for p in frozen if p.board == "player_events" and p.window == "weekly")
+        self.assertEqual(weekly.participants, 3)
+        self.assertFalse(WindowScore.objects.filter(
+            board="player_events", window="weekly", period_start=weekly.period_start
+        ).exists())
+
+        # Late contributions no longer change a frozen period
+        self._events(self.players[2], 5, last_week)
+        response = self.client.get(
+            "/api/leaderboards/",
+            {
+                "board": "player_events",
+                "window": "weekly",
+                "period": last_week.date().isoformat(),
+                "page_size": 2,
+            },
+        )
+        self.assertTrue(response.data["frozen"])
+        self.assertEqual([r["rank"] for r in response.data["results"]], [1, 1])
+        response = self.client.get(response.data["next"])
+        self.assertEqual(
+            [(r["rank"], r["count"]) for r in response.data["results"]], [(3, 1)]
+        )
+        self.assertEqual(LeaderboardSnapshot.objects.filter(period=weekly).count(), 3)
+
+    def test_frozen_period_cache_is_bounded(self) -> None:
+        last_week = self.now - timedelta(days=7)
+        with mock.patch("apps.leaderboards.windows._frozen_keys", LRUCache(1)) as cache:
+            self._events(self.players[0], 1, last_week)
+            frozen = freeze_closed_periods(self.now + timedelta(days=1))
+            self.assertGreater(len(frozen), 1)
+            self.assertEqual(len(cache), 1)
+            # Evicted periods are looked up again and still ignore late events
+            self._events(self.players[0], 1, last_week)
+        self.assertFalse(WindowScore.objects.filter(
+            period_start__in=[p.period_start for p in frozen if p.window != "season"]
+        ).exists())
+
+    def test_freeze_command_recounts_open_periods(self) -> None:
+        self._events(self.players[0], 2, self.now)
+        WindowScore.objects.all().delete()
+        out = io.StringIO()
+        call_command("freeze_leaderboards", "--recount", stdout=out)
+        self.assertIn("Períodos abertos recalculados", out.getvalue())
+        score = WindowScore.objects.get(
+            board="player_events", window="daily", subject=str(self.players[0].id)
+        )
+        self.assertEqual(score.count, 2)
+        self.assertFalse(FrozenPeriod.objects.exists())
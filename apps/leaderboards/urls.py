@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from apps.leaderboards.views import LeaderboardViewSet
+
+router = DefaultRouter()
+router.register(r'leaderboards', LeaderboardViewSet, basename='leaderboard')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
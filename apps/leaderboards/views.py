@@ -0,0 +1,120 @@
+from datetime import datetime, time, timezone as dt_timezone
+from typing import Any, Optional
+
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import status, viewsets
+from rest_framework.response import Response
+
+from apps.core.pagination import KeysetPagination
+from apps.guilds.models import Guild
+from apps.leaderboards.models import FrozenPeriod
+from apps.leaderboards.pagination import LiveBoardPagination, SnapshotPagination
+from apps.leaderboards.windows import BOARDS, WINDOWS, live_board, live_ranks, period
+from apps.players.models import Player
+
+
+def _parse_period(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = moment.replace(tzinfo=dt_timezone.utc)
+    return moment
+
+
+def _names(board: str, subjects: list[str]) -> dict[str, str]:
+    if BOARDS[board] == "guild":
+        rows = Guild.objects.filter(id__in=subjects).values_list("id", "name")
+    else:
+        rows = Player.objects.filter(id__in=subjects).values_list("id", "user__username")
+    return {str(pk): name for pk, name in rows}
+
+
+def _entries(
+    board: str, window: str, start: datetime, rows: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    if rows and 'rank' not in rows[0]:
+        rank_of = live_ranks(board, window, start, (row['count'] for row in rows))
+        rows = [{**row, 'rank': rank_of[row['count']]} for row in rows]
+    names = _names(board, [row['subject'] for row in rows])
+    return [
+        {
+            'rank': row['rank'],
+            'subject': row['subject'],
+            'name': names.get(row['subject']),
+            'count': row['count'],
+        }
+        for row in rows
+    ]
+
+
+class LeaderboardViewSet(viewsets.ViewSet):
+    def list(self, request: Any) -> Response:
+        params = request.query_params
+        board = params.get('board', 'awards')
+        window = params.get('window', 'weekly')
+        if board not in BOARDS:
+            return Response(
+                {'error': f'board deve ser um de: {", ".join(BOARDS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if window not in WINDOWS:
+            return Response(
+                {'error': f'window deve ser um de: {", ".join(WINDOWS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            moment = _parse_period(params.get('period')) or timezone.now()
+        except ValueError:
+            return Response(
+                {'error': 'period deve ser uma data ou data/hora ISO 8601'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        start, end = period(window, moment)
+
+        # Períodos encerrados são servidos do snapshot congelado
+        frozen = FrozenPeriod.objects.filter(board=board, window=window, period_start=start).first()
+        rows: QuerySet[Any]
+        paginator: KeysetPagination
+        if frozen is not None:
+            rows = frozen.entries.values('position', 'rank', 'subject', 'count')
+            paginator = SnapshotPagination()
+        else:
+            rows = live_board(board, window, start).values('subject', 'count')
+            paginator = LiveBoardPagination()
+
+        header = {
+            'board': board,
+            'window': window,
+            'period_start': start,
+            'period_end': end,
+            'frozen': frozen is not None,
+        }
+        if frozen is not None:
+            header['participants'] = frozen.participants
+
+        # Posição de um player/guild específico
+        subject = params.get('subject')
+        if subject:
+            row = rows.filter(subject=subject).first()
+            if row is None:
+                return Response(
+                    {'error': 'Sem pontuação neste período'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            return Response({**header, **_entries(board, window, start, [row])[0]})
+
+        page = paginator.paginate_queryset(rows, request, view=self)
+        return Response({
+            **header,
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+            'results': _entries(board, window, start, page),
+        })
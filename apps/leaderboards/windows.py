@@ -0,0 +1,249 @@
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Callable, Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, QuerySet
+
+from apps.awards.models import Award
+from apps.core.cache import MISSING, LRUCache
+from apps.core.db import increment_counts
+from apps.events.models import Event
+from apps.events.rollups import event_time
+from apps.leaderboards.models import FrozenPeriod, LeaderboardSnapshot, WindowScore
+
+SEASON_MONTHS: int = getattr(settings, "LEADERBOARD_SEASON_MONTHS", 3)
+# Closed periods stay open to late contributions for this long before freezing
+FREEZE_GRACE = timedelta(seconds=getattr(settings, "LEADERBOARD_FREEZE_GRACE", 3600))
+FREEZE_INTERVAL: float = getattr(settings, "LEADERBOARD_FREEZE_INTERVAL", 300.0)
+# Entries kept per frozen period; participants beyond it are only counted
+SNAPSHOT_SIZE: int = getattr(settings, "LEADERBOARD_SNAPSHOT_SIZE", 1000)
+# Periods known to be frozen, so late contributions skip the FrozenPeriod
+# query; the TTL picks up changes made by other processes
+FROZEN_CACHE_SIZE: int = getattr(settings, "LEADERBOARD_FROZEN_CACHE_SIZE", 10000)
+FROZEN_CACHE_TTL: float = getattr(settings, "LEADERBOARD_FROZEN_CACHE_TTL", 3600.0)
+
+KEY_FIELDS = ("board", "window", "period_start", "subject")
+PeriodKey = tuple[str, str, datetime]
+# (board, subject id, moment the contribution counts at)
+Contribution = tuple[str, Any, datetime]
+
+# Board name -> what its subjects are
+BOARDS: dict[str, str] = {
+    "awards": "player",
+    "player_events": "player",
+    "guild_events": "guild",
+}
+
+_last_freeze = 0.0
+_frozen_keys = LRUCache(FROZEN_CACHE_SIZE, ttl=FROZEN_CACHE_TTL)
+
+
+def _day(moment: datetime) -> datetime:
+    return moment.astimezone(dt_timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(moment: datetime, months: int) -> datetime:
+    month = moment.month - 1 + months
+    return moment.replace(year=moment.year + month // 12, month=month % 12 + 1)
+
+
+def _daily(moment: datetime) -> tuple[datetime, datetime]:
+    start = _day(moment)
+    return start, start + timedelta(days=1)
+
+
+def _weekly(moment: datetime) -> tuple[datetime, datetime]:
+    day = _day(moment)
+    start = day - timedelta(days=day.weekday())
+    return start, start + timedelta(days=7)
+
+
+def _season(moment: datetime) -> tuple[datetime, datetime]:
+    day = _day(moment)
+    start = day.replace(day=1, month=(day.month - 1) // SEASON_MONTHS * SEASON_MONTHS + 1)
+    return start, _add_months(start, SEASON_MONTHS)
+
+
+# Window name -> [start, end) of the period containing a moment (UTC)
+WINDOWS: dict[str, Callable[[datetime], tuple[datetime, datetime]]] = {
+    "daily": _daily,
+    "weekly": _weekly,
+    "season": _season,
+}
+
+
+def period(window: str, moment: datetime) -> tuple[datetime, datetime]:
+    return WINDOWS[window](moment)
+
+
+def event_contributions(event: Event) -> list[Contribution]:
+    moment = event_time(event)
+    return [("player_events", event.player_id, moment), ("guild_events", event.guild_id, moment)]
+
+
+def award_contributions(award: Award) -> list[Contribution]:
+    return [("awards", award.player_id, award.earned_at)]
+
+
+def apply_contributions(contributions: Iterable[Contribution], sign: int = 1) -> None:
+    """Add ``sign`` for each contribution to the period of every window it falls in.
+
+    Contributions to periods that are already frozen are dropped: snapshots
+    never change.
+    """
+    deltas: Counter[tuple[str, str, datetime, str]] = Counter()
+    for board, subject, moment in contributions:
+        if subject is None:
+            continue
+        for window in WINDOWS:
+            start, _ = period(window, moment)
+            deltas[(board, window, start, str(subject))] += sign
+    frozen = _frozen({key[:3] for key in deltas})
+    increment_counts(
+        WindowScore, KEY_FIELDS, {key: n for key, n in deltas.items() if key[:3] not in frozen}
+    )
+    if sign > 0:
+        _schedule_freeze()
+
+
+def _frozen(keys: set[PeriodKey]) -> set[PeriodKey]:
+    # Only periods that have ended can be frozen, so live traffic into the
+    # current periods never queries FrozenPeriod.
+    now = datetime.now(dt_timezone.utc)
+    ended = {key for key in keys if period(key[1], key[2])[1] <= now}
+    frozen = {key for key in ended if _frozen_keys.get(key) is not MISSING}
+    if ended - frozen:
+        match = Q(pk__in=[])
+        for board, window, start in ended - frozen:
+            match |= Q(board=board, window=window, period_start=start)
+        for key in FrozenPeriod.objects.filter(match).values_list(
+            "board", "window", "period_start"
+        ):
+            _frozen_keys.set(key, True)
+            frozen.add(key)
+    return frozen
+
+
+def _schedule_freeze() -> None:
+    global _last_freeze
+    now = time.monotonic()
+    if now - _last_freeze < FREEZE_INTERVAL:
+        return
+    _last_freeze = now
+    # Runs after the ingest transaction so it never holds up the insert
+    transaction.on_commit(freeze_closed_periods)
+
+
+def freeze_period(board: str, window: str, start: datetime) -> FrozenPeriod:
+    """Copy the final ranking of a period into ``LeaderboardSnapshot`` and drop its live rows."""
+    with transaction.atomic():
+        frozen, created = FrozenPeriod.objects.get_or_create(
+            board=board,
+            window=window,
+            period_start=start,
+            defaults={"period_end": period(window, start)[1]},
+        )
+        live = WindowScore.objects.filter(board=board, window=window, period_start=start)
+        if created:
+            entries: list[LeaderboardSnapshot] = []
+            rank = 0
+            previous: Optional[int] = None
+            rows = (
+                live.filter(count__gt=0)
+                .order_by("-count", "-subject")
+                .values_list("subject", "count")
+            )
+            for position, (subject, count) in enumerate(rows.iterator(chunk_size=2000), start=1):
+                if count != previous:
+                    rank, previous = position, count
+                if position <= SNAPSHOT_SIZE:
+                    entries.append(LeaderboardSnapshot(
+                        period=frozen, position=position, rank=rank, subject=subject, count=count
+                    ))
+                frozen.participants = position
+            LeaderboardSnapshot.objects.bulk_create(entries, batch_size=1000)
+            FrozenPeriod.objects.filter(pk=frozen.pk).update(participants=frozen.participants)
+        live.delete()
+    _frozen_keys.set((board, window, start), True)
+    return frozen
+
+
+def freeze_closed_periods(now: Optional[datetime] = None) -> list[FrozenPeriod]:
+    """Freeze every period that ended more than ``FREEZE_GRACE`` ago."""
+    cutoff = (now or datetime.now(dt_timezone.utc)) - FREEZE_GRACE
+    frozen: list[FrozenPeriod] = []
+    for board in BOARDS:
+        for window in WINDOWS:
+            current_start, _ = period(window, cutoff)
+            starts = (
+                WindowScore.objects
+                .filter(board=board, window=window, period_start__lt=current_start)
+                .order_by("period_start")
+                .values_list("period_start", flat=True)
+                .distinct()
+            )
+            for start in list(starts):
+                frozen.append(freeze_period(board, window, start))
+    return frozen
+
+
+def recount_open_periods(now: Optional[datetime] = None) -> int:
+    """Rebuild the live rows of every open period from ``Event`` and ``Award``.
+
+    Scans only rows since the start of the oldest open period (the current
+    season), not the whole history. Returns the number of rows written.
+    """
+    now = now or datetime.now(dt_timezone.utc)
+    cutoff = now - FREEZE_GRACE
+    since = min(period(window, cutoff)[0] for window in WINDOWS)
+    contributions: list[Contribution] = []
+    events = Event.objects.filter(
+        Q(timestamp__gte=since) | Q(timestamp__isnull=True, created_at__gte=since)
+    ).only("player_id", "guild_id", "timestamp", "created_at")
+    for event in events.iterator(chunk_size=5000):
+        contributions.extend(event_contributions(event))
+    awards = Award.objects.filter(earned_at__gte=since).only("player_id", "earned_at")
+    for award in awards.iterator(chunk_size=5000):
+        contributions.extend(award_contributions(award))
+
+    counts: Counter[tuple[str, str, datetime, str]] = Counter()
+    for board, subject, moment in contributions:
+        if subject is None:
+            continue
+        for window in WINDOWS:
+            start, _ = period(window, moment)
+            if start >= period(window, cutoff)[0]:
+                counts[(board, window, start, str(subject))] += 1
+    with transaction.atomic():
+        for window in WINDOWS:
+            WindowScore.objects.filter(
+                window=window, period_start__gte=period(window, cutoff)[0]
+            ).delete()
+        WindowScore.objects.bulk_create(
+            [
+                WindowScore(
+                    board=board, window=window, period_start=start, subject=subject, count=count
+                )
+                for (board, window, start, subject), count in counts.items()
+            ],
+            batch_size=1000,
+        )
+    return len(counts)
+
+
+def live_board(board: str, window: str, start: datetime) -> QuerySet[WindowScore]:
+    return WindowScore.objects.filter(board=board, window=window, period_start=start, count__gt=0)
+
+
+def live_ranks(board: str, window: str, start: datetime, counts: Iterable[int]) -> dict[int, int]:
+    """Competition rank of each count in an open period, as range counts on the board index."""
+    wanted = sorted(set(counts))
+    if not wanted:
+        return {}
+    found = live_board(board, window, start).filter(count__gt=wanted[0]).aggregate(**{
+        f"above_{i}": Count("pk", filter=Q(count__gt=value)) for i, value in enumerate(wanted)
+    })
+    return {value: found[f"above_{i}"] + 1 for i, value in enumerate(wanted)}
@@ -4,3 +4,7 @@ class PlayersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.players'
     verbose_name = "Players"
+
+    def ready(self) -> None:
+        # import signal handlers (resolver cache invalidation)
+        import apps.players.signals  # noqa: F401
@@ -0,0 +1,49 @@
+# Generated by Django 6.0 on 2026-10-18 13:40
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_activity(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    Player = apps.get_model("players", "Player")
+    latest = (
+        Event.objects.filter(player_id=OuterRef("pk"))
+        .annotate(moment=Coalesce("timestamp", "created_at"))
+        .order_by("-moment", "-id")
+    )
+    Player.objects.update(
+        last_seen=Subquery(latest.values("moment")[:1]),
+        last_event_type=Coalesce(Subquery(latest.values("type")[:1]), Value("")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0006_eventrollup"),
+        ("guilds", "0003_activity_summary"),
+        ("players", "0001_initial"),
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="player",
+            name="last_event_type",
+            field=models.CharField(blank=True, default="", max_length=50),
+        ),
+        migrations.AddField(
+            model_name="player",
+            name="last_seen",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="player",
+            index=models.Index(
+                fields=["-last_seen", "-id"], name="players_last_seen_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_activity, migrations.RunPython.noop),
+    ]
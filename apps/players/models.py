@@ -15,6 +15,16 @@ class Player(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="players")
     guild = models.ForeignKey(Guild, on_delete=models.SET_NULL, null=True, blank=True, related_name="players")
     created_at = models.DateTimeField(auto_now_add=True)
+    # Latest event seen at ingest (apps.events.counters.apply_activity); the
+    # lifetime count is the ``event_count`` row kept by the same receivers.
+    last_seen = models.DateTimeField(null=True, blank=True)
+    last_event_type = models.CharField(max_length=50, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            # Serves /api/players/?active_since=...&ordering=-last_seen
+            models.Index(fields=["-last_seen", "-id"], name="players_last_seen_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"Player {self.id}"
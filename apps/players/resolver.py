@@ -0,0 +1,116 @@
+import threading
+import uuid
+from typing import Any, Hashable, Iterable
+
+from django.conf import settings
+
+from apps.core.cache import MISSING, LRUCache
+from apps.core.metrics import REGISTRY, cache_collector
+from apps.players.models import Player
+
+
+class PlayerResolver:
+    """Resolve player identifiers (UUID or username) in bulk, with an LRU cache.
+
+    Identifiers that parse as UUIDs are looked up by id only; everything else
+    by ``user__username``. Cache misses for a whole batch cost at most two
+    queries. Entries are dropped by the Player/User signal handlers in
+    ``apps.players.signals``; the TTL bounds staleness from writes made by
+    other processes. Cached instances are shared, so treat them as read-only.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None) -> None:
+        self._cache = LRUCache(maxsize, ttl=ttl, on_evict=self._forget)
+        self._lock = threading.Lock()
+        # player id / user id -> cache keys pointing at that player
+        self._by_player: dict[Any, set[Hashable]] = {}
+        self._by_user: dict[Any, set[Hashable]] = {}
+
+    def _remember(self, key: Hashable, player: Player) -> None:
+        self._cache.set(key, player)
+        with self._lock:
+            self._by_player.setdefault(player.id, set()).add(key)
+            self._by_user.setdefault(player.user_id, set()).add(key)
+
+    def _forget(self, key: Hashable, player: Player) -> None:
+        with self._lock:
+            for index, owner in ((self._by_player, player.id), (self._by_user, player.user_id)):
+                keys = index.get(owner)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del index[owner]
+
+    def resolve(self, identifiers: Iterable[Any]) -> dict[str, Player]:
+        """Map each identifier's string form to its Player; unknown ones are left out."""
+        resolved: dict[str, Player] = {}
+        missing_ids: dict[uuid.UUID, list[str]] = {}
+        missing_names: set[str] = set()
+        for pid in identifiers:
+            if pid is None:
+                continue
+            if isinstance(pid, Player):
+                resolved[str(pid.id)] = pid
+                continue
+            text = str(pid)
+            if text in resolved:
+                continue
+            try:
+                key: Hashable = ("id", uuid.UUID(text))
+            except ValueError:
+                key = ("username", text)
+            player = self._cache.get(key)
+            if player is not MISSING:
+                resolved[text] = player
+            elif key[0] == "id":
+                missing_ids.setdefault(key[1], []).append(text)
+            else:
+                missing_names.add(text)
+
+        if missing_ids:
+            for player in Player.objects.filter(id__in=list(missing_ids)):
+                self._remember(("id", player.id), player)
+                for text in missing_ids[player.id]:
+                    resolved[text] = player
+        if missing_names:
+            players = Player.objects.filter(user__username__in=missing_names).select_related("user")
+            for player in players.order_by("created_at", "id"):
+                username = player.user.username
+                if username not in resolved:
+                    self._remember(("username", username), player)
+                    resolved[username] = player
+        return resolved
+
+    def invalidate_player(self, player_id: Any) -> None:
+        with self._lock:
+            keys = self._by_player.pop(player_id, set())
+        for key in keys:
+            self._cache.pop(key)
+
+    def invalidate_user(self, user_id: Any, username: str | None = None) -> None:
+        with self._lock:
+            keys = self._by_user.pop(user_id, set())
+        if username is not None:
+            keys.add(("username", username))
+        for key in keys:
+            self._cache.pop(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+        with self._lock:
+            self._by_player.clear()
+            self._by_user.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return self._cache.stats()
+
+
+player_resolver = PlayerResolver(
+    maxsize=getattr(settings, "PLAYERS_RESOLVER_CACHE_SIZE", 10000),
+    ttl=getattr(settings, "PLAYERS_RESOLVER_CACHE_TTL", 300.0),
+)
+REGISTRY.add_collector(cache_collector("players_resolver", player_resolver.stats))
+
+
+def resolve_players(identifiers: Iterable[Any]) -> dict[str, Player]:
+    return player_resolver.resolve(identifiers)
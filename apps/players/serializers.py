@@ -4,7 +4,14 @@ from apps.players.models import Player
 
 
 class PlayerSerializer(serializers.ModelSerializer[Any]):
+    # Lifetime event count, from the counter row kept at ingest
+    event_count = serializers.SerializerMethodField()
+
     class Meta:
         model = Player
         fields = "__all__"
-        read_only_fields = ("id", "created_at")
+        read_only_fields = ("id", "created_at", "last_seen", "last_event_type")
+
+    def get_event_count(self, obj: Any) -> int:
+        counter = getattr(obj, "event_count", None)
+        return counter.count if counter is not None else 0
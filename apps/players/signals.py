@@ -0,0 +1,22 @@
+from typing import Any
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.players.models import Player
+from apps.players.resolver import player_resolver
+from apps.users.models import User
+
+
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+def invalidate_cached_player(sender: Any, instance: Player, **kwargs: Any) -> None:
+    player_resolver.invalidate_player(instance.id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender: Any, instance: User, **kwargs: Any) -> None:
+    # Covers renames both ways: keys cached for this user and any stale entry
+    # still holding the (new) username.
+    player_resolver.invalidate_user(instance.id, instance.username)
@@ -4,6 +4,7 @@ from rest_framework import status
 from rest_framework.test import APITestCase
 from django.urls import reverse
 from apps.players.models import Player
+from apps.players.resolver import PlayerResolver, player_resolver, resolve_players
 from apps.guilds.models import Guild
 from apps.users.models import User
 from django.contrib.auth import get_user_model
@@ -126,3 +127,66 @@ class PlayerAPITests(APITestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Player.objects.filter(id=self.player1.id).exists())
+
+
+class PlayerResolverTests(TestCase):
+    """Tests for the batched, cached player resolver."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        player_resolver.clear()
+        self.players = [
+            Player.objects.create(user=User.objects.create(username=f"member{i}")) for i in range(6)
+        ]
+
+    def test_party_resolves_in_two_queries(self) -> None:
+        """Test that a mixed party of ids and usernames costs at most two queries."""
+        party = [str(p.id) for p in self.players[:3]] + ["member3", "member4", "nobody"]
+        with self.assertNumQueries(2):
+            resolved = resolve_players(party)
+        self.assertEqual(len(resolved), 5)
+        self.assertEqual(resolved["member4"].id, self.players[4].id)
+        self.assertNotIn("nobody", resolved)
+
+    def test_repeat_lookups_hit_cache(self) -> None:
+        """Test that resolved players are served from the cache."""
+        party = [str(self.players[0].id), "member1"]
+        resolve_players(party)
+        hits = player_resolver.stats()["hits"]
+        with self.assertNumQueries(0):
+            resolved = resolve_players(party)
+        self.assertEqual(resolved["member1"].id, self.players[1].id)
+        self.assertEqual(player_resolver.stats()["hits"], hits + 2)
+
+    def test_rename_and_guild_change_invalidate(self) -> None:
+        """Test that Player and User saves drop stale entries."""
+        resolve_players(["member0", str(self.players[1].id)])
+        user = self.players[0].user
+        user.username = "renamed"
+        user.save()
+        self.assertNotIn("member0", resolve_players(["member0"]))
+        self.assertEqual(resolve_players(["renamed"])["renamed"].id, self.players[0].id)
+
+        guild = Guild.objects.create(name="New Guild", score="0")
+        self.players[1].guild = guild
+        self.players[1].save()
+        key = str(self.players[1].id)
+        self.assertEqual(resolve_players([key])[key].guild_id, guild.id)
+
+    def test_delete_invalidates(self) -> None:
+        """Test that deleted players stop resolving."""
+        resolve_players(["member2"])
+        self.players[2].delete()
+        self.assertEqual(resolve_players(["member2"]), {})
+
+    def test_cache_is_bounded(self) -> None:
+        """Test LRU eviction and the stats endpoint."""
+        resolver = PlayerResolver(maxsize=2)
+        resolver.resolve([str(p.id) for p in self.players])
+        stats = resolver.stats()
+        self.assertEqual(stats["size"], 2)
+        self.assertEqual(stats["evictions"], 4)
+
+        response = self.client.get("/api/players/cache_stats/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("hit_ratio", response.data)
@@ -1,14 +1,23 @@
 from typing import Any
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from django.db.models import QuerySet
 
+from apps.core.views import ActivityListMixin
 from apps.players.models import Player
+from apps.players.resolver import player_resolver
 from .serializers import PlayerSerializer
 
 
-class PlayerViewSet(viewsets.ModelViewSet[Any]):
+class PlayerViewSet(ActivityListMixin, viewsets.ModelViewSet[Any]):
     queryset = Player.objects.all()
     serializer_class = PlayerSerializer
 
     def get_queryset(self) -> QuerySet[Player]:
-        return Player.objects.all()
\ No newline at end of file
+        return Player.objects.select_related('event_count')
+
+    @action(detail=False, methods=['get'])
+    def cache_stats(self, request: Any) -> Response:
+        # Taxa de acerto do cache de resolução de players (por processo)
+        return Response(player_resolver.stats())
@@ -1,3 +1,4 @@
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -31,6 +32,7 @@ INSTALLED_APPS = [
     'apps.players.apps.PlayersConfig',
     'apps.users.apps.UsersConfig',
     'apps.awards.apps.AwardsConfig',
+    'apps.leaderboards.apps.LeaderboardsConfig',
 ]
 
 # Django REST Framework + Token Auth
@@ -38,7 +40,11 @@ INSTALLED_APPS += [
     "rest_framework.authtoken",
 ]
 MIDDLEWARE = [
+    # Server-Timing and per-route histograms for a sample of requests (REQUEST_METRICS_SAMPLE_RATE)
+    "apps.core.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    # Under ASGI, hot read endpoints are served by async views (config/urls_async.py)
+    "apps.core.middleware.AsyncReadPathMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -115,6 +121,8 @@ USE_TZ = True
 STATIC_URL = "static/"
 
 # DRF settings: token auth and sensible defaults
+MSGPACK_AVAILABLE = find_spec("msgpack") is not None
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.TokenAuthentication",
@@ -123,4 +131,15 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ),
+    # MessagePack (Accept / Content-Type: application/msgpack) when the
+    # optional msgpack package is installed; JSON stays the default
+    "DEFAULT_RENDERER_CLASSES": (
+        "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ) + (("apps.core.renderers.MessagePackRenderer",) if MSGPACK_AVAILABLE else ()),
+    "DEFAULT_PARSER_CLASSES": (
+        "rest_framework.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ) + (("apps.core.renderers.MessagePackParser",) if MSGPACK_AVAILABLE else ()),
 }
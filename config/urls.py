@@ -2,6 +2,8 @@ from django.contrib import admin
 from django.urls import path, include
 from rest_framework.authtoken.views import obtain_auth_token
 
+from apps.core.views import metrics, request_metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path('api/', include('apps.events.urls')),
@@ -9,6 +11,10 @@ urlpatterns = [
     path('api/', include('apps.players.urls')),
     path('api/', include('apps.users.urls')),
     path('api/', include('apps.awards.urls')),
+    path('api/', include('apps.leaderboards.urls')),
+    path('api/request-metrics/', request_metrics, name='request-metrics'),
+    # Prometheus scrape target
+    path('metrics', metrics, name='metrics'),
     # DRF login (session) and token auth endpoints
     path('api-auth/', include('rest_framework.urls')),
     path('api/token-auth/', obtain_auth_token),
@@ -0,0 +1,19 @@
+"""Urlconf of ASGI requests (apps.core.middleware.AsyncReadPathMiddleware).
+
+The hot read endpoints are served by async views that fall back to the
+DRF views for anything else; every other route is ``config.urls``. Names
+match the router's, so both resolve and reverse to the same endpoint.
+"""
+from django.urls import path
+
+from apps.awards import async_views as awards
+from apps.events import async_views as events
+from config import urls
+
+urlpatterns = [
+    path('api/events/', events.event_list, name='event-list'),
+    path('api/events/statistics/', events.statistics, name='event-statistics'),
+    path('api/events/player_stats/', events.player_stats, name='event-player-stats'),
+    path('api/events/guild_stats/', events.guild_stats, name='event-guild-stats'),
+    path('api/awards/leaderboard/', awards.leaderboard, name='award-leaderboard'),
+] + urls.urlpatterns